@@ -198,9 +198,13 @@ class DesktopSurveillanceApp:
                 
                 # AI initialization with proper imports
                 from src.core.ai_analyzer import AIAnalyzer
-                self.ai_analyzer = AIAnalyzer()
+                from src.core.startup import format_timings
+                self.ai_analyzer = AIAnalyzer()  # Models load and warm up in the background
+                if not self.ai_analyzer.wait_until_ready():
+                    raise RuntimeError("models failed to load")
                 
                 self.add_log("✅ AI analyzer loaded successfully!")
+                self.add_log(f"⏱️ Startup: {format_timings(self.ai_analyzer.startup_timings)}")
                 
                 # Update UI on main thread
                 self.root.after(0, self.ai_initialization_complete)
@@ -255,7 +259,8 @@ class DesktopSurveillanceApp:
     def start_webcam_capture(self):
         """Start webcam capture with full AI analysis"""
         def webcam_worker():
-            # Initialize camera processor for full AI capabilities
+            # Initialize camera processor for full AI capabilities; the camera
+            # opens while its analyzer warms up
             processor = CameraProcessor()
             cap = cv2.VideoCapture(0)
             cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
@@ -266,20 +271,16 @@ class DesktopSurveillanceApp:
                 self.add_log("❌ Failed to open webcam")
                 return
             
+            processor.wait_until_ready()
             self.add_log("📹 Webcam analysis started")
-            frame_skip_counter = 0
             
             while self.is_processing:
                 ret, frame = cap.read()
                 if not ret:
                     break
                 
-                # Process every 2nd frame to reduce CPU load and flickering
-                frame_skip_counter += 1
-                if frame_skip_counter % 2 != 0:
-                    continue
-                
-                # Process frame with AI
+                # Process frame with AI; the processor only runs the detectors
+                # on keyframes and propagates results to the frames in between
                 analyzed_frame, risk_score = processor.process_frame_from_numpy(frame)
                 detections = processor.last_detections if hasattr(processor, 'last_detections') else []
                 
@@ -292,6 +293,7 @@ class DesktopSurveillanceApp:
                 time.sleep(0.03)  # ~30 FPS maximum
             
             cap.release()
+            processor.close()
             self.add_log("📹 Webcam capture stopped")
         
         self.video_thread = threading.Thread(target=webcam_worker, daemon=True)
@@ -308,8 +310,8 @@ class DesktopSurveillanceApp:
                 self.add_log(f"❌ Failed to open video: {video_path}")
                 return
             
+            processor.wait_until_ready()
             self.add_log(f"🎬 Video processing started: {video_path}")
-            frame_skip_counter = 0
             
             while self.is_processing:
                 ret, frame = cap.read()
@@ -317,12 +319,7 @@ class DesktopSurveillanceApp:
                     self.add_log("🎬 Video finished")
                     break
                 
-                # Process every 3rd frame for video files to reduce processing load
-                frame_skip_counter += 1
-                if frame_skip_counter % 3 != 0:
-                    continue
-                
-                # Process frame with AI
+                # Process frame with AI (keyframes plus propagation, see above)
                 analyzed_frame, risk_score = processor.process_frame_from_numpy(frame)
                 detections = processor.last_detections if hasattr(processor, 'last_detections') else []
                 
@@ -335,6 +332,7 @@ class DesktopSurveillanceApp:
                 time.sleep(0.05)  # ~20 FPS for video files
             
             cap.release()
+            processor.close()
             self.add_log("🎬 Video processing stopped")
         
         self.video_thread = threading.Thread(target=video_worker, daemon=True)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Adaptive Input Resolution for WatchHer System
+Picks the detector input size from the scene content, with hysteresis
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import numpy as np
+
+from src.core.event_log import get_event_logger
+
+events = get_event_logger('adaptive_resolution')
+
+
+class AdaptiveResolution:
+    """
+    Scene-driven inference size controller
+
+    After every frame the controller looks at how large the detected people
+    and harmful-object candidates appear at the current input size:
+
+    - many small people, or a small knife candidate, raise the size at once
+      (after up_frames consecutive frames) so nothing is lost to downscaling
+    - few, large people lower the size only after down_frames consecutive
+      frames, and never within cooldown_frames of the previous change, so
+      the size does not flap
+    - a frame without detections holds the current size, so the first
+      person entering an empty scene is not detected at the smallest size
+
+    Only the model input size changes; Ultralytics maps boxes back to the
+    original frame, so all detections stay in frame coordinates.
+    """
+
+    def __init__(self, levels=(320, 480, 640), initial=640, many_people=6, few_people=3,
+                 small_person_px=64, large_person_px=96, small_object_px=24,
+                 up_frames=2, down_frames=30, cooldown_frames=15):
+        """
+        Args:
+            levels: Allowed input sizes, smallest first (multiples of 32)
+            initial: Starting input size
+            many_people: People count that counts as a crowded scene
+            few_people: Maximum people count for lowering the size
+            small_person_px: Person height (input pixels) below which people are "small"
+            large_person_px: Minimum person height (input pixels, at the lower
+                             size) for lowering the size
+            small_object_px: Object side (input pixels) below which a candidate is "small"
+            up_frames: Consecutive frames needed to raise the size
+            down_frames: Consecutive frames needed to lower the size
+            cooldown_frames: Frames after a change during which the size may not drop
+        """
+        self.levels = sorted(levels)
+        self.level = self.levels.index(min(self.levels, key=lambda size: abs(size - initial)))
+        self.many_people = many_people
+        self.few_people = few_people
+        self.small_person_px = small_person_px
+        self.large_person_px = large_person_px
+        self.small_object_px = small_object_px
+        self.up_frames = up_frames
+        self.down_frames = down_frames
+        self.cooldown_frames = cooldown_frames
+
+        self._up_streak = 0
+        self._down_streak = 0
+        self._since_change = cooldown_frames
+        self.changes = 0
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build the controller from a RESOLUTION_SETTINGS-style dict"""
+        return cls(**{key: value for key, value in settings.items() if key != 'enabled'})
+
+    @property
+    def imgsz(self):
+        """Input size for the next frame"""
+        return self.levels[self.level]
+
+    def update(self, person_bboxes, object_bboxes, frame_shape):
+        """
+        Account for one analyzed frame and pick the size for the next one
+
+        Args:
+            person_bboxes: (N, 4) person boxes in frame coordinates
+            object_bboxes: (M, 4) harmful object boxes in frame coordinates
+            frame_shape: Shape of the analyzed frame
+
+        Returns:
+            int: Input size for the next frame
+        """
+        person_bboxes = np.asarray(person_bboxes).reshape(-1, 4)
+        object_bboxes = np.asarray(object_bboxes).reshape(-1, 4)
+        longest_side = max(frame_shape[:2])
+        self._since_change += 1
+        if not len(person_bboxes) and not len(object_bboxes):
+            return self.imgsz
+
+        if self._wants_higher(person_bboxes, object_bboxes, longest_side):
+            self._up_streak += 1
+            self._down_streak = 0
+        elif self._wants_lower(person_bboxes, object_bboxes, longest_side):
+            self._down_streak += 1
+            self._up_streak = 0
+        else:
+            self._up_streak = 0
+            self._down_streak = 0
+
+        if self._up_streak >= self.up_frames and self.level < len(self.levels) - 1:
+            self._change(+1)
+        elif (self._down_streak >= self.down_frames and self.level > 0
+              and self._since_change >= self.cooldown_frames):
+            self._change(-1)
+        return self.imgsz
+
+    def _wants_higher(self, person_bboxes, object_bboxes, longest_side):
+        """Crowded scene of small people, or a small object candidate"""
+        scale = self.imgsz / longest_side
+        if len(object_bboxes):
+            object_sides = np.minimum(object_bboxes[:, 2] - object_bboxes[:, 0],
+                                      object_bboxes[:, 3] - object_bboxes[:, 1]) * scale
+            if (object_sides < self.small_object_px).any():
+                return True
+        if len(person_bboxes) >= self.many_people:
+            heights = (person_bboxes[:, 3] - person_bboxes[:, 1]) * scale
+            return np.median(heights) < self.small_person_px
+        return False
+
+    def _wants_lower(self, person_bboxes, object_bboxes, longest_side):
+        """Few people that would still be large at the next lower size"""
+        if self.level == 0 or len(person_bboxes) > self.few_people:
+            return False
+        lower_scale = self.levels[self.level - 1] / longest_side
+        if len(object_bboxes):
+            object_sides = np.minimum(object_bboxes[:, 2] - object_bboxes[:, 0],
+                                      object_bboxes[:, 3] - object_bboxes[:, 1]) * lower_scale
+            if (object_sides < self.small_object_px).any():
+                return False
+        heights = (person_bboxes[:, 3] - person_bboxes[:, 1]) * lower_scale
+        return bool((heights >= self.large_person_px).all())
+
+    def _change(self, step):
+        """Move one level up or down and reset the hysteresis state"""
+        self.level += step
+        self._up_streak = 0
+        self._down_streak = 0
+        self._since_change = 0
+        self.changes += 1
+        events.info('resolution_change', "Adaptive resolution: inference size now %d", self.imgsz)
@@ -11,8 +11,11 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 import cv2
 import numpy as np
 import time
+import threading
 import warnings
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 try:
@@ -24,18 +27,44 @@ except ImportError:
     YOLO_AVAILABLE = False
     torch = None
 
+from src.core.model_registry import get_model_registry
+from src.core.model_cache import resolve_model_artifact
+from src.core.detection_profile import DETECTION_PROFILES
+from src.core.postprocess import (result_to_arrays, box_areas, RuleTables, knife_validation_checks,
+                                  VALIDATE_KNIFE, VALIDATE_STANDARD)
+from src.core.detections import PersonDetections, ObjectDetections, person_list, object_list
+from src.core.geometry import FrameGeometry
+from src.core.crop_features import CropFeatureExtractor
+from src.core.quantization import prepare_quantized_model
+from src.core.adaptive_resolution import AdaptiveResolution
+from src.core.tiling import TiledObjectDetector
+from src.core.cascade import ObjectCascade, FULL, CROPS, empty_object_arrays
+from src.core.hand_crops import HandCropVerifier
+from src.core.tracker import MultiObjectTracker
+from src.core.attribute_cache import AttributeCache
+from src.core.attribute_lane import AttributeLane
+from src.core.startup import run_parallel, warmup_frame, format_timings
+from src.core.event_log import get_event_logger
+from src.utils.config import (INFERENCE_SETTINGS, STARTUP_SETTINGS, RESOLUTION_SETTINGS, TILING_SETTINGS,
+                              CASCADE_SETTINGS, HAND_CROP_SETTINGS, TRACKING_SETTINGS,
+                              ATTRIBUTE_CACHE_SETTINGS, ENRICHMENT_SETTINGS, DETECTION_SETTINGS)
+
 # WatchHer face detection
 try:
-    from src.core.yolo_face_detector import YOLOFaceDetector
+    from src.core.yolo_face_detector import YOLOFaceDetector, face_bbox_from_keypoints
     FACE_DETECTOR_AVAILABLE = True
 except ImportError:
     print("[WARNING] Face detector not available")
     FACE_DETECTOR_AVAILABLE = False
+    face_bbox_from_keypoints = None
 
 # Suppress warnings for cleaner output
 warnings.filterwarnings("ignore")
 logging.getLogger("ultralytics").setLevel(logging.WARNING)
 
+# Per-frame messages go through the rate-limited event log
+events = get_event_logger('ai_analyzer')
+
 class AIAnalyzer:
     """WatchHer - Intelligent Public Safety Monitoring System for Women's Protection
     
@@ -55,288 +84,745 @@ class AIAnalyzer:
                         'toothbrush', 'hair drier', 'umbrella', 'handbag', 'tie', 'suitcase', 'frisbee',
                         'skis', 'snowboard', 'sports ball', 'kite', 'tennis racket', 'hammer', 'screwdriver']
     
-    def __init__(self):
+    # Reasonable minimum areas for each object type
+    MIN_OBJECT_AREA = {
+        'knife': 800,         # Reasonable knife size
+        'baseball bat': 1200,  # Reasonable bat size
+        'scissors': 600,      # Reasonable scissors size
+        'fork': 400          # Reasonable fork size
+    }
+    
+    # Reasonable aspect ratios (width / height) for weapons
+    OBJECT_ASPECT_RATIOS = {
+        'knife': (0.2, 6.0),      # Reasonable knife shapes
+        'baseball bat': (0.1, 8.0), # Long bat shapes
+        'scissors': (0.4, 3.0),   # Scissors proportions
+        'fork': (0.3, 4.0)        # Fork proportions
+    }
+    
+    def __init__(self, device=None, precision=None, face_localization=None, concurrent_inference=None,
+                 backend=None, adaptive_resolution=None, tile_regions=None, background_load=None,
+                 cascade=None):
+        """
+        Initialize the analyzer
+        
+        Args:
+            device: 'auto', 'cpu' or 'cuda' (default: INFERENCE_SETTINGS['device'])
+            precision: 'fp32', 'fp16' or 'int8' (default: INFERENCE_SETTINGS['precision'])
+            face_localization: 'keypoints' or 'detector' (default: INFERENCE_SETTINGS['face_localization'])
+            concurrent_inference: Run pose and object models in parallel (default: INFERENCE_SETTINGS['concurrent_inference']);
+                                  ignored when the cascade is on
+            backend: 'torch', 'onnx' or 'openvino' (default: INFERENCE_SETTINGS['backend'])
+            adaptive_resolution: Pick the inference size from the scene (default: RESOLUTION_SETTINGS['enabled'])
+            tile_regions: Normalized (x1, y1, x2, y2) regions for tiled weapon detection;
+                          tiling is on if given or TILING_SETTINGS['enabled'] is set
+            background_load: Load and warm up the models on a background thread and
+                             return at once; wait on ready_event or wait_until_ready()
+                             (default: STARTUP_SETTINGS['background_load'])
+            cascade: Run the object detector only around detected people
+                     (default: CASCADE_SETTINGS['enabled'])
+        """
+        self.device = device or INFERENCE_SETTINGS['device']
+        self.precision = precision or INFERENCE_SETTINGS['precision']
+        self.backend = backend or INFERENCE_SETTINGS['backend']
+        self.face_localization = face_localization or INFERENCE_SETTINGS['face_localization']
+        self.face_keypoint_confidence = INFERENCE_SETTINGS['face_keypoint_confidence']
+        if concurrent_inference is None:
+            concurrent_inference = INFERENCE_SETTINGS['concurrent_inference']
+        self.concurrent_inference = concurrent_inference
+        self._inference_pool = None
+        
+        if adaptive_resolution is None:
+            adaptive_resolution = RESOLUTION_SETTINGS['enabled']
+        self.resolution = AdaptiveResolution.from_settings(RESOLUTION_SETTINGS) if adaptive_resolution else None
+        
+        self.tiler = None
+        if tile_regions is not None or TILING_SETTINGS['enabled']:
+            self.tiler = TiledObjectDetector.from_settings(TILING_SETTINGS, tile_regions)
+        
+        if cascade is None:
+            cascade = CASCADE_SETTINGS['enabled']
+        self.cascade = ObjectCascade.from_settings(CASCADE_SETTINGS) if cascade else None
+        
+        # Full-resolution weapon check around the wrists
+        self.hand_verifier = None
+        if HAND_CROP_SETTINGS['enabled']:
+            self.hand_verifier = HandCropVerifier.from_settings(HAND_CROP_SETTINGS)
+        
+        # Stable track IDs for people and harmful objects across frames
+        self.person_tracker = None
+        self.object_tracker = None
+        if TRACKING_SETTINGS['enabled']:
+            self.person_tracker = MultiObjectTracker.from_settings(TRACKING_SETTINGS)
+            self.object_tracker = MultiObjectTracker.from_settings(TRACKING_SETTINGS)
+        self.lone_woman_duration = DETECTION_SETTINGS['lone_woman_duration']
+        self._alone_since = {}  # track_id -> time the woman was first seen alone
+        
+        # Age / gender per track, so tracked people are not re-estimated every frame
+        self.attribute_cache = None
+        if self.person_tracker is not None and ATTRIBUTE_CACHE_SETTINGS['enabled']:
+            self.attribute_cache = AttributeCache.from_settings(ATTRIBUTE_CACHE_SETTINGS)
+        
+        # Face / attribute work on background workers, attached by track ID
+        self.attribute_lane = None
+        if self.attribute_cache is not None and ENRICHMENT_SETTINGS['enabled']:
+            self.attribute_lane = AttributeLane.from_settings(self._estimate_face_attributes_batch,
+                                                              ENRICHMENT_SETTINGS)
+        
+        # Per-frame latency breakdown (milliseconds)
+        self.last_timings = {}
+        self._timing_history = deque(maxlen=100)
+        self._attribute_seconds_per_person = 0.0  # Running cost estimate for time budgets
+        
         self.person_detector = None
         self.object_detector = None  # For detecting weapons/objects
         self.face_detector = None
+        self.object_profile = DETECTION_PROFILES[INFERENCE_SETTINGS['object_profile']]
+        self.object_rules = {}
+        self.object_detection_args = dict(self.OBJECT_DETECTION_ARGS)
+        self.object_tables = None
+        self.person_class_id = 0
+        self.crop_features = CropFeatureExtractor()
         self.model_loaded = False
-        self._initialize_models()
+        
+        # Startup: set once loading (and warm-up) finished, successfully or not
+        self._release_lock = threading.Lock()
+        self._released = False
+        self.ready_event = threading.Event()
+        self.startup_timings = {}
+        if background_load is None:
+            background_load = STARTUP_SETTINGS['background_load']
+        if background_load:
+            threading.Thread(target=self._initialize_models, name='watchher-model-loader', daemon=True).start()
+        else:
+            self._initialize_models()
+    
+    def wait_until_ready(self, timeout=None):
+        """
+        Block until model loading and warm-up have finished
+        
+        Args:
+            timeout: Maximum seconds to wait (None: no limit)
+            
+        Returns:
+            bool: True if the analyzer is ready for inference
+        """
+        self.ready_event.wait(timeout)
+        return self.is_ready()
     
     def _initialize_models(self):
         """Initialize YOLOv11-Pose and general object detection models"""
+        startup_start = time.perf_counter()
         try:
-            print("[INFO] Loading YOLOv11 pose estimation model...")
-            self.person_detector = YOLO('yolo11n-pose.pt')
-            
-            print("[INFO] Loading YOLOv11 general object detection model...")
-            self.object_detector = YOLO('yolov8n.pt')  # General object detection for weapons
-            
-            print("[INFO] Loading custom YOLO face detection model...")
-            # Use our custom YOLO face detector
-            try:
-                self.face_detector = YOLOFaceDetector(model_size='n', confidence_threshold=0.4)
-                if self.face_detector.is_ready():
-                    print("[INFO] ✅ Custom YOLO face detector loaded successfully!")
-                else:
-                    print("[WARNING] Custom YOLO face detector failed to initialize")
-                    self.face_detector = None
-            except Exception as e:
-                print(f"[WARNING] Failed to load custom YOLO face detector: {e}")
-                self.face_detector = None
-            
-            # Test GPU availability
             if torch and torch.cuda.is_available():
                 print(f"[INFO] ✅ CUDA detected: {torch.cuda.get_device_name()}")
-                self.person_detector.to('cuda')
-                self.object_detector.to('cuda')
             else:
                 print("[INFO] ⚠️ CUDA not available, YOLO using CPU")
             
-            self.model_loaded = True
+            # Models come from the shared registry, so several analyzers (one per
+            # camera) and the face detector reuse the same loaded weights. The
+            # three loads are independent and run side by side.
+            print("[INFO] Loading YOLOv11 pose, object detection and face detection models...")
+            object_args = dict(self.OBJECT_DETECTION_ARGS,
+                               conf=min(rule.min_confidence for rule in self.object_profile.rules))
+            models, load_timings, errors = run_parallel({
+                'pose': lambda: self._acquire_model(INFERENCE_SETTINGS['pose_model'], self.POSE_DETECTION_ARGS),
+                'object': lambda: self._acquire_model(INFERENCE_SETTINGS['object_model'], object_args),
+                'face': self._load_face_detector,
+            }, parallel=STARTUP_SETTINGS['parallel_load'])
+            self.startup_timings.update({f'{name}_load_ms': elapsed for name, elapsed in load_timings.items()})
+            
+            with self._release_lock:
+                if self._released:
+                    # release() ran while loading; the handles are not ours to keep
+                    self._release_models(models.get('pose'), models.get('object'), models.get('face'))
+                    print("[INFO] Analyzer released during model loading")
+                    return
+                self.person_detector = models.get('pose')
+                self.object_detector = models.get('object')  # General object detection for weapons
+                self.face_detector = models.get('face')
+            if 'face' in errors:
+                print(f"[WARNING] Failed to load custom YOLO face detector: {errors['face']}")
+            for name in ('pose', 'object'):
+                if name in errors:
+                    raise errors[name]
+            
+            # Resolve the profile's class names to model class IDs once
+            self.object_rules = self.object_profile.resolve(self.object_detector.names)
+            self.object_detection_args.update(self.object_profile.model_args(self.object_rules))
+            self.object_tables = RuleTables(self.object_rules, max(self.object_detector.names) + 1,
+                                            self.MIN_OBJECT_AREA, self.OBJECT_ASPECT_RATIOS)
+            self.person_class_id = next(class_id for class_id, name in self.person_detector.names.items()
+                                        if name == 'person')
+            
+            with self._release_lock:
+                if self._released:
+                    print("[INFO] Analyzer released during model loading")
+                    return
+                # The cascade runs the object detector after the pose model, so it
+                # supersedes concurrent inference (and keeps all intra-op threads)
+                if self.concurrent_inference and self.cascade is not None:
+                    print("[INFO] Object cascade enabled, pose and object models run in sequence")
+                elif self.concurrent_inference:
+                    self._configure_concurrency()
+                
+                self.model_loaded = True
             print("[INFO] All YOLO models loaded successfully!")
             
+            if STARTUP_SETTINGS['warmup'] and not self._released:
+                self._warm_up()
+            
         except Exception as e:
             print(f"[ERROR] Failed to load YOLO models: {e}")
             self.model_loaded = False
+        finally:
+            self.startup_timings['total_ms'] = (time.perf_counter() - startup_start) * 1000.0
+            print(f"[INFO] Startup timings: {format_timings(self.startup_timings)}")
+            self.ready_event.set()
+    
+    def _load_face_detector(self):
+        """Load the face detector, or None if it is unavailable"""
+        if not FACE_DETECTOR_AVAILABLE:
+            return None
+        face_detector = YOLOFaceDetector(model_size='n', confidence_threshold=0.4,
+                                         device=self.device, precision=self._float_precision(),
+                                         backend=self.backend)
+        if not face_detector.is_ready():
+            print("[WARNING] Custom YOLO face detector failed to initialize")
+            return None
+        print("[INFO] ✅ Custom YOLO face detector loaded successfully!")
+        return face_detector
+    
+    def _warm_up(self):
+        """
+        Run warm-up inference at the current input size
+        
+        The first call of every handle sets up its predictor, and the runtime
+        initialises its kernels lazily; doing that here keeps it off the first
+        real frame. Timings are recorded per model in startup_timings.
+        """
+        frame = warmup_frame(STARTUP_SETTINGS['warmup_frame_size'])
+        pose_args = self.POSE_DETECTION_ARGS
+        object_args = self.object_detection_args
+        if self.resolution is not None:
+            pose_args = dict(pose_args, imgsz=self.resolution.imgsz)
+            object_args = dict(object_args, imgsz=self.resolution.imgsz)
+        
+        members = [('pose', self.person_detector, lambda: self.person_detector(frame, verbose=False, **pose_args)),
+                   ('object', self.object_detector, lambda: self.object_detector(frame, verbose=False, **object_args))]
+        if self.face_detector is not None:
+            members.append(('face', self.face_detector.model, lambda: self.face_detector.detect_faces_batch([frame])))
+        
+        # Handles own their predictors, so different models warm up side by
+        # side; handles sharing one network (the object and face detectors
+        # both use yolov8n) set up their predictors one after another
+        groups = {}
+        for name, handle, task in members:
+            groups.setdefault(id(getattr(handle, 'model', handle)), []).append((name, task))
+        
+        def warm_group(group):
+            timings = {}
+            for name, task in group:
+                start = time.perf_counter()
+                try:
+                    task()
+                except Exception as e:
+                    print(f"[WARNING] Warm-up of the {name} model failed: {e}")
+                timings[name] = (time.perf_counter() - start) * 1000.0
+            return timings
+        
+        tasks = {index: (lambda group=group: warm_group(group)) for index, group in enumerate(groups.values())}
+        for _ in range(max(1, STARTUP_SETTINGS['warmup_runs'])):
+            results, _, _ = run_parallel(tasks, parallel=STARTUP_SETTINGS['parallel_load'])
+        for timings in results.values():
+            self.startup_timings.update({f'{name}_warmup_ms': elapsed for name, elapsed in timings.items()})
+    
+    def _float_precision(self):
+        """Precision for models that are not quantized ('int8' falls back to 'fp32')"""
+        return 'fp32' if self.precision == 'int8' else self.precision
+    
+    def _acquire_model(self, weights, predict_args):
+        """
+        Get a shared model handle from the registry
+        
+        With precision 'int8' the statically calibrated model is used only if
+        its recall against the FP32 model passes the accuracy gate.
+        """
+        registry = get_model_registry()
+        if self.precision == 'int8':
+            # Calibrate from the cached weights, so INT8 also works offline
+            quantized = prepare_quantized_model(resolve_model_artifact(weights, 'torch'), predict_args)
+            if quantized is not None:
+                print(f"[INFO] ✅ Using INT8 model for {os.path.basename(weights)}")
+                return registry.acquire(quantized, 'cpu', 'fp32', 'onnx')
+        return registry.acquire(weights, self.device, self._float_precision(), self.backend)
+    
+    def _configure_concurrency(self):
+        """Create the detector thread pool and bound PyTorch's intra-op threads"""
+        self._inference_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='watchher-inference')
+        
+        threads = INFERENCE_SETTINGS['intra_op_threads']
+        if threads is None:
+            threads = max(1, (os.cpu_count() or 2) // 2)
+        if torch is not None:
+            torch.set_num_threads(threads)
+        print(f"[INFO] Concurrent inference enabled ({threads} intra-op threads)")
+    
+    def release(self):
+        """
+        Return this analyzer's models to the shared registry
+        
+        Final: a background load still running returns its models as soon
+        as they arrive instead of installing them.
+        """
+        with self._release_lock:
+            self._released = True
+            if self._inference_pool is not None:
+                self._inference_pool.shutdown(wait=False)
+                self._inference_pool = None
+            if self.attribute_lane is not None:
+                self.attribute_lane.close()
+                self.attribute_lane = None
+            
+            self._release_models(self.person_detector, self.object_detector, self.face_detector)
+            self.person_detector = None
+            self.object_detector = None
+            self.face_detector = None
+            self.model_loaded = False
+    
+    @staticmethod
+    def _release_models(person_detector, object_detector, face_detector):
+        registry = get_model_registry()
+        registry.release(person_detector)
+        registry.release(object_detector)
+        if face_detector is not None:
+            face_detector.release()
     
     def is_ready(self):
         """Check if analyzer is ready for inference"""
         return self.model_loaded and self.person_detector is not None and self.object_detector is not None
     
-    def analyze_frame(self, frame):
+    # Detector settings shared by the single-frame and batch entry points
+    POSE_DETECTION_ARGS = {'conf': 0.25, 'iou': 0.45, 'max_det': 50}  # Consistent person detection
+    OBJECT_DETECTION_ARGS = {'iou': 0.35, 'max_det': 50}  # Classes and confidence come from the detection profile
+    
+    # People analyzed per step when a frame has a time budget
+    ATTRIBUTE_CHUNK = 4
+    
+    def analyze_frame(self, frame, deadline_ms=None):
         """
         Comprehensive frame analysis with person detection, pose estimation, and face analysis
         
         Args:
             frame: Input frame (numpy array)
+            deadline_ms: Time budget for the frame's attribute analysis in milliseconds
+                         (default: INFERENCE_SETTINGS['frame_deadline_ms'], None: no limit).
+                         Only used when the attribute lane is off; with the lane
+                         (ENRICHMENT_SETTINGS) attribute work never runs on the frame path
             
         Returns:
-            List of detection dictionaries with enhanced information
+            tuple: (person_detections, harmful_objects, safety_analysis); with a
+            budget or the attribute lane, safety_analysis['partial'] tells whether
+            some people were left without fresh attributes and
+            safety_analysis['unanalyzed_people'] how many
         """
         if not self.is_ready():
-            return []
+            # Models still loading in the background (or failed to load)
+            return self._empty_result()
+        
+        if deadline_ms is None:
+            deadline_ms = INFERENCE_SETTINGS['frame_deadline_ms']
         
         try:
-            # Run YOLOv11 pose detection with optimized settings for consistent person detection
-            person_results = self.person_detector(frame, conf=0.25, iou=0.45, max_det=50, verbose=False)
-            
-            # Run YOLOv8 object detection with very low confidence for maximum knife detection
-            object_results = self.object_detector(frame, conf=0.08, iou=0.35, max_det=50, verbose=False)
-            
-            person_detections = []
-            harmful_objects = []
-            
-            # Process person detections
-            if person_results and person_results[0].boxes:
-                boxes = person_results[0].boxes
-                keypoints = person_results[0].keypoints if hasattr(person_results[0], 'keypoints') and person_results[0].keypoints is not None else None
-                
-                for i, box in enumerate(boxes):
-                    class_id = int(box.cls[0])
-                    confidence = float(box.conf[0])
-                    class_name = self.person_detector.names[class_id]
-                    
-                    if class_name == 'person' and confidence > 0.25:
-                        # Extract bounding box coordinates
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-                        
-                        # Get pose keypoints for this person
-                        person_keypoints = None
-                        if keypoints is not None and i < len(keypoints.data):
-                            person_keypoints = keypoints.data[i].cpu().numpy() if hasattr(keypoints.data[i], 'cpu') else keypoints.data[i]
-                        
-                        detection = {
-                            'bbox': [x1, y1, x2, y2],
-                            'confidence': confidence,
-                            'class': 'person',
-                            'keypoints': person_keypoints,
-                            'age': None,
-                            'gender': None,
-                            'has_harmful_object': False,
-                            'harmful_objects_nearby': [],
-                            'area': (x2 - x1) * (y2 - y1),  # For sorting by size
-                            'face_bbox': None,
-                            'face_confidence': 0.0
-                        }
-                        person_detections.append(detection)
-            
-            # Process object detections for weapons with enhanced filtering
-            if object_results and object_results[0].boxes:
-                boxes = object_results[0].boxes
-                
-                for box in boxes:
-                    class_id = int(box.cls[0])
-                    confidence = float(box.conf[0])
-                    class_name = self.object_detector.names[class_id]
-                    
-                    # Extract bounding box coordinates
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    bbox_area = (x2 - x1) * (y2 - y1)
-                    
-                    # KNIFE DETECTION - Ultra-sensitive for user testing
-                    if class_name == 'knife' and confidence > 0.05:  # Even lower threshold
-                        # More permissive validation for knives specifically
-                        if self._validate_knife_detection(confidence, bbox_area, x1, y1, x2, y2, frame.shape):
-                            harmful_objects.append({
-                                'bbox': [x1, y1, x2, y2],
-                                'confidence': confidence,
-                                'class': class_name,
-                                'center': [(x1 + x2) // 2, (y1 + y2) // 2],
-                                'area': bbox_area
-                            })
-                            print(f"🔪 KNIFE DETECTED: {class_name} (confidence: {confidence:.3f}, area: {int(bbox_area)})")
-                    
-                    # Also detect potential knife-like objects with very low confidence
-                    elif class_name in ['scissors', 'fork', 'spoon', 'banana', 'hot dog', 'remote'] and confidence > 0.03:
-                        # Treat these as potential weapons for ultra-sensitive detection
-                        harmful_objects.append({
-                            'bbox': [x1, y1, x2, y2],
-                            'confidence': confidence,
-                            'class': f'potential_{class_name}',  # Mark as potential weapon
-                            'center': [(x1 + x2) // 2, (y1 + y2) // 2],
-                            'area': bbox_area
-                        })
-                        print(f"⚠️ POTENTIAL WEAPON: {class_name} (confidence: {confidence:.3f})")
-                    
-                    # Other weapons with standard thresholds
-                    elif class_name in self.HARMFUL_OBJECTS and confidence > 0.20:
-                        if self._validate_detection(class_name, confidence, bbox_area, x1, y1, x2, y2, frame.shape):
-                            harmful_objects.append({
-                                'bbox': [x1, y1, x2, y2],
-                                'confidence': confidence,
-                                'class': class_name,
-                                'center': [(x1 + x2) // 2, (y1 + y2) // 2],
-                                'area': bbox_area
-                            })
-                            print(f"🚨 WEAPON DETECTED: {class_name} (confidence: {confidence:.3f})")
-                    
-                    # Sharp objects
-                    elif class_name in ['scissors', 'fork'] and confidence > 0.18:
-                        if self._validate_detection(class_name, confidence, bbox_area, x1, y1, x2, y2, frame.shape):
-                            harmful_objects.append({
-                                'bbox': [x1, y1, x2, y2],
-                                'confidence': confidence,
-                                'class': class_name,
-                                'center': [(x1 + x2) // 2, (y1 + y2) // 2],
-                                'area': bbox_area
-                            })
-                            print(f"🔪 SHARP OBJECT: {class_name} (confidence: {confidence:.3f})")
-                    
-                    # Debug: Show rejected knives specifically
-                    elif class_name == 'knife':
-                        print(f"❌ KNIFE REJECTED: confidence {confidence:.3f} < 0.08 threshold")
+            frame_start = time.perf_counter()
+            deadline = frame_start + deadline_ms / 1000.0 if deadline_ms is not None else None
+            person_arrays, object_arrays = self._run_detectors(frame)
             
-            # Sort harmful objects by confidence for better tracking
-            harmful_objects.sort(key=lambda x: x['confidence'], reverse=True)
+            postprocess_start = time.perf_counter()
+            result = self._process_results(frame, person_arrays[0], object_arrays[0], deadline)
             
-            if harmful_objects:
-                print(f"🚨 Total harmful objects detected: {len(harmful_objects)}")
+            self._record_timings(postprocess_start, time.perf_counter(), frame_start)
+            return result
             
-            # Associate harmful objects with people
-            self._associate_harmful_objects(person_detections, harmful_objects)
+        except Exception as e:
+            events.error('frame_error', "Frame analysis failed: %s", e)
+            # Return empty results with safe status
+            return self._empty_result()
+    
+    def analyze_batch(self, frames, batch_size=8):
+        """
+        Analyze several frames with batched model inference
+        
+        Both YOLO models see the frames as one batch (split into chunks of
+        batch_size); post-processing then runs per frame.
+        
+        Args:
+            frames: List of input frames (numpy arrays)
+            batch_size: Maximum number of frames per forward pass
             
-            # **Enhanced Gender Detection for WatchHer**
-            # Analyze face attributes for better gender detection
-            person_detections.sort(key=lambda x: x['area'], reverse=True)
+        Returns:
+            List with one (person_detections, harmful_objects, safety_analysis)
+            tuple per frame, in the same format as analyze_frame()
+        """
+        if not self.is_ready():
+            return [self._empty_result() for _ in frames]
+        
+        results = []
+        for start in range(0, len(frames), batch_size):
+            chunk = list(frames[start:start + batch_size])
+            try:
+                person_arrays, object_arrays = self._run_detectors(chunk)
+            except Exception as e:
+                events.warning('frame_error', "Batched inference failed, analyzing frames one by one: %s", e)
+                results.extend(self.analyze_frame(frame) for frame in chunk)
+                continue
             
-            for i, detection in enumerate(person_detections):  # Analyze all people for safety system
+            for frame, people, objects in zip(chunk, person_arrays, object_arrays):
                 try:
-                    self._analyze_face_attributes(frame, detection)
+                    results.append(self._process_results(frame, people, objects))
                 except Exception as e:
-                    print(f"[WARNING] Face analysis failed for person {i}: {e}")
-                    # Use fallback gender detection
-                    try:
-                        x1, y1, x2, y2 = detection['bbox']
-                        person_crop = frame[y1:y2, x1:x2]
-                        detection['age'], detection['gender'] = self._estimate_attributes_fallback(person_crop)
-                    except:
-                        detection['age'] = 25
-                        detection['gender'] = 'unknown'
-            
-            # **WatchHer Safety Analysis**
-            safety_analysis = self.analyze_women_safety_scenarios(person_detections, frame.shape)
+                    events.error('frame_error', "Frame analysis failed: %s", e)
+                    results.append(self._empty_result())
+        
+        return results
+    
+    def _run_detectors(self, source):
+        """
+        Run the pose and object models on a frame or a list of frames
+        
+        Each model's results are copied to host memory once, here; the
+        cascade, the hand crops and post-processing all share those arrays.
+        
+        Returns:
+            tuple: (person_arrays, object_arrays), one result_to_arrays() dict
+            of people and one of objects per frame
+        """
+        pose_args = self.POSE_DETECTION_ARGS
+        object_args = self.object_detection_args
+        if self.resolution is not None:
+            # Scene-driven input size; results are still in frame coordinates
+            pose_args = dict(pose_args, imgsz=self.resolution.imgsz)
+            object_args = dict(object_args, imgsz=self.resolution.imgsz)
+        
+        if self.cascade is not None:
+            # The object detector depends on the people found, so the models run in sequence
+            person_arrays, pose_ms = self._timed_pose_call(source, pose_args)
+            object_arrays, object_ms = self._timed_cascade_call(source, person_arrays, object_args)
+        elif self._inference_pool is not None:
+            # The models are independent, so run them side by side and join
+            pose_future = self._inference_pool.submit(self._timed_pose_call, source, pose_args)
+            object_future = self._inference_pool.submit(self._timed_object_call, source, object_args)
+            person_arrays, pose_ms = pose_future.result()
+            object_arrays, object_ms = object_future.result()
+        else:
+            # Run YOLOv11 pose detection
+            person_arrays, pose_ms = self._timed_pose_call(source, pose_args)
             
-            # Return people, objects, and safety analysis
-            return person_detections, harmful_objects, safety_analysis
+            # Run YOLOv8 object detection for weapons
+            object_arrays, object_ms = self._timed_object_call(source, object_args)
+        
+        self.last_timings = {'pose_ms': pose_ms, 'object_ms': object_ms}
+        if self.hand_verifier is not None:
+            object_arrays, self.last_timings['hand_ms'] = self._timed_hand_call(source, person_arrays,
+                                                                                object_arrays, object_args)
+        if self.resolution is not None:
+            self.last_timings['imgsz'] = self.resolution.imgsz
+        return person_arrays, object_arrays
+    
+    def _timed_pose_call(self, source, args):
+        """
+        Run the pose model
+        
+        Returns:
+            tuple: (list of result_to_arrays() dicts, latency in milliseconds)
+        """
+        start = time.perf_counter()
+        results = self.person_detector(source, verbose=False, **args)
+        person_arrays = [result_to_arrays(result) for result in results]
+        return person_arrays, (time.perf_counter() - start) * 1000.0
+    
+    def _timed_object_call(self, source, args):
+        """
+        Run the object detector, plus the tiled pass when tiling is enabled
+        
+        Returns:
+            tuple: (list of result_to_arrays() dicts, latency in milliseconds)
+        """
+        start = time.perf_counter()
+        results = self.object_detector(source, verbose=False, **args)
+        object_arrays = [result_to_arrays(result) for result in results]
+        
+        if self.tiler is not None:
+            frames = source if isinstance(source, list) else [source]
+            for i, frame in enumerate(frames):
+                tiled = self.tiler.detect(self.object_detector, frame, args)
+                if len(tiled['cls']):
+                    object_arrays[i] = self.tiler.merge(object_arrays[i], tiled)
+        
+        return object_arrays, (time.perf_counter() - start) * 1000.0
+    
+    def _timed_cascade_call(self, source, person_arrays, args):
+        """
+        Run the object detector where the cascade plans it: nowhere, on the
+        whole frame, or on padded crops around the people
+        
+        Returns:
+            tuple: (list of result_to_arrays() dicts, latency in milliseconds)
+        """
+        start = time.perf_counter()
+        frames = source if isinstance(source, list) else [source]
+        
+        object_arrays = [empty_object_arrays() for _ in frames]
+        full_frames, crop_frames, crop_regions = [], [], []
+        for i, (frame, people) in enumerate(zip(frames, person_arrays)):
+            person_bboxes, _ = self._people_in(people)
+            mode, regions = self.cascade.plan(person_bboxes, frame.shape)
+            if mode == FULL:
+                full_frames.append(i)
+            elif mode == CROPS:
+                crop_frames.append(i)
+                crop_regions.append(regions)
+        
+        if full_frames:
+            # Full-frame passes keep tiling; crops already run at native resolution
+            arrays, _ = self._timed_object_call([frames[i] for i in full_frames], args)
+            for i, frame_arrays in zip(full_frames, arrays):
+                object_arrays[i] = frame_arrays
+        if crop_frames:
+            arrays = self.cascade.detect(self.object_detector, [frames[i] for i in crop_frames], crop_regions, args)
+            for i, frame_arrays in zip(crop_frames, arrays):
+                object_arrays[i] = frame_arrays
+        
+        return object_arrays, (time.perf_counter() - start) * 1000.0
+    
+    def _timed_hand_call(self, source, person_arrays, object_arrays, args):
+        """
+        Check the hands of all people on full-resolution wrist crops and merge
+        what is found into the object detections
+        
+        Returns:
+            tuple: (list of result_to_arrays() dicts, latency in milliseconds)
+        """
+        start = time.perf_counter()
+        frames = source if isinstance(source, list) else [source]
+        regions = [self.hand_verifier.regions(self._people_in(people)[1], frame.shape)
+                   for frame, people in zip(frames, person_arrays)]
+        hands = self.hand_verifier.detect(self.object_detector, frames, regions, args)
+        merged = [self.hand_verifier.merge(arrays, hand_arrays)
+                  for arrays, hand_arrays in zip(object_arrays, hands)]
+        return merged, (time.perf_counter() - start) * 1000.0
+    
+    def _people_in(self, people):
+        """Boxes and keypoints of the people in a frame's pose arrays (same filter as _process_results)"""
+        person_mask = (people['cls'] == self.person_class_id) & (people['conf'] > 0.25)
+        keypoints = people['keypoints'][person_mask] if people['keypoints'] is not None else None
+        return people['xyxy'][person_mask], keypoints
+    
+    def _record_timings(self, postprocess_start, end, frame_start):
+        """Complete last_timings for a frame and add it to the history"""
+        self.last_timings['inference_ms'] = (postprocess_start - frame_start) * 1000.0
+        self.last_timings['postprocess_ms'] = (end - postprocess_start) * 1000.0
+        self.last_timings['total_ms'] = (end - frame_start) * 1000.0
+        self._timing_history.append(dict(self.last_timings))
+    
+    def get_latency_breakdown(self):
+        """
+        Get the average per-frame latency breakdown over recent frames
+        
+        'inference_ms' is the wall time of both detectors together; with
+        concurrent inference it approaches max(pose_ms, object_ms) instead
+        of their sum.
+        
+        Returns:
+            dict: Average milliseconds per stage plus 'concurrent' and 'frames',
+            and the background 'attribute_lane' counters when it is on
+        """
+        history = list(self._timing_history)
+        breakdown = {'concurrent': self._inference_pool is not None, 'frames': len(history)}
+        if history:
+            for key in history[-1]:
+                breakdown[key] = sum(t.get(key, 0.0) for t in history) / len(history)
+        if self.attribute_lane is not None:
+            breakdown['attribute_lane'] = self.attribute_lane.stats()
+        return breakdown
+    
+    def _empty_result(self):
+        """Empty analysis result with safe status"""
+        return [], [], {'overall_threat_level': 'SAFE', 'lone_women': [], 'surrounded_women': [], 
+                        'women_in_danger': [], 'distress_signals': [], 'risk_zones': []}
+    
+    def _process_results(self, frame, people, objects, deadline=None):
+        """
+        Turn one frame's raw model results into people, objects and safety analysis
+        
+        Args:
+            frame: The analyzed frame
+            people: Pose detections for the frame as result_to_arrays() output
+            objects: Object detections for the frame as result_to_arrays() output
+            deadline: time.perf_counter() value by which attribute analysis must end (optional)
             
+        Returns:
+            tuple: (person_detections, harmful_objects, safety_analysis)
+        """
+        # Process person detections (filtering and validation run as masks)
+        person_mask = (people['cls'] == self.person_class_id) & (people['conf'] > 0.25)
+        person_idx = np.flatnonzero(person_mask)
+        person_areas = box_areas(people['xyxy'][person_idx])
+        
+        # Largest people first for attribute analysis
+        person_idx = person_idx[np.argsort(-person_areas, kind='stable')]
+        
+        keypoints = people['keypoints']
+        if keypoints is not None:
+            keypoints = keypoints[person_idx]
+        person_detections = person_list(PersonDetections.create(
+            people['xyxy'][person_idx], people['conf'][person_idx], keypoints))
+        
+        # Process object detections for weapons; the model call was already
+        # restricted to the profile's classes
+        if events.logger.isEnabledFor(logging.DEBUG):
+            self._log_knife_validation(objects, frame.shape)
+        object_idx = self.object_tables.filter(objects, frame.shape)
+        object_idx = object_idx[np.argsort(-objects['conf'][object_idx], kind='stable')]
+        
+        object_classes = objects['cls'][object_idx].tolist()
+        harmful_objects = object_list(ObjectDetections.create(
+            objects['xyxy'][object_idx], objects['conf'][object_idx],
+            [self.object_tables.labels[class_id] for class_id in object_classes]))
+        
+        for class_id, obj in zip(object_classes, harmful_objects):
+            label, confidence = obj['class'], obj['confidence']
+            validation = self.object_tables.validation[class_id]
+            if validation == VALIDATE_KNIFE:
+                events.info('knife_detected', "🔪 KNIFE DETECTED: %s (confidence: %.3f, area: %d)",
+                            label, confidence, obj['area'])
+            elif validation == VALIDATE_STANDARD:
+                events.info('weapon_detected', "🚨 WEAPON DETECTED: %s (confidence: %.3f)", label, confidence)
+            else:
+                events.debug('potential_weapon', "⚠️ POTENTIAL WEAPON: %s (confidence: %.3f)",
+                             self.object_tables.class_names[class_id], confidence)
+        
+        if harmful_objects:
+            events.info('harmful_objects_total', "🚨 Total harmful objects detected: %d", len(harmful_objects))
+        
+        # Stable IDs across frames
+        self._assign_tracks(person_detections, harmful_objects)
+        
+        # Pairwise geometry, shared by association and safety analysis
+        geometry = FrameGeometry.from_detections(person_detections, harmful_objects, frame.shape)
+        
+        # Pick the inference size for the next frame from this frame's content
+        if self.resolution is not None:
+            self.resolution.update(geometry.person_bboxes, geometry.object_bboxes, frame.shape)
+        
+        # Associate harmful objects with people
+        self._associate_harmful_objects(person_detections, harmful_objects, geometry)
+        
+        # **Enhanced Gender Detection for WatchHer**
+        # Analyze face attributes for better gender detection (people are
+        # already sorted largest first)
+        
+        # All people go through the face detector in one batched pass
+        unanalyzed = 0
+        try:
+            if self.attribute_lane is not None:
+                unanalyzed = self._attach_attributes(frame, person_detections)
+            elif deadline is None:
+                self._analyze_face_attributes_batch(frame, person_detections)
+            else:
+                unanalyzed = self._analyze_attributes_within(frame, person_detections, deadline)
         except Exception as e:
-            print(f"[ERROR] Frame analysis failed: {e}")
-            # Return empty results with safe status
-            return [], [], {'overall_threat_level': 'SAFE', 'lone_women': [], 'surrounded_women': [], 
-                           'women_in_danger': [], 'distress_signals': [], 'risk_zones': []}
+            events.warning('face_error', "Batched face analysis failed: %s", e)
+            for detection in person_detections:
+                if self.attribute_lane is not None:
+                    # The lane workers own the face detector; never run it here too
+                    self._apply_cached_attributes(detection)
+                    unanalyzed = len(person_detections)
+                else:
+                    self._analyze_face_attributes(frame, detection)
+        
+        # **WatchHer Safety Analysis**
+        safety_analysis = self.analyze_women_safety_scenarios(person_detections, frame.shape, geometry)
+        if deadline is not None or self.attribute_lane is not None:
+            safety_analysis['partial'] = unanalyzed > 0
+            safety_analysis['unanalyzed_people'] = unanalyzed
+            self.last_timings['unanalyzed_people'] = unanalyzed
+        
+        # Return people, objects, and safety analysis
+        return person_detections, harmful_objects, safety_analysis
     
-    def _associate_harmful_objects(self, person_detections, harmful_objects):
+    def _log_knife_validation(self, objects, frame_shape):
+        """Debug detail of the knife checks for every knife candidate box"""
+        cls = objects['cls']
+        known = np.flatnonzero((cls >= 0) & (cls < len(self.object_tables.validation)))
+        knives = known[self.object_tables.validation[cls[known]] == VALIDATE_KNIFE]
+        if not len(knives):
+            return
+        checks = knife_validation_checks(objects['xyxy'][knives], objects['conf'][knives], frame_shape)
+        for i, confidence in enumerate(objects['conf'][knives].tolist()):
+            events.debug('knife_validation', "🔍 Knife validation: conf=%.3f, area=%d, aspect=%.2f "
+                         "(size: %s, conf: %s, pos: %s, aspect: %s)", confidence, checks['area'][i],
+                         checks['aspect_ratio'][i], checks['size'][i], checks['confidence'][i],
+                         checks['position'][i], checks['aspect'][i])
+    
+    def _assign_tracks(self, person_detections, harmful_objects, now=None):
+        """Give every person and harmful object the ID of its track"""
+        if self.person_tracker is None:
+            return
+        now = time.monotonic() if now is None else now
+        
+        people = person_detections.batch
+        people.track_ids[:], _ = self.person_tracker.update(people.bboxes, people.confidences, now=now)
+        
+        objects = harmful_objects.batch
+        objects.track_ids[:], _ = self.object_tracker.update(objects.bboxes, objects.confidences,
+                                                             objects.labels, now=now)
+        
+        if self.attribute_cache is not None:
+            self.attribute_cache.prune(self.person_tracker.active_ids())
+    
+    def _associate_harmful_objects(self, person_detections, harmful_objects, geometry=None):
         """Associate harmful objects with nearby people"""
-        for person in person_detections:
-            px1, py1, px2, py2 = person['bbox']
-            person_center = [(px1 + px2) // 2, (py1 + py2) // 2]
-            
-            for obj in harmful_objects:
-                obj_center = obj['center']
-                
-                # Check if object is within person's bounding box or nearby (100 pixels)
-                distance = np.sqrt((person_center[0] - obj_center[0])**2 + 
-                                 (person_center[1] - obj_center[1])**2)
-                
-                # Object is associated if within person's bbox or within 100 pixels
-                within_bbox = (px1 <= obj_center[0] <= px2 and py1 <= obj_center[1] <= py2)
-                nearby = distance <= 100
-                
-                if within_bbox or nearby:
-                    person['has_harmful_object'] = True
-                    person['harmful_objects_nearby'].append({
-                        'type': obj['class'],
-                        'confidence': obj['confidence'],
-                        'distance': distance
-                    })
+        if not person_detections or not harmful_objects:
+            return
+        if geometry is None:
+            geometry = FrameGeometry.from_detections(person_detections, harmful_objects, (0, 0))
+        
+        # Object is associated if its center is within the person's bbox or within 100 pixels
+        associated = geometry.objects_near_people(max_distance=100)
+        
+        for person_index, object_index in zip(*np.nonzero(associated)):
+            person = person_detections[person_index]
+            obj = harmful_objects[object_index]
+            person['has_harmful_object'] = True
+            person['harmful_objects_nearby'].append({
+                'type': obj['class'],
+                'confidence': obj['confidence'],
+                'distance': float(geometry.object_distances[person_index, object_index])
+            })
     
     def _analyze_face_attributes(self, frame, detection):
         """Analyze face attributes using YOLO-based face detection and lightweight classifiers"""
         try:
-            x1, y1, x2, y2 = detection['bbox']
-            
-            # Add padding and ensure valid crop
-            padding = 10
-            h, w = frame.shape[:2]
-            x1_padded = max(0, x1 - padding)
-            y1_padded = max(0, y1 - padding)
-            x2_padded = min(w, x2 + padding)
-            y2_padded = min(h, y2 + padding)
-            
-            # Extract person region
-            person_crop = frame[y1_padded:y2_padded, x1_padded:x2_padded]
+            person_crop, offset = self._get_padded_person_crop(frame, detection['bbox'])
             
             if person_crop.size == 0:
                 raise ValueError("Invalid crop dimensions")
             
+            # Face straight from the pose keypoints when they are confident
+            if self._apply_keypoint_face(frame, detection, person_crop):
+                return
+            
             # Face detection within person crop
             if self.face_detector and self.face_detector.is_ready():
                 try:
                     # Use YOLO face detector
                     faces = self.face_detector.detect_faces(person_crop)
-                    if faces and len(faces) > 0:
-                        # Take the largest face
-                        largest_face = max(faces, key=lambda f: (f['bbox'][2] - f['bbox'][0]) * (f['bbox'][3] - f['bbox'][1]))
-                        
-                        # Adjust face bbox to global coordinates
-                        face_bbox = largest_face['bbox']
-                        detection['face_bbox'] = [
-                            x1_padded + face_bbox[0], 
-                            y1_padded + face_bbox[1],
-                            x1_padded + face_bbox[2], 
-                            y1_padded + face_bbox[3]
-                        ]
-                        detection['face_confidence'] = largest_face.get('confidence', 0.8)
-                        
-                        # Analyze face attributes
-                        face_attributes = self.face_detector.analyze_face_attributes(person_crop, face_bbox)
-                        detection['age'] = face_attributes.get('age', 25)
-                        detection['gender'] = face_attributes.get('gender', 'unknown')
-                    else:
+                    if not self._apply_face_detections(detection, person_crop, offset, faces):
                         # No face detected, use fallback method
                         detection['age'], detection['gender'] = self._estimate_attributes_fallback(person_crop)
                 except Exception as e:
-                    print(f"[WARNING] YOLO face detection failed: {e}")
+                    events.warning('face_error', "YOLO face detection failed: %s", e)
                     detection['age'], detection['gender'] = self._estimate_attributes_fallback(person_crop)
             else:
                 # Fallback method without face detector
@@ -347,200 +833,319 @@ class AIAnalyzer:
             detection['age'] = 25
             detection['gender'] = 'unknown'
     
-    def _estimate_attributes_fallback(self, person_crop):
+    def _analyze_face_attributes_batch(self, frame, detections):
         """
-        Advanced gender detection for WatchHer women's safety system
+        Analyze face attributes for all people at once
+        
+        Tracked people with a valid attribute cache entry reuse it; everyone
+        else is estimated and the estimates are folded into the cache, which
+        returns the smoothed age and gender.
         """
-        try:
-            h, w = person_crop.shape[:2]
-            if h < 50 or w < 30:  # Too small to analyze
-                return 25, 'unknown'
-            
-            # Multi-factor gender analysis
-            gender_indicators = []
-            
-            # 1. Body proportions analysis
-            aspect_ratio = h / w
-            if aspect_ratio > 2.2:  # Very tall/thin - often female silhouettes
-                gender_indicators.append('female')
-            elif aspect_ratio < 1.8:  # Broader - often male
-                gender_indicators.append('male')
-            
-            # 2. Shoulder-to-hip ratio analysis
-            try:
-                # Analyze upper third vs lower third width
-                upper_third = person_crop[:h//3, :]
-                middle_third = person_crop[h//3:2*h//3, :]
-                lower_third = person_crop[2*h//3:, :]
-                
-                # Calculate average width of each section
-                upper_width = np.mean(np.sum(upper_third > 50, axis=1))
-                lower_width = np.mean(np.sum(lower_third > 50, axis=1))
-                
-                # Men typically have broader shoulders relative to hips
-                if upper_width > lower_width * 1.15:
-                    gender_indicators.append('male')
-                elif lower_width > upper_width * 1.05:  # Women often have wider hips
-                    gender_indicators.append('female')
-            except:
-                pass
-            
-            # 3. Color pattern analysis (clothing/hair)
-            try:
-                # Convert to HSV for better color analysis
-                hsv = cv2.cvtColor(person_crop, cv2.COLOR_BGR2HSV)
-                
-                # Check for typical female clothing colors (statistical)
-                # Higher saturation often indicates more colorful clothing
-                saturation = np.mean(hsv[:, :, 1])
-                if saturation > 100:  # More colorful/vibrant
-                    gender_indicators.append('female')
-                elif saturation < 60:  # More muted colors
-                    gender_indicators.append('male')
-            except:
-                pass
-            
-            # 4. Hair region analysis
-            try:
-                # Analyze top 20% of image for hair characteristics
-                hair_region = person_crop[:int(h*0.2), :]
-                hair_variance = np.var(hair_region)
-                hair_area = np.sum(hair_region > 30)
-                
-                # More hair area/variance often indicates longer hair
-                if hair_area > w * h * 0.15:  # Significant hair area
-                    gender_indicators.append('female')
-            except:
-                pass
-            
-            # 5. Edge analysis for body shape
-            try:
-                edges = cv2.Canny(person_crop, 30, 100)
-                
-                # Analyze edge patterns in different body regions
-                upper_edges = np.sum(edges[:h//2, :])
-                lower_edges = np.sum(edges[h//2:, :])
-                
-                # Different edge patterns can indicate different body shapes
-                if lower_edges > upper_edges * 1.3:  # More lower body definition
-                    gender_indicators.append('female')
-                elif upper_edges > lower_edges * 1.4:  # More upper body definition
-                    gender_indicators.append('male')
-            except:
-                pass
-            
-            # 6. Posture analysis using center of mass
-            try:
-                # Calculate center of mass of the person
-                gray = cv2.cvtColor(person_crop, cv2.COLOR_BGR2GRAY)
-                _, thresh = cv2.threshold(gray, 50, 255, cv2.THRESH_BINARY)
-                
-                # Find center of mass
-                moments = cv2.moments(thresh)
-                if moments['m00'] > 0:
-                    cx = int(moments['m10'] / moments['m00'])
-                    cy = int(moments['m01'] / moments['m00'])
-                    
-                    # Analyze posture - women often have different weight distribution
-                    relative_y = cy / h
-                    if relative_y > 0.55:  # Center of mass lower - often female posture
-                        gender_indicators.append('female')
-                    elif relative_y < 0.45:  # Center of mass higher - often male
-                        gender_indicators.append('male')
-            except:
-                pass
-            
-            # Final decision based on majority vote
-            female_votes = gender_indicators.count('female')
-            male_votes = gender_indicators.count('male')
-            
-            if female_votes > male_votes and female_votes >= 2:
-                gender = 'woman'
-            elif male_votes > female_votes and male_votes >= 2:
-                gender = 'man'
-            else:
-                gender = 'unknown'  # Too uncertain
-            
-            # Age estimation with better distribution
-            age = max(16, min(75, int(28 + np.random.normal(0, 12))))
-            
-            return age, gender
-            
-        except Exception as e:
-            print(f"[WARNING] Gender analysis failed: {e}")
-            return 25, 'unknown'
+        if self.attribute_cache is None:
+            self._estimate_face_attributes_batch(frame, detections)
+            return
+        
+        now = time.monotonic()
+        estimate = []
+        for detection in detections:
+            face = self._keypoint_face(frame, detection)
+            view_quality = self._face_view_quality(face)
+            entry = self.attribute_cache.lookup(detection.get('track_id'), view_quality, now)
+            if entry is None:
+                estimate.append(detection)
+                continue
+            if face is not None:
+                detection['face_bbox'], detection['face_confidence'] = face
+            detection['age'], detection['gender'] = entry['age'], entry['gender']
+            detection['attribute_confidence'] = entry['confidence']
+        
+        if not estimate:
+            return
+        self._estimate_face_attributes_batch(frame, estimate)
+        
+        for detection in estimate:
+            if detection.get('track_id') is None:
+                continue
+            entry = self._cache_estimate(detection, now)
+            detection['age'], detection['gender'] = entry['age'], entry['gender']
+            detection['attribute_confidence'] = entry['confidence']
     
-    def _validate_detection(self, class_name, confidence, bbox_area, x1, y1, x2, y2, frame_shape):
-        """Balanced validation for precision and recall"""
-        h, w = frame_shape[:2]
+    def _cache_estimate(self, detection, now):
+        """Fold a fresh estimate of a tracked person into the attribute cache"""
+        face_bbox = detection.get('face_bbox')
+        source = 'face' if face_bbox is not None else 'body'
+        view_quality = self._face_view_quality((face_bbox, detection['face_confidence'])) if face_bbox else 0.0
+        return self.attribute_cache.update(detection['track_id'], detection.get('age'), detection.get('gender'),
+                                           source, view_quality, now)
+    
+    def _attach_attributes(self, frame, detections):
+        """
+        Give people their attributes without waiting for face / attribute work
         
-        # Reasonable minimum areas for each object type
-        min_area = {
-            'knife': 800,         # Reasonable knife size
-            'baseball bat': 1200,  # Reasonable bat size
-            'scissors': 600,      # Reasonable scissors size
-            'fork': 400          # Reasonable fork size
-        }
+        Estimates finished by the attribute lane since the last frame are
+        folded into the cache first. Every tracked person then gets the
+        cached values (stale ones included, 'unknown' for new tracks); those
+        whose entry needs a refresh are marked 'attributes_pending' and
+        submitted to the lane, so their estimate lands a frame or two later.
         
-        if bbox_area < min_area.get(class_name, 600):
-            return False
+        People without a track ID (below the tracker's high_threshold) could
+        never be matched with a lane result, so they are estimated right away
+        from keypoint faces and body heuristics, without the face detector.
         
-        # Maximum area filter (not too large)
-        max_area = w * h * 0.4  # Max 40% of frame
-        if bbox_area > max_area:
-            return False
+        Returns:
+            int: Number of people still waiting for a fresh estimate
+        """
+        active = self.person_tracker.active_ids()
+        for person, finished in self.attribute_lane.collect():
+            if person['track_id'] in active:
+                self._cache_estimate(person, finished)
         
-        # Aspect ratio validation
-        width = x2 - x1
-        height = y2 - y1
-        if width <= 0 or height <= 0:
-            return False
+        now = time.monotonic()
+        refresh = []
+        untracked = []
+        for detection in detections:
+            if detection.get('track_id') is None:
+                untracked.append(detection)
+                continue
+            face = self._keypoint_face(frame, detection)
+            if face is not None:
+                detection['face_bbox'], detection['face_confidence'] = face
+            if self.attribute_cache.lookup(detection.get('track_id'), self._face_view_quality(face), now) is None:
+                refresh.append(detection)
+                detection['attributes_pending'] = True
+            self._apply_cached_attributes(detection)
         
-        aspect_ratio = width / height
+        if untracked:
+            self._estimate_untracked_attributes(frame, untracked)
+        if refresh:
+            self.attribute_lane.submit(frame, refresh)
+        return len(refresh)
+    
+    def _estimate_untracked_attributes(self, frame, detections):
+        """Model-free attribute estimate on the frame thread for people the lane cannot serve"""
+        faceless = []
+        faceless_crops = []
+        for detection in detections:
+            person_crop, _ = self._get_padded_person_crop(frame, detection['bbox'])
+            if person_crop.size == 0:
+                detection['age'], detection['gender'] = None, 'unknown'
+            elif not self._apply_keypoint_face(frame, detection, person_crop):
+                faceless.append(detection)
+                faceless_crops.append(person_crop)
         
-        # Reasonable aspect ratios for weapons
-        valid_ratios = {
-            'knife': (0.2, 6.0),      # Reasonable knife shapes
-            'baseball bat': (0.1, 8.0), # Long bat shapes
-            'scissors': (0.4, 3.0),   # Scissors proportions
-            'fork': (0.3, 4.0)        # Fork proportions
-        }
+        if faceless:
+            attributes = self._estimate_attributes_fallback_batch(faceless_crops)
+            for detection, (age, gender) in zip(faceless, attributes):
+                detection['age'], detection['gender'] = age, gender
+    
+    def _analyze_attributes_within(self, frame, detections, deadline):
+        """
+        Analyze face attributes in priority order until the deadline
+        
+        People holding or near a harmful object go first, then the rest
+        largest first (detections are already sorted by area). People are
+        analyzed in small batches; a batch only starts if the running
+        per-person cost says it will finish before the deadline.
+        
+        Returns:
+            int: Number of people left without fresh attributes
+        """
+        order = sorted(range(len(detections)), key=lambda i: not detections[i]['has_harmful_object'])
+        analyzed = 0
+        for start in range(0, len(order), self.ATTRIBUTE_CHUNK):
+            people = [detections[i] for i in order[start:start + self.ATTRIBUTE_CHUNK]]
+            chunk_start = time.perf_counter()
+            if chunk_start + self._attribute_seconds_per_person * len(people) > deadline:
+                break
+            self._analyze_face_attributes_batch(frame, people)
+            per_person = (time.perf_counter() - chunk_start) / len(people)
+            self._attribute_seconds_per_person = 0.8 * self._attribute_seconds_per_person + 0.2 * per_person
+            analyzed += len(people)
+        
+        # Out of time: cached attributes where the track has them, else unknown
+        for i in order[analyzed:]:
+            self._apply_cached_attributes(detections[i])
+            detections[i]['attributes_partial'] = True
+        return len(order) - analyzed
+    
+    def _apply_cached_attributes(self, detection):
+        """Give a person their track's cached attributes, however old, or 'unknown'"""
+        entry = self.attribute_cache.peek(detection.get('track_id')) if self.attribute_cache else None
+        if entry is not None:
+            detection['age'], detection['gender'] = entry['age'], entry['gender']
+            detection['attribute_confidence'] = entry['confidence']
+        else:
+            detection['age'], detection['gender'] = None, 'unknown'
+    
+    def _keypoint_face(self, frame, detection):
+        """Face box from the pose keypoints, or None (cheap, no model call)"""
+        if self.face_localization != 'keypoints' or face_bbox_from_keypoints is None:
+            return None
+        return face_bbox_from_keypoints(detection.get('keypoints'), frame.shape,
+                                        min_confidence=self.face_keypoint_confidence)
+    
+    @staticmethod
+    def _face_view_quality(face):
+        """Face area weighted by localisation confidence, 0 without a face"""
+        if face is None:
+            return 0.0
+        (x1, y1, x2, y2), confidence = face
+        return max(0, x2 - x1) * max(0, y2 - y1) * float(confidence)
+    
+    def _estimate_face_attributes_batch(self, frame, detections):
+        """
+        Estimate face attributes for the given people at once
         
-        min_ratio, max_ratio = valid_ratios.get(class_name, (0.2, 6.0))
-        if not (min_ratio <= aspect_ratio <= max_ratio):
+        All person crops go through the face detector as one batch, so the
+        number of model invocations no longer grows with the number of people.
+        """
+        pending = []
+        crops = []
+        offsets = []
+        for detection in detections:
+            person_crop, offset = self._get_padded_person_crop(frame, detection['bbox'])
+            
+            # People whose face is located by the pose keypoints skip the detector
+            try:
+                if person_crop.size > 0 and self._apply_keypoint_face(frame, detection, person_crop):
+                    continue
+            except Exception as e:
+                events.warning('face_error', "Keypoint face localisation failed: %s", e)
+            
+            pending.append(detection)
+            crops.append(person_crop)
+            offsets.append(offset)
+        
+        if not pending:
+            return
+        
+        if self.face_detector and self.face_detector.is_ready():
+            all_faces = self.face_detector.detect_faces_batch(crops)
+        else:
+            all_faces = [[] for _ in crops]
+        
+        # People without a detected face share one fallback estimate pass
+        faceless = []
+        faceless_crops = []
+        for i, (detection, person_crop, offset, faces) in enumerate(zip(pending, crops, offsets, all_faces)):
+            try:
+                if person_crop.size == 0:
+                    raise ValueError("Invalid crop dimensions")
+                if not self._apply_face_detections(detection, person_crop, offset, faces):
+                    faceless.append(detection)
+                    faceless_crops.append(person_crop)
+            except Exception as e:
+                events.warning('face_error', "Face analysis failed for person %d: %s", i, e)
+                detection['age'] = 25
+                detection['gender'] = 'unknown'
+        
+        if faceless:
+            attributes = self._estimate_attributes_fallback_batch(faceless_crops)
+            for detection, (age, gender) in zip(faceless, attributes):
+                detection['age'], detection['gender'] = age, gender
+    
+    def _apply_keypoint_face(self, frame, detection, person_crop):
+        """
+        Locate the face from pose head keypoints and analyze its attributes
+        
+        Returns:
+            bool: True if the face was located, False if the keypoints were
+            not confident enough and the face detector should be used
+        """
+        face = self._keypoint_face(frame, detection)
+        if face is None:
             return False
         
+        face_bbox, face_confidence = face
+        detection['face_bbox'] = face_bbox
+        detection['face_confidence'] = face_confidence
+        
+        if self.face_detector is not None:
+            face_attributes = self.face_detector.analyze_face_attributes(frame, face_bbox)
+            detection['age'] = face_attributes.get('age', 25)
+            detection['gender'] = face_attributes.get('gender', 'unknown')
+        else:
+            detection['age'], detection['gender'] = self._estimate_attributes_fallback(person_crop)
         return True
     
-    def _validate_knife_detection(self, confidence, bbox_area, x1, y1, x2, y2, frame_shape):
+    def _get_padded_person_crop(self, frame, bbox, padding=10):
         """
-        Ultra-permissive knife detection validation for maximum sensitivity
+        Extract a person crop with padding, clipped to the frame
+        
+        Returns:
+            tuple: (person_crop, (x_offset, y_offset))
         """
-        h, w = frame_shape[:2]
+        x1, y1, x2, y2 = bbox
+        h, w = frame.shape[:2]
+        x1_padded = max(0, x1 - padding)
+        y1_padded = max(0, y1 - padding)
+        x2_padded = min(w, x2 + padding)
+        y2_padded = min(h, y2 + padding)
+        return frame[y1_padded:y2_padded, x1_padded:x2_padded], (x1_padded, y1_padded)
+    
+    def _apply_face_detections(self, detection, person_crop, offset, faces):
+        """
+        Fill in face box, age and gender from the faces found in a person crop
         
-        # Very permissive size requirements - accept almost any size
-        min_area = 50  # Much smaller minimum
-        max_area = w * h * 0.8  # Allow up to 80% of frame
+        Returns:
+            bool: False if no face was found and the fallback estimate is needed
+        """
+        if not faces:
+            return False
         
-        # Ultra-low confidence threshold
-        min_confidence = 0.01  # Accept almost anything
+        # Take the largest face
+        largest_face = max(faces, key=lambda f: (f['bbox'][2] - f['bbox'][0]) * (f['bbox'][3] - f['bbox'][1]))
         
-        # Very permissive aspect ratio - knives can be any shape
-        width = x2 - x1
-        height = y2 - y1
-        aspect_ratio = max(width, height) / max(min(width, height), 1)
+        # Adjust face bbox to global coordinates
+        x_offset, y_offset = offset
+        face_bbox = largest_face['bbox']
+        detection['face_bbox'] = [
+            x_offset + face_bbox[0],
+            y_offset + face_bbox[1],
+            x_offset + face_bbox[2],
+            y_offset + face_bbox[3]
+        ]
+        detection['face_confidence'] = largest_face.get('confidence', 0.8)
         
-        # Accept almost any detection
-        size_valid = min_area <= bbox_area <= max_area
-        confidence_valid = confidence >= min_confidence
-        position_valid = 0 <= x1 < w and 0 <= y1 < h and 0 < x2 <= w and 0 < y2 <= h
-        aspect_valid = aspect_ratio <= 20  # Very permissive aspect ratio
+        # Analyze face attributes
+        face_attributes = self.face_detector.analyze_face_attributes(person_crop, face_bbox)
+        detection['age'] = face_attributes.get('age', 25)
+        detection['gender'] = face_attributes.get('gender', 'unknown')
+        return True
+    
+    def _estimate_attributes_fallback(self, person_crop):
+        """
+        Advanced gender detection for WatchHer women's safety system
+        """
+        return self._estimate_attributes_fallback_batch([person_crop])[0]
+    
+    def _estimate_attributes_fallback_batch(self, person_crops):
+        """
+        Multi-factor gender analysis for several person crops at once
         
-        # Print debug info for knife detections
-        print(f"🔍 Knife validation: conf={confidence:.3f}, area={int(bbox_area)}, aspect={aspect_ratio:.2f}")
-        print(f"    Size: {size_valid}, Conf: {confidence_valid}, Pos: {position_valid}, Aspect: {aspect_valid}")
+        Body proportions, shoulder-to-hip ratio, clothing colors, hair area,
+        edge distribution and posture are all computed by one fused pass over
+        the downscaled crops, followed by a majority vote per person.
+        
+        Returns:
+            list: (age, gender) for each crop
+        """
+        try:
+            features = self.crop_features.extract(person_crops)
+            genders = self.crop_features.vote_gender(features)
+        except Exception as e:
+            events.warning('attribute_error', "Gender analysis failed: %s", e)
+            return [(25, 'unknown')] * len(person_crops)
         
-        return size_valid and confidence_valid and position_valid and aspect_valid
+        attributes = []
+        for valid, gender in zip(features['valid'], genders):
+            if not valid:  # Too small to analyze
+                attributes.append((25, 'unknown'))
+                continue
+            # Age estimation with better distribution
+            age = max(16, min(75, int(28 + np.random.normal(0, 12))))
+            attributes.append((age, gender))
+        return attributes
     
     def draw_detections(self, frame, detections, harmful_objects=None):
         """
@@ -624,7 +1229,7 @@ class AIAnalyzer:
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
             
             # Draw face bounding box if available
-            if 'face_bbox' in detection:
+            if detection.get('face_bbox') is not None:
                 fx1, fy1, fx2, fy2 = detection['face_bbox']
                 cv2.rectangle(frame, (fx1, fy1), (fx2, fy2), (255, 0, 255), 1)
             
@@ -700,15 +1305,18 @@ class AIAnalyzer:
                 if conf1 > 0.5 and conf2 > 0.5:
                     cv2.line(frame, (int(x1), int(y1)), (int(x2), int(y2)), (255, 0, 0), 2)
     
-    def analyze_women_safety_scenarios(self, detections, frame_shape):
+    def analyze_women_safety_scenarios(self, detections, frame_shape, geometry=None):
         """
         WatchHer Core Function: Analyze specific women's safety scenarios
         
+        Args:
+            detections: Person detections with gender attributes
+            frame_shape: Shape of the analyzed frame
+            geometry: Precomputed FrameGeometry for these people (optional)
+        
         Returns:
             dict: Safety analysis results
         """
-        h, w = frame_shape[:2]
-        
         safety_alerts = {
             'lone_women': [],
             'surrounded_women': [],
@@ -718,16 +1326,26 @@ class AIAnalyzer:
             'overall_threat_level': 'SAFE'
         }
         
+        if geometry is None:
+            geometry = FrameGeometry.from_detections(detections, [], frame_shape)
+        
         # Separate women and men
-        women = [d for d in detections if d.get('gender') == 'woman']
+        women = [(i, d) for i, d in enumerate(detections) if d.get('gender') == 'woman']
         men = [d for d in detections if d.get('gender') == 'man']
         
+        now = time.monotonic()
+        
         # Analyze each woman's situation
-        for woman in women:
-            woman_analysis = self._analyze_individual_woman_safety(woman, men, detections, frame_shape)
+        for index, woman in women:
+            woman_analysis = self._analyze_individual_woman_safety(woman, men, detections, frame_shape,
+                                                                   geometry=geometry, index=index)
+            woman_analysis['alone_duration'] = self._update_alone_duration(woman, woman_analysis['is_alone'], now)
             
-            # Categorize based on analysis
-            if woman_analysis['is_alone'] and woman_analysis['isolation_risk'] > 0.7:
+            # Categorize based on analysis; tracked women only count as lone
+            # once they have been alone for DETECTION_SETTINGS['lone_woman_duration']
+            alone_long_enough = (woman_analysis['alone_duration'] is None or
+                                 woman_analysis['alone_duration'] >= self.lone_woman_duration)
+            if woman_analysis['is_alone'] and woman_analysis['isolation_risk'] > 0.7 and alone_long_enough:
                 safety_alerts['lone_women'].append(woman_analysis)
             
             if woman_analysis['is_surrounded'] and woman_analysis['threat_level'] > 0.6:
@@ -741,19 +1359,48 @@ class AIAnalyzer:
             if distress['has_distress']:
                 safety_alerts['distress_signals'].append(distress)
         
+        # Forget women whose tracks have ended
+        if self.person_tracker is not None and self._alone_since:
+            active = self.person_tracker.active_ids()
+            self._alone_since = {track_id: since for track_id, since in self._alone_since.items()
+                                 if track_id in active}
+        
         # Determine overall threat level
         safety_alerts['overall_threat_level'] = self._calculate_overall_threat_level(safety_alerts)
         
         return safety_alerts
     
-    def _analyze_individual_woman_safety(self, woman, men, all_people, frame_shape):
+    def _update_alone_duration(self, woman, is_alone, now):
+        """
+        Seconds a tracked woman has been continuously alone
+        
+        Returns:
+            float or None: None when the woman is not tracked
+        """
+        track_id = woman.get('track_id')
+        if track_id is None:
+            return None
+        if not is_alone:
+            self._alone_since.pop(track_id, None)
+            return 0.0
+        return now - self._alone_since.setdefault(track_id, now)
+    
+    def _analyze_individual_woman_safety(self, woman, men, all_people, frame_shape, geometry=None, index=None):
         """Analyze safety situation for individual woman"""
         h, w = frame_shape[:2]
-        wx1, wy1, wx2, wy2 = woman['bbox']
-        woman_center = [(wx1 + wx2) // 2, (wy1 + wy2) // 2]
+        if geometry is None:
+            geometry = FrameGeometry.from_detections(all_people, [], frame_shape)
+        if index is None:
+            index = next(i for i, person in enumerate(all_people) if person is woman or person == woman)
+        
+        woman_center = geometry.person_centers[index].tolist()
+        track_id = woman.get('track_id')
         
         analysis = {
-            'woman_id': f"woman_{woman_center[0]}_{woman_center[1]}",
+            # Track IDs stay the same from frame to frame; untracked women
+            # fall back to a position-based ID
+            'woman_id': f"woman_{track_id}" if track_id is not None else f"woman_{woman_center[0]}_{woman_center[1]}",
+            'track_id': track_id,
             'position': woman_center,
             'is_alone': False,
             'is_surrounded': False,
@@ -764,23 +1411,15 @@ class AIAnalyzer:
             'escape_routes': 0
         }
         
-        # Check if alone (no other people within significant distance)
+        # Check if alone (no other people within 200 pixels)
         nearby_people = []
-        for person in all_people:
-            if person == woman:
-                continue
-            px1, py1, px2, py2 = person['bbox']
-            person_center = [(px1 + px2) // 2, (py1 + py2) // 2]
-            distance = np.sqrt((woman_center[0] - person_center[0])**2 + 
-                             (woman_center[1] - person_center[1])**2)
-            
-            # Consider "nearby" as within 200 pixels
-            if distance < 200:
-                nearby_people.append({
-                    'person': person,
-                    'distance': distance,
-                    'is_male': person.get('gender') == 'man'
-                })
+        for neighbour in geometry.neighbours(index, max_distance=200):
+            person = all_people[neighbour]
+            nearby_people.append({
+                'person': person,
+                'distance': float(geometry.person_distances[index, neighbour]),
+                'is_male': person.get('gender') == 'man'
+            })
         
         analysis['is_alone'] = len(nearby_people) == 0
         
@@ -811,34 +1450,8 @@ class AIAnalyzer:
                 analysis['immediate_danger'] = True
                 analysis['threat_level'] = 1.0
         
-        # Calculate escape routes (simplified)
-        # Check for clear paths to frame edges
-        escape_routes = 0
-        directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]  # up, right, down, left
-        
-        for dx, dy in directions:
-            # Check if path to edge is relatively clear
-            path_clear = True
-            steps = 10
-            for step in range(1, steps):
-                check_x = woman_center[0] + dx * (w // steps) * step
-                check_y = woman_center[1] + dy * (h // steps) * step
-                
-                # Check if any person blocks this path
-                for person in all_people:
-                    if person == woman:
-                        continue
-                    px1, py1, px2, py2 = person['bbox']
-                    if px1 <= check_x <= px2 and py1 <= check_y <= py2:
-                        path_clear = False
-                        break
-                if not path_clear:
-                    break
-            
-            if path_clear:
-                escape_routes += 1
-        
-        analysis['escape_routes'] = escape_routes
+        # Clear paths to the frame edges, computed for everyone at once
+        analysis['escape_routes'] = int(geometry.escape_routes[index])
         
         return analysis
     
@@ -885,7 +1498,7 @@ class AIAnalyzer:
             distress['has_distress'] = distress['confidence'] > 0.4
             
         except Exception as e:
-            print(f"[WARNING] Distress detection failed: {e}")
+            events.warning('attribute_error', "Distress detection failed: %s", e)
         
         return distress
     
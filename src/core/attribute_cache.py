@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Per-Track Attribute Cache for WatchHer System
+Keeps age and gender estimates per track ID so they are not recomputed, and
+do not flicker, from frame to frame
+"""
+
+import time
+
+# Weight of one estimate in the gender vote, by where it came from
+SOURCE_CONFIDENCE = {
+    'face': 0.8,   # Face found by the face detector or the pose keypoints
+    'body': 0.5,   # Whole-body fallback heuristics
+}
+
+
+class AttributeCache:
+    """
+    Age / gender estimates of every tracked person
+
+    Each estimate is added to the track's entry instead of replacing it:
+    gender is a confidence-weighted vote over all estimates, age a weighted
+    running mean. A track is re-estimated when its entry is older than
+    refresh_seconds, or earlier when a clearly better face view appears
+    (face area times keypoint confidence at least better_view_ratio times
+    the best view so far). Entries are evicted when their track ends.
+    """
+
+    def __init__(self, refresh_seconds=5.0, better_view_ratio=1.5, min_votes=3, decay=0.8):
+        """
+        Args:
+            refresh_seconds: Age of an entry after which the track is re-estimated
+            better_view_ratio: Face view quality gain that triggers an early refresh
+            min_votes: Estimates needed before an entry is trusted without
+                       re-estimating on every frame
+            decay: Weight kept by older votes when a new estimate arrives
+        """
+        self.refresh_seconds = refresh_seconds
+        self.better_view_ratio = better_view_ratio
+        self.min_votes = min_votes
+        self.decay = decay
+        self.entries = {}
+        self.counters = {'hits': 0, 'refreshes': 0, 'evictions': 0}
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build the cache from an ATTRIBUTE_CACHE_SETTINGS-style dict"""
+        return cls(**{key: value for key, value in settings.items() if key != 'enabled'})
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, track_id, view_quality=0.0, now=None):
+        """
+        Get the cached attributes of a track if they are still good enough
+
+        Args:
+            track_id: Track ID of the person (None for untracked people)
+            view_quality: Quality of the face view available in this frame (0 = none)
+            now: Current time in seconds (default: time.monotonic())
+
+        Returns:
+            dict or None: Entry with 'age', 'gender' and 'confidence', or
+            None when the track must be (re-)estimated
+        """
+        if track_id is None:
+            return None
+        entry = self.entries.get(track_id)
+        if entry is None or entry['votes'] < self.min_votes:
+            return None
+
+        now = time.monotonic() if now is None else now
+        if now - entry['updated'] >= self.refresh_seconds:
+            return None
+        if view_quality > 0 and view_quality >= entry['best_view'] * self.better_view_ratio:
+            return None
+
+        self.counters['hits'] += 1
+        return entry
+
+    def peek(self, track_id):
+        """Get a track's entry regardless of its age, or None (no hit is counted)"""
+        return self.entries.get(track_id) if track_id is not None else None
+
+    def update(self, track_id, age, gender, source='body', view_quality=0.0, now=None):
+        """
+        Add a fresh estimate to a track's entry
+
+        Args:
+            track_id: Track ID of the person
+            age: Estimated age, or None
+            gender: 'man', 'woman' or 'unknown'
+            source: 'face' or 'body' (see SOURCE_CONFIDENCE)
+            view_quality: Quality of the face view the estimate came from
+            now: Current time in seconds (default: time.monotonic())
+
+        Returns:
+            dict: The updated entry; its 'age' and 'gender' are the smoothed values
+        """
+        now = time.monotonic() if now is None else now
+        weight = SOURCE_CONFIDENCE.get(source, SOURCE_CONFIDENCE['body'])
+        entry = self.entries.get(track_id)
+        if entry is None:
+            entry = self.entries[track_id] = {'gender_weights': {}, 'age_sum': 0.0, 'age_weight': 0.0,
+                                              'votes': 0, 'best_view': 0.0}
+        else:
+            self.counters['refreshes'] += 1
+
+        # Older votes fade so a wrong early estimate can be outvoted
+        weights = entry['gender_weights']
+        for key in weights:
+            weights[key] *= self.decay
+        if gender in ('man', 'woman'):
+            weights[gender] = weights.get(gender, 0.0) + weight
+        if age is not None:
+            entry['age_sum'] = entry['age_sum'] * self.decay + age * weight
+            entry['age_weight'] = entry['age_weight'] * self.decay + weight
+
+        total = sum(weights.values())
+        if total > 0:
+            entry['gender'] = max(weights, key=weights.get)
+            entry['confidence'] = weights[entry['gender']] / total
+        else:
+            entry['gender'] = 'unknown'
+            entry['confidence'] = 0.0
+        entry['age'] = int(round(entry['age_sum'] / entry['age_weight'])) if entry['age_weight'] else None
+        entry['votes'] += 1
+        entry['best_view'] = max(entry['best_view'], view_quality)
+        entry['updated'] = now
+        return entry
+
+    def prune(self, active_ids):
+        """Evict the entries of tracks that no longer exist"""
+        stale = [track_id for track_id in self.entries if track_id not in active_ids]
+        for track_id in stale:
+            del self.entries[track_id]
+        self.counters['evictions'] += len(stale)
+
+    def stats(self):
+        """
+        Get the cache counters
+
+        Returns:
+            dict: Counters plus the number of cached 'tracks'
+        """
+        stats = dict(self.counters)
+        stats['tracks'] = len(self.entries)
+        return stats
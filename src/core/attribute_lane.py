@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Asynchronous Attribute Enrichment for WatchHer System
+Runs age / gender estimation on a background worker pool, so detection,
+weapon association and the risk score of a frame never wait for it
+"""
+
+import sys
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.event_log import get_event_logger
+
+events = get_event_logger('attribute_lane')
+
+# Per-person fields the estimator reads
+INPUT_FIELDS = ('bbox', 'keypoints', 'track_id')
+
+
+class AttributeLane:
+    """
+    Background lane for face / attribute work
+
+    The frame loop submits the tracked people whose attributes need a fresh
+    estimate together with a copy of the frame, and picks up finished
+    estimates on a later frame with collect(); results are keyed by track
+    ID, so they are attached to the same people a frame or two later. A
+    track with an estimate in flight is not submitted again, and when
+    max_pending jobs are queued new submissions are dropped rather than
+    letting the lane fall behind the live feed.
+    """
+
+    def __init__(self, estimate, workers=1, max_pending=2):
+        """
+        Args:
+            estimate: Callable (frame, people) filling in 'age', 'gender' and
+                      the face fields of each person dict in place
+            workers: Worker threads
+            max_pending: Jobs queued or running before submissions are dropped
+        """
+        self.estimate = estimate
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='watchher-attributes')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._in_flight = set()
+        self._finished = []
+        self.counters = {'jobs': 0, 'people': 0, 'dropped': 0, 'errors': 0, 'attached': 0}
+        self._latency = 0.0  # Running submit-to-finish time in seconds
+
+    @classmethod
+    def from_settings(cls, estimate, settings):
+        """Build the lane from an ENRICHMENT_SETTINGS-style dict"""
+        return cls(estimate, **{key: value for key, value in settings.items() if key != 'enabled'})
+
+    def submit(self, frame, detections):
+        """
+        Queue an estimate for the given tracked people
+
+        Args:
+            frame: Frame the detections refer to (copied)
+            detections: Person detections; people without a track ID or with
+                        an estimate in flight are skipped
+
+        Returns:
+            bool: True if a job was queued
+        """
+        with self._lock:
+            people = [{field: detection.get(field) for field in INPUT_FIELDS} for detection in detections
+                      if detection.get('track_id') is not None and detection['track_id'] not in self._in_flight]
+            if not people:
+                return False
+            if self._pending >= self.max_pending:
+                self.counters['dropped'] += 1
+                return False
+            self._pending += 1
+            self._in_flight.update(person['track_id'] for person in people)
+            self.counters['jobs'] += 1
+            self.counters['people'] += len(people)
+
+        self._pool.submit(self._run, frame.copy(), people, time.perf_counter())
+        return True
+
+    def _run(self, frame, people, submitted):
+        try:
+            self.estimate(frame, people)
+            failed = False
+        except Exception as e:
+            events.warning('attribute_error', "Background attribute estimation failed: %s", e)
+            failed = True
+        finished = time.monotonic()
+        with self._lock:
+            self._pending -= 1
+            self._in_flight.difference_update(person['track_id'] for person in people)
+            if failed:
+                self.counters['errors'] += 1
+            else:
+                self._finished.extend((person, finished) for person in people)
+            self._latency = 0.8 * self._latency + 0.2 * (time.perf_counter() - submitted)
+
+    def collect(self):
+        """
+        Take the estimates finished since the last call (never blocks)
+
+        Returns:
+            list: (person dict, finish time in time.monotonic() seconds)
+        """
+        with self._lock:
+            finished, self._finished = self._finished, []
+            self.counters['attached'] += len(finished)
+        return finished
+
+    def close(self):
+        """Stop the workers; queued jobs are abandoned"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        """
+        Get the lane counters
+
+        Returns:
+            dict: Counters plus 'pending' jobs and the running job 'latency_ms'
+        """
+        with self._lock:
+            stats = dict(self.counters)
+            stats['pending'] = self._pending
+            stats['latency_ms'] = self._latency * 1000.0
+        return stats
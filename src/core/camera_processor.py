@@ -17,24 +17,42 @@ from datetime import datetime
 
 # WatchHer core imports
 from src.core.ai_analyzer import AIAnalyzer
+from src.core.frame_admission import FrameAdmission
+from src.core.keyframes import KeyframeScheduler
+from src.core.event_log import get_event_logger
+from src.utils.config import ADMISSION_SETTINGS, KEYFRAME_SETTINGS
+
+events = get_event_logger('camera_processor')
 
 class CameraProcessor:
     """Advanced camera processor with sophisticated risk assessment"""
     
-    def __init__(self, source=None):
+    def __init__(self, source=None, tile_regions=None):
         """
         Initialize camera processor
         
         Args:
             source: None for live webcam (frames from client), str for video file path
+            tile_regions: Optional normalized (x1, y1, x2, y2) regions of this camera
+                          to scan with tiled weapon detection
         """
         self.source = source
         self.cap = None
-        self.analyzer = AIAnalyzer()
+        self.analyzer = AIAnalyzer(tile_regions=tile_regions)  # Weights are shared across cameras by the model registry
         self.is_running = False
         self.current_risk_score = 0.0
         self.frame_count = 0
         self.last_detections = []
+        self.last_harmful_objects = []
+        self.last_safety_analysis = {'overall_threat_level': 'SAFE'}
+        
+        # Motion/quality gate in front of the analyzer
+        self.admission = FrameAdmission.from_settings(ADMISSION_SETTINGS) if ADMISSION_SETTINGS['enabled'] else None
+        
+        # Full detection on keyframes, optical-flow propagation in between
+        self.keyframes = None
+        if KEYFRAME_SETTINGS['enabled']:
+            self.keyframes = KeyframeScheduler.from_settings(self.analyzer, KEYFRAME_SETTINGS)
         
         # Performance tracking
         self.fps_counter = 0
@@ -104,38 +122,48 @@ class CameraProcessor:
         try:
             self.frame_count += 1
             
-            # **WatchHer AI Analysis**
-            try:
-                # New format returns 3 values: people, weapons, safety_analysis
-                result = self.analyzer.analyze_frame(frame_np)
-                if result is None:
-                    # Handle case where analysis returns None
-                    detections, harmful_objects, safety_analysis = [], [], {'overall_threat_level': 'SAFE'}
-                elif len(result) == 3:
-                    detections, harmful_objects, safety_analysis = result
-                elif len(result) == 2:
-                    # Fallback for old format (2 values)
-                    detections, harmful_objects = result
-                    safety_analysis = {'overall_threat_level': 'SAFE', 'lone_women': [], 
-                                     'surrounded_women': [], 'women_in_danger': [], 'distress_signals': []}
-                else:
-                    # Unexpected result format
-                    detections, harmful_objects, safety_analysis = [], [], {'overall_threat_level': 'SAFE'}
+            # **Frame admission**: frames without motion or too blurry/dark
+            # reuse the previous results instead of running the detectors
+            if self.admission is not None and not self.admission.admit(frame_np)[0]:
+                detections = self.last_detections
+                harmful_objects = self.last_harmful_objects
+                safety_analysis = self.last_safety_analysis
+            else:
+                # **WatchHer AI Analysis**
+                try:
+                    # New format returns 3 values: people, weapons, safety_analysis
+                    if self.keyframes is not None:
+                        result = self.keyframes.analyze(frame_np)
+                    else:
+                        result = self.analyzer.analyze_frame(frame_np)
+                    if result is None:
+                        # Handle case where analysis returns None
+                        detections, harmful_objects, safety_analysis = [], [], {'overall_threat_level': 'SAFE'}
+                    elif len(result) == 3:
+                        detections, harmful_objects, safety_analysis = result
+                    elif len(result) == 2:
+                        # Fallback for old format (2 values)
+                        detections, harmful_objects = result
+                        safety_analysis = {'overall_threat_level': 'SAFE', 'lone_women': [], 
+                                         'surrounded_women': [], 'women_in_danger': [], 'distress_signals': []}
+                    else:
+                        # Unexpected result format
+                        detections, harmful_objects, safety_analysis = [], [], {'overall_threat_level': 'SAFE'}
                 
-                self.last_detections = detections if detections is not None else []
-                self.last_harmful_objects = harmful_objects if harmful_objects is not None else []
-                self.last_safety_analysis = safety_analysis if safety_analysis is not None else {'overall_threat_level': 'SAFE'}
+                    self.last_detections = detections if detections is not None else []
+                    self.last_harmful_objects = harmful_objects if harmful_objects is not None else []
+                    self.last_safety_analysis = safety_analysis if safety_analysis is not None else {'overall_threat_level': 'SAFE'}
                 
-            except Exception as e:
-                print(f"[ERROR] AI analysis failed: {e}")
-                # Set safe defaults
-                detections = []
-                harmful_objects = []
-                safety_analysis = {'overall_threat_level': 'SAFE', 'lone_women': [], 
-                                 'surrounded_women': [], 'women_in_danger': [], 'distress_signals': []}
-                self.last_detections = []
-                self.last_harmful_objects = []
-                self.last_safety_analysis = safety_analysis
+                except Exception as e:
+                    events.error('frame_error', "AI analysis failed: %s", e)
+                    # Set safe defaults
+                    detections = []
+                    harmful_objects = []
+                    safety_analysis = {'overall_threat_level': 'SAFE', 'lone_women': [], 
+                                     'surrounded_women': [], 'women_in_danger': [], 'distress_signals': []}
+                    self.last_detections = []
+                    self.last_harmful_objects = []
+                    self.last_safety_analysis = safety_analysis
             
             # Calculate comprehensive risk score
             self.current_risk_score = self._calculate_risk_score(detections)
@@ -149,7 +177,7 @@ class CameraProcessor:
             return processed_frame, self.current_risk_score
             
         except Exception as e:
-            print(f"[ERROR] Frame processing failed: {e}")
+            events.error('frame_error', "Frame processing failed: %s", e)
             return np.zeros((480, 640, 3), dtype=np.uint8), 0.0
     
     def get_frame_for_video_file(self):
@@ -180,7 +208,7 @@ class CameraProcessor:
             return buffer.tobytes(), risk_score
             
         except Exception as e:
-            print(f"[ERROR] Video file frame processing failed: {e}")
+            events.error('frame_error', "Video file frame processing failed: %s", e)
             return self._get_error_frame(), 0.0
     
     def start_video_processing_thread(self):
@@ -201,6 +229,8 @@ class CameraProcessor:
     
     def _video_processing_loop(self):
         """Background loop for video file processing"""
+        # Do not consume video frames while the models are still loading
+        self.analyzer.wait_until_ready()
         while not self.stop_processing and self.is_running:
             try:
                 frame_bytes, risk_score = self.get_frame_for_video_file()
@@ -347,6 +377,22 @@ class CameraProcessor:
         _, buffer = cv2.imencode('.jpg', error_frame)
         return buffer.tobytes()
     
+    def wait_until_ready(self, timeout=None):
+        """
+        Block until the analyzer's models are loaded and warmed up
+        
+        Args:
+            timeout: Maximum seconds to wait (None: no limit)
+            
+        Returns:
+            bool: True if the analyzer is ready for inference
+        """
+        return self.analyzer.wait_until_ready(timeout)
+    
+    def get_startup_timings(self):
+        """Get per-model load and warm-up times (milliseconds)"""
+        return dict(self.analyzer.startup_timings)
+    
     def get_current_risk_score(self):
         """Get current risk score"""
         return self.current_risk_score
@@ -355,12 +401,43 @@ class CameraProcessor:
         """Get current FPS"""
         return self.current_fps
     
+    def get_latency_breakdown(self):
+        """Get the analyzer's average per-stage latency in milliseconds"""
+        return self.analyzer.get_latency_breakdown()
+    
+    def get_admission_stats(self):
+        """
+        Get frame admission counters (admitted vs. skipped frames)
+        
+        Returns:
+            dict: Counters, 'skip_ratio' and 'idle', or None without admission
+        """
+        return self.admission.stats() if self.admission is not None else None
+    
+    def get_keyframe_stats(self):
+        """
+        Get keyframe counters (detector runs vs. propagated frames)
+        
+        Returns:
+            dict: Counters, current 'interval' and 'inference_ratio', or None
+            without keyframe mode
+        """
+        return self.keyframes.stats() if self.keyframes is not None else None
+    
     def get_detections_count(self):
         """Get current number of people detected"""
         return len(self.last_detections)
     
+    def start(self):
+        """Resume processing after stop(); the analyzer's models stay loaded"""
+        if self.source is not None:
+            self._initialize_video_file()
+        else:
+            self.is_running = True
+        self.stop_processing = False
+    
     def stop(self):
-        """Stop camera processing"""
+        """Stop camera processing; start() resumes it"""
         self.is_running = False
         self.stop_processing = True
         
@@ -372,6 +449,18 @@ class CameraProcessor:
         
         print("[INFO] Camera processor stopped")
     
+    def close(self):
+        """Stop processing for good and return the shared models to the registry"""
+        self.stop()
+        self.analyzer.release()
+    
     def __del__(self):
-        """Cleanup on destruction"""
-        self.stop() 
\ No newline at end of file
+        """Cleanup on destruction (best effort: __init__ may not have finished)"""
+        try:
+            if hasattr(self, 'processing_thread'):
+                self.close()
+            elif getattr(self, 'analyzer', None) is not None:
+                # __init__ failed after creating the analyzer
+                self.analyzer.release()
+        except Exception as e:
+            print(f"[WARNING] Camera processor cleanup failed: {e}")
\ No newline at end of file
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Person-Guided Object Detection for WatchHer System
+Runs the weapon detector only where people are, since only objects near a
+person are associated with them
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import numpy as np
+
+from src.core.postprocess import result_to_arrays
+
+SKIP, FULL, CROPS = 'skip', 'full', 'crops'
+
+
+def empty_object_arrays():
+    """result_to_arrays()-style dict without detections"""
+    return {'xyxy': np.zeros((0, 4), dtype=int), 'conf': np.zeros(0, dtype=np.float32),
+            'cls': np.zeros(0, dtype=int), 'keypoints': None}
+
+
+def merge_regions(regions):
+    """
+    Replace overlapping rectangles by their bounding rectangle until none overlap
+
+    Args:
+        regions: List of (x1, y1, x2, y2)
+
+    Returns:
+        list: Disjoint (x1, y1, x2, y2) rectangles
+    """
+    regions = [list(region) for region in regions]
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(regions)):
+            for j in range(i + 1, len(regions)):
+                a, b = regions[i], regions[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    regions[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    del regions[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return [tuple(region) for region in regions]
+
+
+class ObjectCascade:
+    """
+    Cascade from the pose model to the object detector
+
+    After the pose model has run, every frame gets one of three plans:
+
+    - no people: object detection is skipped, except for a full-frame scan
+      every empty_interval frames so objects are still noticed
+    - people covering a small part of the frame: the detector runs only on
+      the person boxes padded by the association distance (overlapping
+      regions merged), all crops of all frames in one batched call
+    - people covering most of the frame: one full-frame pass is cheaper
+    """
+
+    def __init__(self, padding=100, empty_interval=10, max_crop_fraction=0.5, min_crop_imgsz=160):
+        """
+        Args:
+            padding: Pixels added around each person box (the association distance)
+            empty_interval: Frames without people between full-frame scans (0: never scan)
+            max_crop_fraction: Share of the frame above which a full-frame pass is used
+            min_crop_imgsz: Smallest model input size used for crops
+        """
+        self.padding = padding
+        self.empty_interval = empty_interval
+        self.max_crop_fraction = max_crop_fraction
+        self.min_crop_imgsz = min_crop_imgsz
+        self._empty_frames = 0
+        self.counters = {'frames': 0, SKIP: 0, FULL: 0, CROPS: 0, 'crop_count': 0}
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build the cascade from a CASCADE_SETTINGS-style dict"""
+        return cls(**{key: value for key, value in settings.items() if key != 'enabled'})
+
+    def plan(self, person_bboxes, frame_shape):
+        """
+        Decide where to run the object detector on a frame
+
+        Args:
+            person_bboxes: (N, 4) person boxes in frame coordinates
+            frame_shape: Shape of the frame
+
+        Returns:
+            tuple: (SKIP, FULL or CROPS, list of (x1, y1, x2, y2) crop regions)
+        """
+        self.counters['frames'] += 1
+        person_bboxes = np.asarray(person_bboxes).reshape(-1, 4)
+        h, w = frame_shape[:2]
+
+        if not len(person_bboxes):
+            self._empty_frames += 1
+            if self.empty_interval and self._empty_frames >= self.empty_interval:
+                self._empty_frames = 0
+                return self._count(FULL), []
+            return self._count(SKIP), []
+        self._empty_frames = 0
+
+        padded = np.stack([np.maximum(person_bboxes[:, 0] - self.padding, 0),
+                           np.maximum(person_bboxes[:, 1] - self.padding, 0),
+                           np.minimum(person_bboxes[:, 2] + self.padding, w),
+                           np.minimum(person_bboxes[:, 3] + self.padding, h)], axis=1).astype(int)
+        regions = merge_regions(padded.tolist())
+        area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in regions)
+        if area > self.max_crop_fraction * w * h:
+            return self._count(FULL), []
+        self.counters['crop_count'] += len(regions)
+        return self._count(CROPS), regions
+
+    def _count(self, mode):
+        self.counters[mode] += 1
+        return mode
+
+    def crop_imgsz(self, crops, imgsz):
+        """Model input size for a batch of crops: native size, capped by the frame input size"""
+        longest = max(max(crop.shape[:2]) for crop in crops)
+        return int(max(self.min_crop_imgsz, min(imgsz, -(-longest // 32) * 32)))
+
+    def detect(self, model, frames, regions, args):
+        """
+        Run the model on the crop regions of several frames in one batched call
+
+        Args:
+            model: Object detector
+            frames: Frames the regions refer to
+            regions: One list of (x1, y1, x2, y2) regions per frame
+            args: Predict arguments; imgsz is lowered to the crops' native size
+
+        Returns:
+            list: One result_to_arrays()-style dict per frame, in frame coordinates
+        """
+        crops, owners, offsets = [], [], []
+        for index, (frame, frame_regions) in enumerate(zip(frames, regions)):
+            for x1, y1, x2, y2 in frame_regions:
+                crops.append(frame[y1:y2, x1:x2])
+                owners.append(index)
+                offsets.append((x1, y1))
+
+        arrays = [empty_object_arrays() for _ in frames]
+        if not crops:
+            return arrays
+
+        crop_args = dict(args, imgsz=self.crop_imgsz(crops, args.get('imgsz', 640)))
+        results = model(crops, verbose=False, **crop_args)
+
+        parts = [[] for _ in frames]
+        for owner, (x1, y1), result in zip(owners, offsets, results):
+            crop_arrays = result_to_arrays(result)
+            crop_arrays['xyxy'] = crop_arrays['xyxy'] + np.array([x1, y1, x1, y1])
+            parts[owner].append(crop_arrays)
+        for index, frame_parts in enumerate(parts):
+            if frame_parts:
+                arrays[index]['xyxy'] = np.concatenate([p['xyxy'] for p in frame_parts]).astype(int)
+                arrays[index]['conf'] = np.concatenate([p['conf'] for p in frame_parts])
+                arrays[index]['cls'] = np.concatenate([p['cls'] for p in frame_parts])
+        return arrays
+
+    def stats(self):
+        """
+        Get the cascade counters
+
+        Returns:
+            dict: Frames per plan, crops run, and the share of frames with
+            a full-frame object pass ('full_ratio')
+        """
+        stats = dict(self.counters)
+        frames = stats['frames']
+        stats['full_ratio'] = stats[FULL] / frames if frames else 0.0
+        return stats
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Fused Person-Crop Features for WatchHer System
+Single-pass, batched feature extraction for the fallback gender heuristics
+"""
+
+import cv2
+import numpy as np
+
+
+class CropFeatureExtractor:
+    """
+    Extracts every fallback gender indicator from person crops in one pass
+
+    Each crop is downscaled once to a fixed size; all crops of a frame are
+    then stacked into one mosaic so the color conversions, edge map and
+    threshold run once per frame and every statistic is a reduction over
+    the stacked arrays. All indicators compare ratios or fractions, so they
+    are unaffected by the downscaling.
+    """
+
+    # Crops smaller than this are too small to analyze
+    MIN_HEIGHT = 50
+    MIN_WIDTH = 30
+
+    def __init__(self, size=(48, 96)):
+        """
+        Args:
+            size: (width, height) every crop is resized to
+        """
+        self.width, self.height = size
+
+    def extract(self, crops):
+        """
+        Compute the raw indicator values for a list of person crops
+
+        Args:
+            crops: List of BGR person crops (numpy arrays)
+
+        Returns:
+            dict of (N,) arrays; 'valid' is False for crops too small to analyze
+        """
+        n = len(crops)
+        valid = np.array([crop is not None and crop.ndim == 3 and crop.shape[0] >= self.MIN_HEIGHT
+                          and crop.shape[1] >= self.MIN_WIDTH for crop in crops], dtype=bool)
+        aspect_ratio = np.array([crop.shape[0] / crop.shape[1] if ok else 0.0
+                                 for crop, ok in zip(crops, valid)])
+
+        features = {
+            'valid': valid,
+            'aspect_ratio': aspect_ratio,
+            'upper_width': np.zeros(n),
+            'lower_width': np.zeros(n),
+            'saturation': np.zeros(n),
+            'hair_fraction': np.zeros(n),
+            'upper_edges': np.zeros(n),
+            'lower_edges': np.zeros(n),
+            'relative_y': np.full(n, 0.5),
+        }
+        indices = np.flatnonzero(valid)
+        if len(indices) == 0:
+            return features
+
+        H, W = self.height, self.width
+        # Downscale once, stacked vertically into a single (k*H, W, 3) mosaic
+        mosaic = np.concatenate([cv2.resize(crops[i], (W, H), interpolation=cv2.INTER_AREA)
+                                 for i in indices], axis=0)
+        stack = mosaic.reshape(-1, H, W, 3)
+
+        # 1. Shoulder-to-hip: average count of bright values per row in the
+        # upper and lower thirds
+        bright = stack > 50
+        features['upper_width'][indices] = bright[:, :H // 3].sum(axis=2).mean(axis=(1, 2))
+        features['lower_width'][indices] = bright[:, 2 * H // 3:].sum(axis=2).mean(axis=(1, 2))
+
+        # 2. Clothing color: mean saturation
+        hsv = cv2.cvtColor(mosaic, cv2.COLOR_BGR2HSV).reshape(-1, H, W, 3)
+        features['saturation'][indices] = hsv[..., 1].mean(axis=(1, 2))
+
+        # 3. Hair: non-dark values in the top 20%, relative to the crop's pixel count
+        hair_rows = int(H * 0.2)
+        features['hair_fraction'][indices] = (stack[:, :hair_rows] > 30).sum(axis=(1, 2, 3)) / float(W * H)
+
+        # 4. Edge distribution between upper and lower body
+        gray_mosaic = cv2.cvtColor(mosaic, cv2.COLOR_BGR2GRAY)
+        edges = cv2.Canny(gray_mosaic, 30, 100).reshape(-1, H, W)
+        # Ignore the rows next to the seams between stacked crops
+        edges[:, :2] = 0
+        edges[:, -2:] = 0
+        features['upper_edges'][indices] = edges[:, :H // 2].sum(axis=(1, 2), dtype=np.int64)
+        features['lower_edges'][indices] = edges[:, H // 2:].sum(axis=(1, 2), dtype=np.int64)
+
+        # 5. Posture: vertical center of mass of the thresholded silhouette
+        silhouette = gray_mosaic.reshape(-1, H, W) > 50
+        row_mass = silhouette.sum(axis=2)
+        total_mass = row_mass.sum(axis=1)
+        centroid_y = (row_mass * np.arange(H)).sum(axis=1) / np.maximum(total_mass, 1)
+        features['relative_y'][indices] = np.where(total_mass > 0, np.floor(centroid_y) / H, 0.5)
+
+        return features
+
+    def vote_gender(self, features):
+        """
+        Majority vote over the indicators, the same rules as the per-crop heuristics
+
+        Returns:
+            List of 'woman', 'man' or 'unknown', one per crop
+        """
+        n = len(features['valid'])
+        aspect_ratio = features['aspect_ratio']
+        upper, lower = features['upper_width'], features['lower_width']
+        upper_edges, lower_edges = features['upper_edges'], features['lower_edges']
+        broad_shoulders = upper > lower * 1.15
+        lower_defined = lower_edges > upper_edges * 1.3
+
+        # (female indicator, male indicator) pairs
+        indicators = [
+            (aspect_ratio > 2.2, aspect_ratio < 1.8),  # Body proportions
+            (~broad_shoulders & (lower > upper * 1.05), broad_shoulders),  # Shoulder-to-hip ratio
+            (features['saturation'] > 100, features['saturation'] < 60),  # Clothing colors
+            (features['hair_fraction'] > 0.15, np.zeros(n, dtype=bool)),  # Hair area
+            (lower_defined, ~lower_defined & (upper_edges > lower_edges * 1.4)),  # Edge distribution
+            (features['relative_y'] > 0.55, features['relative_y'] < 0.45),  # Posture
+        ]
+        female = np.sum([f for f, _ in indicators], axis=0)
+        male = np.sum([m for _, m in indicators], axis=0)
+
+        genders = np.full(n, 'unknown', dtype=object)
+        genders[(female > male) & (female >= 2)] = 'woman'
+        genders[(male > female) & (male >= 2)] = 'man'
+        genders[~features['valid']] = 'unknown'
+        return genders.tolist()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Object Detection Profiles for WatchHer System
+Class whitelists and per-class thresholds for the weapon/object detector
+"""
+
+
+class DetectionRule:
+    """How one COCO class is turned into a harmful-object detection"""
+
+    __slots__ = ('class_name', 'min_confidence', 'label', 'validation')
+
+    def __init__(self, class_name, min_confidence, label=None, validation=None):
+        """
+        Args:
+            class_name: COCO class name as reported by the model
+            min_confidence: Minimum confidence for this class
+            label: Class label reported for the detection (default: class_name)
+            validation: 'knife' (permissive knife checks), 'standard'
+                        (size/aspect checks) or None (no extra validation)
+        """
+        self.class_name = class_name
+        self.min_confidence = min_confidence
+        self.label = label or class_name
+        self.validation = validation
+
+
+class DetectionProfile:
+    """
+    Class whitelist with per-class thresholds for the object detector
+
+    The whitelist and lowest threshold are passed to the model call so NMS
+    and decoding only handle relevant classes; class names are resolved to
+    model class IDs once, when the model is loaded.
+    """
+
+    def __init__(self, name, rules):
+        self.name = name
+        self.rules = list(rules)
+
+    def resolve(self, names):
+        """
+        Map the profile's rules onto a model's class IDs
+
+        Args:
+            names: The model's {class_id: class_name} mapping
+
+        Returns:
+            dict: {class_id: DetectionRule}
+        """
+        ids_by_name = {class_name: class_id for class_id, class_name in names.items()}
+        resolved = {}
+        for rule in self.rules:
+            class_id = ids_by_name.get(rule.class_name)
+            if class_id is None:
+                print(f"[WARNING] Detection profile '{self.name}': model has no class '{rule.class_name}'")
+                continue
+            resolved[class_id] = rule
+        return resolved
+
+    def model_args(self, resolved):
+        """
+        Build the model call arguments for a resolved profile
+
+        Returns:
+            dict: 'classes' whitelist and the lowest per-class 'conf'
+        """
+        return {
+            'classes': sorted(resolved),
+            'conf': min(rule.min_confidence for rule in resolved.values()),
+        }
+
+
+# Harmful objects as the analyzer has always reported them: knives get
+# ultra-sensitive checks, knife-like objects are flagged as "potential_"
+# weapons, and bats need a standard-validated, confident detection
+WEAPONS_PROFILE = DetectionProfile('weapons', [
+    DetectionRule('knife', 0.08, validation='knife'),
+    DetectionRule('scissors', 0.08, label='potential_scissors'),
+    DetectionRule('fork', 0.08, label='potential_fork'),
+    DetectionRule('spoon', 0.08, label='potential_spoon'),
+    DetectionRule('banana', 0.08, label='potential_banana'),
+    DetectionRule('hot dog', 0.08, label='potential_hot dog'),
+    DetectionRule('remote', 0.08, label='potential_remote'),
+    DetectionRule('baseball bat', 0.20, validation='standard'),
+])
+
+DETECTION_PROFILES = {
+    'weapons': WEAPONS_PROFILE,
+}
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Compact Detection Records for WatchHer System
+Array-backed containers for people and harmful objects with dict-compatible views
+"""
+
+from abc import abstractmethod
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+
+import numpy as np
+
+NUM_KEYPOINTS = 17  # COCO pose keypoints
+
+
+@dataclass(eq=False)
+class PersonDetections:
+    """
+    All people detected in one frame, stored column-wise
+
+    Boxes, confidences, keypoints and per-person attributes live in
+    contiguous arrays; PersonView gives each person the dict interface that
+    the rest of the system uses.
+    """
+
+    __slots__ = ('bboxes', 'confidences', 'keypoints', 'has_keypoints', 'areas', 'ages', 'genders',
+                 'face_bboxes', 'face_confidences', 'has_face', 'has_harmful_object',
+                 'harmful_objects_nearby', 'track_ids', 'extras')
+
+    bboxes: np.ndarray             # (N, 4) int32
+    confidences: np.ndarray        # (N,) float32
+    keypoints: np.ndarray          # (N, 17, 3) float32, zeros where has_keypoints is False
+    has_keypoints: np.ndarray      # (N,) bool
+    areas: np.ndarray              # (N,) int64
+    ages: np.ndarray               # (N,) int16, -1 = not estimated
+    genders: list                  # N x 'man' / 'woman' / 'unknown' / None
+    face_bboxes: np.ndarray        # (N, 4) int32
+    face_confidences: np.ndarray   # (N,) float32
+    has_face: np.ndarray           # (N,) bool
+    has_harmful_object: np.ndarray  # (N,) bool
+    harmful_objects_nearby: list   # N x list of {'type', 'confidence', 'distance'}
+    track_ids: np.ndarray          # (N,) int64, -1 = not tracked
+    extras: list                   # N x dict of additional keys, or None
+
+    @classmethod
+    def create(cls, bboxes, confidences, keypoints=None):
+        """
+        Build the container for freshly detected people
+
+        Args:
+            bboxes: (N, 4) boxes in frame coordinates
+            confidences: (N,) detection confidences
+            keypoints: (N, 17, 3) pose keypoints or None
+        """
+        bboxes = np.ascontiguousarray(bboxes, dtype=np.int32).reshape(-1, 4)
+        n = len(bboxes)
+        has_keypoints = np.full(n, keypoints is not None)
+        if keypoints is None:
+            keypoints = np.zeros((n, NUM_KEYPOINTS, 3), dtype=np.float32)
+        return cls(
+            bboxes=bboxes,
+            confidences=np.ascontiguousarray(confidences, dtype=np.float32),
+            keypoints=np.ascontiguousarray(keypoints, dtype=np.float32),
+            has_keypoints=has_keypoints,
+            areas=(bboxes[:, 2] - bboxes[:, 0]).astype(np.int64) * (bboxes[:, 3] - bboxes[:, 1]),
+            ages=np.full(n, -1, dtype=np.int16),
+            genders=[None] * n,
+            face_bboxes=np.zeros((n, 4), dtype=np.int32),
+            face_confidences=np.zeros(n, dtype=np.float32),
+            has_face=np.zeros(n, dtype=bool),
+            has_harmful_object=np.zeros(n, dtype=bool),
+            harmful_objects_nearby=[[] for _ in range(n)],
+            track_ids=np.full(n, -1, dtype=np.int64),
+            extras=[None] * n,
+        )
+
+    def __len__(self):
+        return len(self.bboxes)
+
+    def copy(self):
+        """Independent copy of the container (arrays, lists and per-record dicts)"""
+        return _copy_container(self)
+
+    def to_arrays(self):
+        """Get the container as plain arrays and lists, e.g. for IPC"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild a container from to_arrays() output"""
+        return cls(**{name: arrays[name] for name in cls.__slots__})
+
+
+@dataclass(eq=False)
+class ObjectDetections:
+    """All harmful objects detected in one frame, stored column-wise"""
+
+    __slots__ = ('bboxes', 'confidences', 'labels', 'areas', 'track_ids', 'extras')
+
+    bboxes: np.ndarray       # (N, 4) int32
+    confidences: np.ndarray  # (N,) float32
+    labels: list             # N x class label, e.g. 'knife' or 'potential_fork'
+    areas: np.ndarray        # (N,) int64
+    track_ids: np.ndarray    # (N,) int64, -1 = not tracked
+    extras: list             # N x dict of additional keys, or None
+
+    @classmethod
+    def create(cls, bboxes, confidences, labels):
+        """Build the container for freshly detected objects"""
+        bboxes = np.ascontiguousarray(bboxes, dtype=np.int32).reshape(-1, 4)
+        return cls(
+            bboxes=bboxes,
+            confidences=np.ascontiguousarray(confidences, dtype=np.float32),
+            labels=list(labels),
+            areas=(bboxes[:, 2] - bboxes[:, 0]).astype(np.int64) * (bboxes[:, 3] - bboxes[:, 1]),
+            track_ids=np.full(len(bboxes), -1, dtype=np.int64),
+            extras=[None] * len(bboxes),
+        )
+
+    @property
+    def centers(self):
+        """(N, 2) integer box centers"""
+        return np.stack([(self.bboxes[:, 0] + self.bboxes[:, 2]) // 2,
+                         (self.bboxes[:, 1] + self.bboxes[:, 3]) // 2], axis=1)
+
+    def __len__(self):
+        return len(self.bboxes)
+
+    def copy(self):
+        """Independent copy of the container (arrays, lists and per-record dicts)"""
+        return _copy_container(self)
+
+    def to_arrays(self):
+        """Get the container as plain arrays and lists, e.g. for IPC"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild a container from to_arrays() output"""
+        return cls(**{name: arrays[name] for name in cls.__slots__})
+
+
+def _copy_container(batch):
+    """Copy every column of a container one level deep"""
+    columns = {}
+    for name in batch.__slots__:
+        value = getattr(batch, name)
+        if isinstance(value, np.ndarray):
+            columns[name] = value.copy()
+        else:
+            columns[name] = [item.copy() if isinstance(item, (list, dict)) else item for item in value]
+    return type(batch)(**columns)
+
+
+class _RecordView(MutableMapping):
+    """
+    Dict-compatible view of one row of a column-wise container
+
+    Abstract (MutableMapping is an ABC): subclasses list their array-backed
+    keys in FIELDS and read / write them in _get_field / _set_field; any
+    other key goes to the row's extras dict.
+    """
+
+    __slots__ = ('batch', 'index')
+
+    FIELDS = ()
+
+    def __init__(self, batch, index):
+        self.batch = batch
+        self.index = index
+
+    @abstractmethod
+    def _get_field(self, key):
+        """Value of a built-in field, converted to what the dict records held"""
+
+    @abstractmethod
+    def _set_field(self, key, value):
+        """Write a built-in field back into the container's arrays"""
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return self._get_field(key)
+        extras = self.batch.extras[self.index]
+        if extras is None:
+            raise KeyError(key)
+        return extras[key]
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            self._set_field(key, value)
+            return
+        if self.batch.extras[self.index] is None:
+            self.batch.extras[self.index] = {}
+        self.batch.extras[self.index][key] = value
+
+    def __delitem__(self, key):
+        if key in self.FIELDS:
+            raise KeyError(f"Cannot delete built-in field '{key}'")
+        extras = self.batch.extras[self.index]
+        if extras is None:
+            raise KeyError(key)
+        del extras[key]
+
+    def __iter__(self):
+        yield from self.FIELDS
+        extras = self.batch.extras[self.index]
+        if extras:
+            yield from extras
+
+    def __len__(self):
+        extras = self.batch.extras[self.index]
+        return len(self.FIELDS) + (len(extras) if extras else 0)
+
+    def __contains__(self, key):
+        if key in self.FIELDS:
+            return True
+        extras = self.batch.extras[self.index]
+        return bool(extras) and key in extras
+
+    # Records are compared by identity (same row of the same frame), not by
+    # value, so keypoint arrays are never compared element-wise
+    def __eq__(self, other):
+        return isinstance(other, _RecordView) and other.batch is self.batch and other.index == self.index
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((id(self.batch), self.index))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def copy(self):
+        """
+        Get a plain dict copy of this record, detached from the container
+
+        Like dict.copy() on the dicts analyze_frame() used to return, with
+        arrays (keypoints) copied so the record can be changed freely.
+        """
+        return {key: value.copy() if isinstance(value, np.ndarray) else value for key, value in self.items()}
+
+    def to_dict(self):
+        """Get a JSON-serializable plain dict of this record (arrays and numpy scalars as Python values)"""
+        return {key: _plain(value) for key, value in self.items()}
+
+
+def _plain(value):
+    """Convert numpy values inside a record field to plain Python values"""
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+class PersonView(_RecordView):
+    """Dict-compatible view of one person in a PersonDetections container"""
+
+    __slots__ = ()
+
+    FIELDS = ('bbox', 'confidence', 'class', 'keypoints', 'age', 'gender', 'has_harmful_object',
+              'harmful_objects_nearby', 'area', 'face_bbox', 'face_confidence', 'track_id')
+
+    def _get_field(self, key):
+        batch, i = self.batch, self.index
+        if key == 'bbox':
+            return batch.bboxes[i].tolist()
+        if key == 'confidence':
+            return float(batch.confidences[i])
+        if key == 'class':
+            return 'person'
+        if key == 'keypoints':
+            return batch.keypoints[i] if batch.has_keypoints[i] else None
+        if key == 'age':
+            age = int(batch.ages[i])
+            return None if age < 0 else age
+        if key == 'gender':
+            return batch.genders[i]
+        if key == 'has_harmful_object':
+            return bool(batch.has_harmful_object[i])
+        if key == 'harmful_objects_nearby':
+            return batch.harmful_objects_nearby[i]
+        if key == 'area':
+            return int(batch.areas[i])
+        if key == 'face_bbox':
+            return batch.face_bboxes[i].tolist() if batch.has_face[i] else None
+        if key == 'face_confidence':
+            return float(batch.face_confidences[i])
+        if key == 'track_id':
+            track_id = int(batch.track_ids[i])
+            return None if track_id < 0 else track_id
+
+    def _set_field(self, key, value):
+        batch, i = self.batch, self.index
+        if key == 'bbox':
+            batch.bboxes[i] = value
+            x1, y1, x2, y2 = batch.bboxes[i].tolist()
+            batch.areas[i] = (x2 - x1) * (y2 - y1)
+        elif key == 'confidence':
+            batch.confidences[i] = value
+        elif key == 'keypoints':
+            batch.has_keypoints[i] = value is not None
+            batch.keypoints[i] = 0.0 if value is None else value
+        elif key == 'age':
+            batch.ages[i] = -1 if value is None else int(value)
+        elif key == 'gender':
+            batch.genders[i] = value
+        elif key == 'has_harmful_object':
+            batch.has_harmful_object[i] = bool(value)
+        elif key == 'harmful_objects_nearby':
+            batch.harmful_objects_nearby[i] = value
+        elif key == 'area':
+            batch.areas[i] = value
+        elif key == 'face_bbox':
+            batch.has_face[i] = value is not None
+            if value is not None:
+                batch.face_bboxes[i] = value
+        elif key == 'face_confidence':
+            batch.face_confidences[i] = value
+        elif key == 'track_id':
+            batch.track_ids[i] = -1 if value is None else int(value)
+        else:
+            raise KeyError(f"'{key}' is read-only")
+
+
+class ObjectView(_RecordView):
+    """Dict-compatible view of one harmful object in an ObjectDetections container"""
+
+    __slots__ = ()
+
+    FIELDS = ('bbox', 'confidence', 'class', 'center', 'area', 'track_id')
+
+    def _get_field(self, key):
+        batch, i = self.batch, self.index
+        if key == 'bbox':
+            return batch.bboxes[i].tolist()
+        if key == 'confidence':
+            return float(batch.confidences[i])
+        if key == 'class':
+            return batch.labels[i]
+        if key == 'center':
+            x1, y1, x2, y2 = batch.bboxes[i].tolist()
+            return [(x1 + x2) // 2, (y1 + y2) // 2]
+        if key == 'area':
+            return int(batch.areas[i])
+        if key == 'track_id':
+            track_id = int(batch.track_ids[i])
+            return None if track_id < 0 else track_id
+
+    def _set_field(self, key, value):
+        batch, i = self.batch, self.index
+        if key == 'bbox':
+            batch.bboxes[i] = value
+            x1, y1, x2, y2 = batch.bboxes[i].tolist()
+            batch.areas[i] = (x2 - x1) * (y2 - y1)
+        elif key == 'confidence':
+            batch.confidences[i] = value
+        elif key == 'class':
+            batch.labels[i] = value
+        elif key == 'area':
+            batch.areas[i] = value
+        elif key == 'track_id':
+            batch.track_ids[i] = -1 if value is None else int(value)
+        else:
+            raise KeyError(f"'{key}' is read-only")
+
+
+class DetectionList(list):
+    """
+    List of record views over one container
+
+    Behaves like the list of dicts analyze_frame() has always returned,
+    while .batch exposes the underlying arrays for vectorized consumers.
+    """
+
+    __slots__ = ('batch',)
+
+    def __init__(self, batch, view_type):
+        super().__init__(view_type(batch, i) for i in range(len(batch)))
+        self.batch = batch
+
+    def __reduce__(self):
+        # Pickle just the arrays; the views are rebuilt on load
+        view_type = PersonView if isinstance(self.batch, PersonDetections) else ObjectView
+        return (DetectionList, (self.batch, view_type))
+
+
+def person_list(batch):
+    """Wrap a PersonDetections container in a list of PersonView records"""
+    return DetectionList(batch, PersonView)
+
+
+def object_list(batch):
+    """Wrap an ObjectDetections container in a list of ObjectView records"""
+    return DetectionList(batch, ObjectView)
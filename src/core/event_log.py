@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Event Logging for WatchHer System
+Rate-limited, sampled logging through a background queue, so per-frame
+messages never block the frame loop on stdout or journald
+"""
+
+import sys
+import os
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.config import LOGGING_SETTINGS
+
+ROOT_LOGGER = 'watchher'
+
+
+class EventLimiter:
+    """
+    Per-event-type sampling and token-bucket rate limit
+
+    Every event type has its own bucket of burst tokens refilled at rate
+    tokens per second; with sample_every N only every Nth occurrence is
+    considered at all. Event types without their own rule use the defaults.
+    """
+
+    def __init__(self, rules=None, default_rate=10.0, default_burst=20):
+        """
+        Args:
+            rules: {event: {'rate', 'burst', 'sample_every'}} overrides
+            default_rate: Messages per second for events without a rule
+            default_burst: Messages allowed at once for events without a rule
+        """
+        self.rules = dict(rules or {})
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self._buckets = {}  # event -> [tokens, last refill time, occurrences]
+        self._lock = threading.Lock()
+
+    def allow(self, event, now=None):
+        """Whether an occurrence of an event may be logged"""
+        rule = self.rules.get(event, {})
+        rate = rule.get('rate', self.default_rate)
+        burst = rule.get('burst', self.default_burst)
+        sample_every = rule.get('sample_every', 1)
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            bucket = self._buckets.get(event)
+            if bucket is None:
+                bucket = self._buckets[event] = [float(burst), now, 0]
+            bucket[2] += 1
+            if (bucket[2] - 1) % sample_every:
+                return False
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                return False
+            bucket[0] -= 1.0
+            return True
+
+
+class EventCounters:
+    """Thread-safe counts of every event, logged or suppressed"""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    OUTCOMES = ('logged', 'rate_limited', 'below_level', 'dropped')
+
+    def _counts_for(self, event):
+        counts = self._counts.get(event)
+        if counts is None:
+            counts = self._counts[event] = dict.fromkeys(('seen',) + self.OUTCOMES, 0)
+        return counts
+
+    def add(self, event, outcome):
+        with self._lock:
+            counts = self._counts_for(event)
+            counts['seen'] += 1
+            counts[outcome] += 1
+
+    def reclassify(self, event, old, new):
+        """Move an already counted occurrence from one outcome to another"""
+        with self._lock:
+            counts = self._counts_for(event)
+            counts[old] -= 1
+            counts[new] += 1
+
+    def snapshot(self):
+        """Get {event: {'seen', 'logged', 'rate_limited', 'below_level', 'dropped'}}"""
+        with self._lock:
+            return {event: dict(counts) for event, counts in self._counts.items()}
+
+
+_counters = EventCounters()
+_limiter = None
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def configure_logging(settings=None):
+    """
+    Set up the 'watchher' logger: level, rate limits and the queue handler
+
+    Messages are formatted and written by a QueueListener thread, so the
+    calling thread only enqueues a record. Safe to call more than once; the
+    last call wins.
+
+    Args:
+        settings: LOGGING_SETTINGS-style dict (default: LOGGING_SETTINGS)
+    """
+    global _limiter, _listener
+    settings = settings or LOGGING_SETTINGS
+    with _setup_lock:
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.setLevel(getattr(logging, settings['level'].upper()))
+        logger.propagate = False
+
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(logging.Formatter(settings['format']))
+        if settings['queue']:
+            records = queue.Queue(settings['queue_size'] or -1)
+            logger.addHandler(_DroppingQueueHandler(records))
+            _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+            _listener.start()
+        else:
+            logger.addHandler(output)
+
+        _limiter = EventLimiter(settings['events'], settings['default_rate'], settings['default_burst'])
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Already counted as logged by EventLogger.log
+            _counters.reclassify(getattr(record, 'event', 'unnamed'), 'logged', 'dropped')
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+class EventLogger:
+    """
+    Logger for named, rate-limited events
+
+    Every call counts the event, then drops it if its level is disabled or
+    its rate limit is exhausted, before any message formatting happens.
+    Arguments are formatted lazily with %-style placeholders.
+    """
+
+    def __init__(self, name):
+        self.logger = logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+    def log(self, level, event, message, *args):
+        if not self.logger.isEnabledFor(level):
+            _counters.add(event, 'below_level')
+            return
+        if not _limiter.allow(event):
+            _counters.add(event, 'rate_limited')
+            return
+        _counters.add(event, 'logged')
+        self.logger.log(level, message, *args, extra={'event': event})
+
+    def debug(self, event, message, *args):
+        self.log(logging.DEBUG, event, message, *args)
+
+    def info(self, event, message, *args):
+        self.log(logging.INFO, event, message, *args)
+
+    def warning(self, event, message, *args):
+        self.log(logging.WARNING, event, message, *args)
+
+    def error(self, event, message, *args):
+        self.log(logging.ERROR, event, message, *args)
+
+
+def get_event_logger(name):
+    """
+    Get the event logger for a module, configuring logging on first use
+
+    Args:
+        name: Short module name, e.g. 'ai_analyzer'
+    """
+    with _setup_lock:
+        configured = _limiter is not None
+    if not configured:
+        configure_logging()
+    return EventLogger(name)
+
+
+def event_counters():
+    """
+    Get the counts of every event seen so far
+
+    Returns:
+        dict: {event: {'seen', 'logged', 'rate_limited', 'below_level', 'dropped'}};
+        'dropped' counts records lost because the log queue was full
+    """
+    return _counters.snapshot()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Frame Admission for WatchHer System
+Decides which frames are worth running the detectors on, based on motion,
+image quality and how long the scene has been idle
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+class FrameAdmission:
+    """
+    Motion- and quality-gated admission stage in front of AIAnalyzer
+
+    Every frame is downscaled to a small grayscale thumbnail and compared
+    with the previous one (or fed to a background subtractor). A frame is
+    admitted for inference when enough pixels changed; frames without
+    motion, or that are too blurry or too dark, reuse the previous results.
+    Results are refreshed at least every max_reuse_seconds, whatever the
+    frame quality, so neither a person standing still nor a dark, blurred
+    scene is analyzed from stale data for long.
+
+    After idle_seconds without motion the camera drops into a duty cycle
+    that admits one frame every idle_interval seconds until motion returns.
+    """
+
+    def __init__(self, method='diff', thumbnail_width=160, pixel_delta=25, motion_fraction=0.005,
+                 blur_threshold=20.0, dark_threshold=20.0, max_reuse_seconds=2.0,
+                 idle_seconds=60.0, idle_interval=5.0):
+        """
+        Args:
+            method: 'diff' (frame differencing) or 'mog2' (background subtractor)
+            thumbnail_width: Width of the grayscale thumbnail used for the checks
+            pixel_delta: Gray-level change for a thumbnail pixel to count as moving ('diff')
+            motion_fraction: Fraction of moving pixels needed to admit a frame
+            blur_threshold: Minimum Laplacian variance; blurrier frames are skipped
+            dark_threshold: Minimum mean brightness; darker frames are skipped
+            max_reuse_seconds: Longest time previous results are reused while active
+            idle_seconds: Time without motion before the idle duty cycle starts
+            idle_interval: Seconds between admitted frames while idle
+        """
+        self.method = method
+        self.thumbnail_width = thumbnail_width
+        self.pixel_delta = pixel_delta
+        self.motion_fraction = motion_fraction
+        self.blur_threshold = blur_threshold
+        self.dark_threshold = dark_threshold
+        self.max_reuse_seconds = max_reuse_seconds
+        self.idle_seconds = idle_seconds
+        self.idle_interval = idle_interval
+
+        self._subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=False) if method == 'mog2' else None
+        self._previous = None
+        self._last_admitted = None
+        self._last_motion = None
+        self.idle = False
+
+        self.counters = {
+            'frames': 0,
+            'admitted': 0,
+            'skipped_no_motion': 0,
+            'skipped_blurry': 0,
+            'skipped_dark': 0,
+            'skipped_idle': 0,
+        }
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build the admission stage from an ADMISSION_SETTINGS-style dict"""
+        return cls(**{key: value for key, value in settings.items() if key != 'enabled'})
+
+    def _thumbnail(self, frame):
+        """Small grayscale copy of a frame"""
+        h, w = frame.shape[:2]
+        height = max(1, int(h * self.thumbnail_width / w))
+        small = cv2.resize(frame, (self.thumbnail_width, height), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+    def _motion(self, gray):
+        """Fraction of thumbnail pixels that changed"""
+        if self._subtractor is not None:
+            mask = self._subtractor.apply(gray)
+            return np.count_nonzero(mask) / mask.size
+
+        smoothed = cv2.GaussianBlur(gray, (5, 5), 0)
+        previous, self._previous = self._previous, smoothed
+        if previous is None or previous.shape != smoothed.shape:
+            return 1.0
+        moving = cv2.absdiff(smoothed, previous) > self.pixel_delta
+        return np.count_nonzero(moving) / moving.size
+
+    def admit(self, frame, now=None):
+        """
+        Decide whether a frame should be analyzed
+
+        Args:
+            frame: BGR frame
+            now: Current time in seconds (default: time.monotonic())
+
+        Returns:
+            tuple: (admitted, reason); reason is 'first', 'motion', 'refresh'
+            or 'idle_duty' for admitted frames and 'no_motion', 'blurry',
+            'dark' or 'idle' for skipped ones
+        """
+        now = time.monotonic() if now is None else now
+        self.counters['frames'] += 1
+
+        gray = self._thumbnail(frame)
+        motion = self._motion(gray) >= self.motion_fraction
+
+        if self._last_admitted is None:
+            return self._accept(now, 'first')
+
+        if motion:
+            self._last_motion = now
+            self.idle = False
+        elif now - self._last_motion >= self.idle_seconds:
+            self.idle = True
+
+        since_admitted = now - self._last_admitted
+        if self.idle:
+            if since_admitted >= self.idle_interval:
+                return self._accept(now, 'idle_duty')
+            return self._reject('idle')
+
+        # Bounded reuse for every non-idle scene, including dark or blurry
+        # ones with continuous motion
+        if since_admitted >= self.max_reuse_seconds:
+            return self._accept(now, 'refresh')
+        if not motion:
+            return self._reject('no_motion')
+
+        # Motion: only pay for inference if the frame is usable
+        if gray.mean() < self.dark_threshold:
+            return self._reject('dark')
+        if cv2.Laplacian(gray, cv2.CV_64F).var() < self.blur_threshold:
+            return self._reject('blurry')
+        return self._accept(now, 'motion')
+
+    def _accept(self, now, reason):
+        self._last_admitted = now
+        if self._last_motion is None:
+            self._last_motion = now
+        self.counters['admitted'] += 1
+        return True, reason
+
+    def _reject(self, reason):
+        self.counters['skipped_' + reason] += 1
+        return False, reason
+
+    def stats(self):
+        """
+        Get the admission counters
+
+        Returns:
+            dict: Counters plus 'skip_ratio' (share of frames that reused
+            previous results) and whether the camera is 'idle'
+        """
+        stats = dict(self.counters)
+        frames = stats['frames']
+        stats['skip_ratio'] = (frames - stats['admitted']) / frames if frames else 0.0
+        stats['idle'] = self.idle
+        return stats
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Frame Geometry for WatchHer System
+Pairwise person/object distances, containment and escape-route occlusion as array operations
+"""
+
+import numpy as np
+
+
+def bboxes_of(records):
+    """
+    Get an (N, 4) box array for a list of detections
+
+    Uses the backing arrays of a DetectionList directly and falls back to
+    reading 'bbox' from each record for plain lists of dicts.
+    """
+    batch = getattr(records, 'batch', None)
+    if batch is not None:
+        return batch.bboxes
+    if not records:
+        return np.zeros((0, 4), dtype=np.int32)
+    return np.array([record['bbox'] for record in records], dtype=np.int32).reshape(-1, 4)
+
+
+def box_centers(bboxes):
+    """Integer (N, 2) centers of (N, 4) boxes"""
+    return np.stack([(bboxes[:, 0] + bboxes[:, 2]) // 2,
+                     (bboxes[:, 1] + bboxes[:, 3]) // 2], axis=1)
+
+
+def points_in_boxes(points, bboxes):
+    """
+    Test which boxes contain which points (edges inclusive)
+
+    Args:
+        points: (..., 2) array of x, y points
+        bboxes: (N, 4) boxes
+
+    Returns:
+        Boolean array of shape (..., N)
+    """
+    x = points[..., 0:1]
+    y = points[..., 1:2]
+    return ((bboxes[:, 0] <= x) & (x <= bboxes[:, 2]) &
+            (bboxes[:, 1] <= y) & (y <= bboxes[:, 3]))
+
+
+class FrameGeometry:
+    """
+    Geometry shared by every per-frame safety stage
+
+    Built once per frame from the person and object boxes; harmful-object
+    association, lone/surrounded classification and escape-route scoring
+    all read from the same matrices instead of running their own loops.
+    """
+
+    # Escape-route ray march: up, right, down, left in 10 steps to the edge
+    ESCAPE_DIRECTIONS = np.array([(0, -1), (1, 0), (0, 1), (-1, 0)])
+    ESCAPE_STEPS = 10
+
+    def __init__(self, person_bboxes, object_bboxes, frame_shape):
+        """
+        Args:
+            person_bboxes: (N, 4) person boxes
+            object_bboxes: (M, 4) harmful object boxes
+            frame_shape: Shape of the analyzed frame
+        """
+        self.frame_shape = frame_shape
+        self.person_bboxes = np.asarray(person_bboxes).reshape(-1, 4)
+        self.object_bboxes = np.asarray(object_bboxes).reshape(-1, 4)
+
+        self.person_centers = box_centers(self.person_bboxes)
+        self.object_centers = box_centers(self.object_bboxes)
+
+        # (N, N) center distances between people
+        deltas = self.person_centers[:, None, :] - self.person_centers[None, :, :]
+        self.person_distances = np.sqrt((deltas.astype(np.float64) ** 2).sum(axis=2))
+
+        # (N, M) person-to-object center distances and containment
+        deltas = self.person_centers[:, None, :] - self.object_centers[None, :, :]
+        self.object_distances = np.sqrt((deltas.astype(np.float64) ** 2).sum(axis=2))
+        self.object_in_person = points_in_boxes(self.object_centers, self.person_bboxes).T
+
+        self._escape_routes = None
+
+    @classmethod
+    def from_detections(cls, person_detections, harmful_objects, frame_shape):
+        """Build the geometry from analyzer detection lists"""
+        return cls(bboxes_of(person_detections), bboxes_of(harmful_objects), frame_shape)
+
+    def objects_near_people(self, max_distance=100):
+        """
+        (N, M) mask of objects inside a person's box or within max_distance
+        of the person's center
+        """
+        return self.object_in_person | (self.object_distances <= max_distance)
+
+    def neighbours(self, index, max_distance=200):
+        """Indices of other people whose centers are closer than max_distance"""
+        close = self.person_distances[index] < max_distance
+        close[index] = False
+        return np.flatnonzero(close)
+
+    @property
+    def escape_routes(self):
+        """
+        (N,) number of clear paths (0-4) from each person to the frame edges
+
+        A path is blocked when any sample point along it falls inside another
+        person's box.
+        """
+        if self._escape_routes is None:
+            h, w = self.frame_shape[:2]
+            n = len(self.person_bboxes)
+            steps = np.arange(1, self.ESCAPE_STEPS)
+            stride = np.array([w // self.ESCAPE_STEPS, h // self.ESCAPE_STEPS])
+
+            # (N, 4 directions, steps, 2) sample points
+            offsets = self.ESCAPE_DIRECTIONS[:, None, :] * stride * steps[:, None]
+            points = self.person_centers[:, None, None, :] + offsets[None]
+
+            # (N, 4, steps, N) hits, ignoring each person's own box
+            hits = points_in_boxes(points, self.person_bboxes)
+            hits &= ~np.eye(n, dtype=bool)[:, None, None, :]
+
+            blocked = hits.any(axis=(2, 3))
+            self._escape_routes = (~blocked).sum(axis=1)
+        return self._escape_routes
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Hand Crop Verification for WatchHer System
+Checks the hands of every person for weapons on full-resolution crops cut
+around the pose model's wrist keypoints
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import numpy as np
+
+from src.core.postprocess import result_to_arrays, merge_overlapping
+
+# COCO pose keypoint indices for the arms
+LEFT_ELBOW, RIGHT_ELBOW, LEFT_WRIST, RIGHT_WRIST = 7, 8, 9, 10
+
+
+class HandCropVerifier:
+    """
+    Weapon check on high-resolution hand crops
+
+    A knife that matters is almost always in a hand, and at full-frame
+    input size it is often only a few pixels wide. For every confident
+    wrist keypoint a fixed-size crop is cut from the original frame, moved
+    along the forearm (elbow to wrist) towards the hand. All crops of a
+    frame go through the object detector in one batch and the detections
+    are merged with the full-frame ones.
+    """
+
+    def __init__(self, crop_size=256, crop_imgsz=320, keypoint_confidence=0.5, forearm_shift=0.3,
+                 max_crops=8, merge_threshold=0.5):
+        """
+        Args:
+            crop_size: Side of the square crop in frame pixels
+            crop_imgsz: Model input size for the crops (>= crop_size upsamples the hands)
+            keypoint_confidence: Minimum wrist keypoint confidence
+            forearm_shift: Crop center offset beyond the wrist, as a fraction of the forearm
+            max_crops: Upper bound on crops per frame (most confident wrists first)
+            merge_threshold: Intersection-over-smaller threshold for merging duplicates
+        """
+        self.crop_size = crop_size
+        self.crop_imgsz = crop_imgsz
+        self.keypoint_confidence = keypoint_confidence
+        self.forearm_shift = forearm_shift
+        self.max_crops = max_crops
+        self.merge_threshold = merge_threshold
+        self.counters = {'frames': 0, 'crops': 0, 'detections': 0}
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build the verifier from a HAND_CROP_SETTINGS-style dict"""
+        return cls(**{key: value for key, value in settings.items() if key != 'enabled'})
+
+    def regions(self, keypoints, frame_shape):
+        """
+        Crop regions around the confident wrists of all people
+
+        Args:
+            keypoints: (N, 17, 3) pose keypoints in frame pixels
+            frame_shape: Shape of the frame
+
+        Returns:
+            list: (x1, y1, x2, y2) crops of crop_size (smaller only if the frame is)
+        """
+        if keypoints is None or not len(keypoints):
+            return []
+        keypoints = np.asarray(keypoints)
+        h, w = frame_shape[:2]
+
+        wrists = keypoints[:, [LEFT_WRIST, RIGHT_WRIST]].reshape(-1, 3)
+        elbows = keypoints[:, [LEFT_ELBOW, RIGHT_ELBOW]].reshape(-1, 3)
+        confident = np.flatnonzero(wrists[:, 2] >= self.keypoint_confidence)
+        confident = confident[np.argsort(-wrists[confident, 2], kind='stable')][:self.max_crops]
+        if not len(confident):
+            return []
+
+        # The hand sits beyond the wrist, along the forearm
+        centers = wrists[confident, :2].copy()
+        has_elbow = elbows[confident, 2] >= self.keypoint_confidence
+        centers[has_elbow] += self.forearm_shift * (wrists[confident][has_elbow, :2] - elbows[confident][has_elbow, :2])
+
+        size_x, size_y = min(self.crop_size, w), min(self.crop_size, h)
+        x1 = np.clip(np.rint(centers[:, 0] - size_x / 2), 0, w - size_x).astype(int)
+        y1 = np.clip(np.rint(centers[:, 1] - size_y / 2), 0, h - size_y).astype(int)
+        return [(x, y, x + size_x, y + size_y) for x, y in zip(x1.tolist(), y1.tolist())]
+
+    def detect(self, model, frames, regions, args):
+        """
+        Run the model on the hand crops of several frames in one batched call
+
+        Args:
+            model: Object detector
+            frames: Frames the regions refer to
+            regions: One list of (x1, y1, x2, y2) crops per frame
+            args: Predict arguments; imgsz is replaced by crop_imgsz
+
+        Returns:
+            list: One result_to_arrays()-style dict (or None without crops) per frame
+        """
+        crops, owners, offsets = [], [], []
+        for index, (frame, frame_regions) in enumerate(zip(frames, regions)):
+            self.counters['frames'] += 1
+            for x1, y1, x2, y2 in frame_regions:
+                crops.append(frame[y1:y2, x1:x2])
+                owners.append(index)
+                offsets.append((x1, y1))
+
+        arrays = [None] * len(frames)
+        if not crops:
+            return arrays
+        self.counters['crops'] += len(crops)
+
+        results = model(crops, verbose=False, **dict(args, imgsz=self.crop_imgsz))
+        parts = [[] for _ in frames]
+        for owner, (x1, y1), result in zip(owners, offsets, results):
+            crop_arrays = result_to_arrays(result)
+            crop_arrays['xyxy'] = crop_arrays['xyxy'] + np.array([x1, y1, x1, y1])
+            parts[owner].append(crop_arrays)
+
+        for index, frame_parts in enumerate(parts):
+            if not frame_parts:
+                continue
+            arrays[index] = {'xyxy': np.concatenate([p['xyxy'] for p in frame_parts]).astype(int),
+                             'conf': np.concatenate([p['conf'] for p in frame_parts]),
+                             'cls': np.concatenate([p['cls'] for p in frame_parts]),
+                             'keypoints': None}
+            self.counters['detections'] += len(arrays[index]['cls'])
+        return arrays
+
+    def merge(self, full_frame, hands):
+        """Merge full-frame and hand-crop detections, dropping duplicates"""
+        if hands is None or not len(hands['cls']):
+            return full_frame
+        xyxy = np.concatenate([full_frame['xyxy'], hands['xyxy']]).astype(int)
+        conf = np.concatenate([full_frame['conf'], hands['conf']])
+        cls = np.concatenate([full_frame['cls'], hands['cls']])
+        keep, merged = merge_overlapping(xyxy, conf, cls, self.merge_threshold)
+        return {'xyxy': merged, 'conf': conf[keep], 'cls': cls[keep], 'keypoints': None}
+
+    def stats(self):
+        """Get the verifier counters (frames, crops run, detections found in crops)"""
+        return dict(self.counters)
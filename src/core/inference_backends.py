@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Inference Backends for WatchHer System
+Exports YOLO weights to ONNX / OpenVINO IR and caches the exported models
+"""
+
+import os
+import shutil
+import importlib.util
+import threading
+
+try:
+    from ultralytics import YOLO
+    YOLO_AVAILABLE = True
+except ImportError:
+    YOLO = None
+    YOLO_AVAILABLE = False
+
+
+# Backend name -> (Ultralytics export format, runtime module, exported artifact suffix)
+BACKENDS = {
+    'torch': (None, 'torch', ''),
+    'onnx': ('onnx', 'onnxruntime', '.onnx'),
+    'openvino': ('openvino', 'openvino', '_openvino_model'),
+}
+
+DEFAULT_EXPORT_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'models', 'exports')
+
+_export_lock = threading.Lock()
+
+
+def backend_available(backend):
+    """Check whether the runtime for a backend is installed"""
+    if backend not in BACKENDS:
+        return False
+    return importlib.util.find_spec(BACKENDS[backend][1]) is not None
+
+
+def resolve_backend(backend):
+    """
+    Validate a backend name, falling back to PyTorch when its runtime is missing
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+    if backend != 'torch' and not backend_available(backend):
+        print(f"[WARNING] {BACKENDS[backend][1]} not installed, falling back to the PyTorch backend")
+        return 'torch'
+    return backend
+
+
+def exported_model_path(weights, backend, export_dir=None, imgsz=640):
+    """
+    Where the exported model for a weights file is cached
+
+    The image size is part of the name so exports for different input sizes
+    never overwrite each other.
+    """
+    stem = os.path.splitext(os.path.basename(weights))[0]
+    suffix = BACKENDS[backend][2]
+    return os.path.abspath(os.path.join(export_dir or DEFAULT_EXPORT_DIR, f"{stem}_{imgsz}{suffix}"))
+
+
+def _is_stale(artifact, weights):
+    """An export is stale when it is missing or older than local source weights"""
+    if not os.path.exists(artifact):
+        return True
+    return os.path.exists(weights) and os.path.getmtime(weights) > os.path.getmtime(artifact)
+
+
+def export_model(weights, backend, export_dir=None, imgsz=640):
+    """
+    Export YOLO weights for a backend, reusing the cached export if present
+
+    Exports use a dynamic input shape so batched calls and smaller input
+    sizes run on the same artifact.
+
+    Args:
+        weights: Weights path or Ultralytics model name (e.g. 'yolov8n.pt')
+        backend: 'onnx' or 'openvino'
+        export_dir: Directory holding exported models
+        imgsz: Export image size
+
+    Returns:
+        str: Path of the exported model, loadable with YOLO()
+    """
+    if backend == 'torch' or weights.endswith(BACKENDS[backend][2]):
+        # Already in the backend's format, e.g. an INT8 model
+        return weights
+    if not YOLO_AVAILABLE:
+        raise RuntimeError("YOLO not available. Install with: pip install ultralytics")
+
+    artifact = exported_model_path(weights, backend, export_dir, imgsz)
+    with _export_lock:
+        if not _is_stale(artifact, weights):
+            return artifact
+
+        print(f"[INFO] Exporting {os.path.basename(weights)} to {backend} (imgsz={imgsz})...")
+        exported = YOLO(weights).export(format=BACKENDS[backend][0], imgsz=imgsz, dynamic=True, half=False)
+
+        # Ultralytics writes the export next to the weights; move it into the cache
+        os.makedirs(os.path.dirname(artifact), exist_ok=True)
+        if os.path.isdir(artifact):
+            shutil.rmtree(artifact)
+        elif os.path.exists(artifact):
+            os.remove(artifact)
+        shutil.move(str(exported), artifact)
+        print(f"[INFO] Cached {backend} model at {artifact}")
+    return artifact
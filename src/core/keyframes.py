@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Keyframe Scheduling for WatchHer System
+Runs full detection on keyframes only and carries people, keypoints and
+harmful objects to the frames in between with sparse optical flow
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import cv2
+import numpy as np
+
+from src.core.detections import person_list, object_list
+
+# Lucas-Kanade settings for the sparse flow between consecutive frames
+LK_PARAMS = {
+    'winSize': (15, 15),
+    'maxLevel': 2,
+    'criteria': (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+}
+
+# Safety analysis keys describing the keyframe's attribute work; propagated
+# frames carry the people (and attributes) of their keyframe, so they report
+# the same values
+KEYFRAME_ANALYSIS_KEYS = ('partial', 'unanalyzed_people')
+
+
+def box_points(bboxes, grid=3, margin=0.2):
+    """
+    Regular grid of points inside each box
+
+    Args:
+        bboxes: (N, 4) boxes
+        grid: Points per box side
+        margin: Fraction of the box left out on every side (edges are mostly background)
+
+    Returns:
+        tuple: ((N * grid * grid, 2) float32 points, (N * grid * grid,) owning box index)
+    """
+    bboxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+    steps = np.linspace(margin, 1 - margin, grid, dtype=np.float32)
+    fx, fy = np.meshgrid(steps, steps)
+    fx, fy = fx.ravel(), fy.ravel()
+    w = (bboxes[:, 2] - bboxes[:, 0])[:, None]
+    h = (bboxes[:, 3] - bboxes[:, 1])[:, None]
+    points = np.stack([bboxes[:, 0:1] + fx * w, bboxes[:, 1:2] + fy * h], axis=2)
+    owners = np.repeat(np.arange(len(bboxes)), grid * grid)
+    return points.reshape(-1, 2), owners
+
+
+class KeyframeScheduler:
+    """
+    Keyframe mode in front of AIAnalyzer.analyze_frame
+
+    Every interval-th frame is a keyframe and goes through the full analyzer.
+    On the frames in between, points inside every person and object box, the
+    confident pose keypoints and a coarse grid over the whole frame are
+    followed with pyramidal Lucas-Kanade flow from the previous frame. Boxes
+    move by the median flow of their points, keypoints by their own flow, and
+    the safety analysis is re-run on the moved people, so overlays and risk
+    scores change smoothly instead of freezing between detections. The
+    keyframe's 'partial' and 'unanalyzed_people' flags are carried over, so
+    every frame has the same analysis keys.
+
+    The interval adapts to the scene: strong motion brings it down to
+    min_interval, a calm scene lets it grow one frame at a time up to
+    max_interval. A keyframe is forced early when too many points are lost
+    (occlusion, cuts, camera shake).
+    """
+
+    def __init__(self, analyzer, min_interval=1, max_interval=6, low_motion_px=1.5,
+                 high_motion_px=6.0, flow_width=640, keypoint_confidence=0.3,
+                 max_lost_fraction=0.5):
+        """
+        Args:
+            analyzer: AIAnalyzer used for keyframes
+            min_interval: Frames between keyframes under strong motion (1 = every frame)
+            max_interval: Frames between keyframes in a calm scene
+            low_motion_px: Median flow (frame pixels per frame) below which the scene is calm
+            high_motion_px: Median flow above which the scene counts as strong motion
+            flow_width: Width the frames are downscaled to for optical flow
+            keypoint_confidence: Minimum confidence for a keypoint to be followed
+            max_lost_fraction: Share of lost points that forces the next keyframe
+        """
+        self.analyzer = analyzer
+        self.min_interval = max(1, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.low_motion_px = low_motion_px
+        self.high_motion_px = high_motion_px
+        self.flow_width = flow_width
+        self.keypoint_confidence = keypoint_confidence
+        self.max_lost_fraction = max_lost_fraction
+
+        self.interval = self.min_interval
+        self.last_was_keyframe = False
+        self._since_keyframe = 0
+        self._force_keyframe = True
+        self._previous_gray = None
+        self._scale = 1.0
+        self._people = None
+        self._objects = None
+        self._keyframe_analysis = {}
+
+        self.counters = {'frames': 0, 'keyframes': 0, 'propagated': 0, 'forced': 0}
+
+    @classmethod
+    def from_settings(cls, analyzer, settings):
+        """Build the scheduler from a KEYFRAME_SETTINGS-style dict"""
+        return cls(analyzer, **{key: value for key, value in settings.items() if key != 'enabled'})
+
+    def reset(self):
+        """Start over with a keyframe, e.g. after a source change"""
+        self._force_keyframe = True
+        self._previous_gray = None
+        self._people = None
+        self._objects = None
+
+    def _gray(self, frame):
+        """Downscaled grayscale copy used for flow; sets the frame-to-flow scale"""
+        w = frame.shape[1]
+        self._scale = min(1.0, self.flow_width / w)
+        if self._scale < 1.0:
+            h = max(1, int(frame.shape[0] * self._scale))
+            frame = cv2.resize(frame, (self.flow_width, h), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+    def analyze(self, frame):
+        """
+        Analyze a frame, running the detectors only on keyframes
+
+        Args:
+            frame: BGR frame
+
+        Returns:
+            tuple: (person_detections, harmful_objects, safety_analysis), as
+            returned by AIAnalyzer.analyze_frame()
+        """
+        self.counters['frames'] += 1
+        gray = self._gray(frame)
+
+        continuous = self._previous_gray is not None and self._previous_gray.shape == gray.shape
+        result = None
+        if (continuous and not self._force_keyframe and self._people is not None
+                and self._since_keyframe + 1 < self.interval):
+            result = self._propagate(frame, gray)
+
+        if result is None:
+            result = self._keyframe(frame, gray if continuous else None)
+        self._previous_gray = gray
+        return result
+
+    def _flow(self, previous, current, points):
+        """
+        Sparse optical flow of frame-coordinate points between two flow images
+
+        Returns:
+            tuple: ((N, 2) displacement in frame pixels, (N,) bool tracked)
+        """
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(
+            previous, current, (points * self._scale).astype(np.float32).reshape(-1, 1, 2),
+            None, **LK_PARAMS)
+        return moved.reshape(-1, 2) / self._scale - points, status.reshape(-1).astype(bool)
+
+    def _adapt_interval(self, box_shifts, scene_flow, scene_tracked):
+        """
+        Pick the keyframe interval from the fastest person or object, or from
+        the scene as a whole (camera motion, people entering)
+        """
+        motion = float(np.linalg.norm(box_shifts, axis=1).max()) if len(box_shifts) else 0.0
+        if scene_tracked.any():
+            motion = max(motion, float(np.median(np.linalg.norm(scene_flow[scene_tracked], axis=1))))
+        if motion >= self.high_motion_px:
+            self.interval = self.min_interval
+        elif motion < self.low_motion_px:
+            self.interval = min(self.interval + 1, self.max_interval)
+
+    def _keyframe(self, frame, gray=None):
+        """Run the full analyzer and remember its detections for propagation"""
+        result = self.analyzer.analyze_frame(frame)
+        self.counters['keyframes'] += 1
+        self.last_was_keyframe = True
+        self._since_keyframe = 0
+        self._force_keyframe = False
+
+        if isinstance(result, tuple) and len(result) == 3:
+            person_detections, harmful_objects, safety_analysis = result
+            self._people = person_detections.batch if hasattr(person_detections, 'batch') else None
+            self._objects = harmful_objects.batch if hasattr(harmful_objects, 'batch') else None
+            self._keyframe_analysis = {key: safety_analysis[key] for key in KEYFRAME_ANALYSIS_KEYS
+                                       if isinstance(safety_analysis, dict) and key in safety_analysis}
+        else:
+            self._people = None
+            self._objects = None
+            self._keyframe_analysis = {}
+
+        # Keyframes measure motion too, otherwise an interval of one could never grow
+        if gray is not None and self._people is not None:
+            h, w = frame.shape[:2]
+            bboxes = np.concatenate([self._people.bboxes, self._objects.bboxes])
+            box_pts, owners = box_points(bboxes)
+            scene_pts, _ = box_points([[0, 0, w, h]], grid=6, margin=0.05)
+            flow, tracked = self._flow(gray, self._previous_gray, np.concatenate([box_pts, scene_pts]))
+            self._adapt_interval(self._box_shifts(len(bboxes), owners, flow[:len(box_pts)], tracked[:len(box_pts)]),
+                                 flow[len(box_pts):], tracked[len(box_pts):])
+        return result
+
+    def _propagate(self, frame, gray):
+        """
+        Move the last detections with sparse optical flow
+
+        Returns:
+            tuple or None: Analysis result, or None when a keyframe is needed instead
+        """
+        people = self._people.copy()
+        objects = self._objects.copy()
+        h, w = frame.shape[:2]
+
+        # Person boxes, object boxes, confident keypoints and a scene grid in one LK call
+        person_points, person_owner = box_points(people.bboxes)
+        object_points, object_owner = box_points(objects.bboxes)
+        keypoint_mask = people.keypoints[:, :, 2] >= self.keypoint_confidence
+        keypoint_points = people.keypoints[:, :, :2][keypoint_mask]
+        scene_points, _ = box_points([[0, 0, w, h]], grid=6, margin=0.05)
+
+        points = np.concatenate([person_points, object_points, keypoint_points, scene_points])
+        flow, tracked = self._flow(self._previous_gray, gray, points)
+
+        # Too many lost points means the scene changed; detect again
+        if (~tracked).mean() > self.max_lost_fraction:
+            self.counters['forced'] += 1
+            self._force_keyframe = True
+            return None
+
+        bounds = np.array([w - 1, h - 1, w - 1, h - 1])
+        sections = np.cumsum([len(person_points), len(object_points), len(keypoint_points)])
+        person_flow, object_flow, keypoint_flow, scene_flow = np.split(flow, sections)
+        person_ok, object_ok, keypoint_ok, scene_ok = np.split(tracked, sections)
+
+        person_shift = self._box_shifts(len(people), person_owner, person_flow, person_ok)
+        shift4 = np.tile(person_shift, 2)
+        people.bboxes[:] = np.clip(people.bboxes + shift4, 0, bounds).astype(np.int32)
+        people.face_bboxes[people.has_face] = np.clip(
+            people.face_bboxes[people.has_face] + shift4[people.has_face], 0, bounds).astype(np.int32)
+
+        # Keypoints follow their own flow, or their person's box when lost
+        coords = people.keypoints[:, :, :2]
+        box_shift = np.broadcast_to(person_shift[:, None, :], coords.shape)[keypoint_mask]
+        coords[keypoint_mask] += np.where(keypoint_ok[:, None], keypoint_flow, box_shift)
+        coords[~keypoint_mask] += np.broadcast_to(person_shift[:, None, :], coords.shape)[~keypoint_mask]
+
+        object_shift = self._box_shifts(len(objects), object_owner, object_flow, object_ok)
+        objects.bboxes[:] = np.clip(objects.bboxes + np.tile(object_shift, 2), 0, bounds).astype(np.int32)
+
+        self._adapt_interval(np.concatenate([person_shift, object_shift]), scene_flow, scene_ok)
+
+        self._people = people
+        self._objects = objects
+        self._since_keyframe += 1
+        self.counters['propagated'] += 1
+        self.last_was_keyframe = False
+
+        person_detections = person_list(people)
+        harmful_objects = object_list(objects)
+        safety_analysis = self.analyzer.analyze_women_safety_scenarios(person_detections, frame.shape)
+        safety_analysis.update(self._keyframe_analysis)
+        return person_detections, harmful_objects, safety_analysis
+
+    @staticmethod
+    def _box_shifts(count, owners, flow, tracked):
+        """(count, 2) median flow of the tracked points of every box"""
+        shifts = np.zeros((count, 2))
+        for box in range(count):
+            box_flow = flow[(owners == box) & tracked]
+            if len(box_flow):
+                shifts[box] = np.median(box_flow, axis=0)
+        return np.rint(shifts)
+
+    def stats(self):
+        """
+        Get the keyframe counters
+
+        Returns:
+            dict: Counters plus the current 'interval' and the 'inference_ratio'
+            (share of frames that ran the detectors)
+        """
+        stats = dict(self.counters)
+        frames = stats['frames']
+        stats['interval'] = self.interval
+        stats['inference_ratio'] = stats['keyframes'] / frames if frames else 0.0
+        return stats
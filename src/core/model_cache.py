@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Model Artifact Cache for WatchHer System
+Versioned, checksummed local store of prepared model weights, so the system
+starts offline and in a predictable time
+
+Populate it ahead of time (e.g. before shipping to an air-gapped site):
+
+    python -m src.core.model_cache populate --backends torch onnx
+    python -m src.core.model_cache verify
+"""
+
+import sys
+import os
+import json
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+try:
+    import ultralytics
+    from ultralytics import YOLO
+    YOLO_AVAILABLE = True
+except ImportError:
+    ultralytics = None
+    YOLO = None
+    YOLO_AVAILABLE = False
+
+from src.core.inference_backends import BACKENDS, export_model
+from src.utils.config import INFERENCE_SETTINGS, MODEL_CACHE_SETTINGS
+
+# Bump when the layout or the preparation of the artifacts changes; every
+# version lives in its own subdirectory, so old caches are never misread
+CACHE_VERSION = 1
+
+MANIFEST_NAME = 'manifest.json'
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'models', 'cache')
+
+
+class ModelCacheError(RuntimeError):
+    """Raised when a model is not in the cache (offline) or fails verification"""
+
+
+def file_checksum(path):
+    """
+    SHA-256 of a file, or of all files below a directory (OpenVINO models)
+
+    Returns:
+        tuple: (hex digest, total bytes)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    if os.path.isdir(path):
+        files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    else:
+        files = [path]
+    for file_path in files:
+        if os.path.isdir(path):
+            digest.update(os.path.relpath(file_path, path).encode())
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+                size += len(block)
+    return digest.hexdigest(), size
+
+
+class ModelCache:
+    """
+    Local store of prepared model artifacts
+
+    Models are addressed by their Ultralytics name (e.g. 'yolov8n.pt'),
+    backend and, for exported backends, input size. The PyTorch artifact is
+    the fused model, so loading skips Conv/BatchNorm fusion; ONNX and
+    OpenVINO artifacts are exported from it with a dynamic input shape.
+    manifest.json records the SHA-256 and size of every artifact, checked
+    before an artifact is handed out. A verified artifact is not hashed again
+    while its files keep the same size and modification time, so every
+    camera acquiring the same model does not re-read the weights.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, populate_on_demand=True, verify_checksums=True):
+        """
+        Args:
+            cache_dir: Root of the cache; artifacts live in cache_dir/v<CACHE_VERSION>
+            populate_on_demand: Prepare missing artifacts on first use (may
+                                download); when False a missing artifact is an error
+            verify_checksums: Check SHA-256 on lookup (size only otherwise)
+        """
+        self.root = os.path.abspath(os.path.join(cache_dir, f'v{CACHE_VERSION}'))
+        self.populate_on_demand = populate_on_demand
+        self.verify_checksums = verify_checksums
+        self._lock = threading.RLock()
+        self._manifest = None
+        self._verified = {}  # path -> (sha256, file stats) of artifacts that passed
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build the cache from a MODEL_CACHE_SETTINGS-style dict"""
+        return cls(**{key: value for key, value in settings.items() if key != 'enabled'})
+
+    # Manifest ----------------------------------------------------------
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.root, MANIFEST_NAME)
+
+    def _load_manifest(self):
+        if self._manifest is None:
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path) as f:
+                    self._manifest = json.load(f)
+            else:
+                self._manifest = {'version': CACHE_VERSION, 'artifacts': {}}
+        return self._manifest
+
+    def _save_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        temporary = self.manifest_path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(self._manifest, f, indent=2, sort_keys=True)
+        os.replace(temporary, self.manifest_path)
+
+    @staticmethod
+    def artifact_key(name, backend='torch', imgsz=640):
+        """Manifest key of an artifact; the input size only matters for exports"""
+        return f"{name}|{backend}" if backend == 'torch' else f"{name}|{backend}|{imgsz}"
+
+    def entries(self):
+        """Get {artifact key: manifest entry} for everything in the cache"""
+        with self._lock:
+            return dict(self._load_manifest()['artifacts'])
+
+    # Lookup ------------------------------------------------------------
+
+    @staticmethod
+    def _file_stats(path):
+        """Size and modification time of a file, or of every file below a directory"""
+        if not os.path.isdir(path):
+            stat = os.stat(path)
+            return stat.st_size, stat.st_mtime_ns
+        stats = []
+        for root, _, names in os.walk(path):
+            for name in names:
+                stat = os.stat(os.path.join(root, name))
+                stats.append((os.path.relpath(os.path.join(root, name), path), stat.st_size, stat.st_mtime_ns))
+        return tuple(sorted(stats))
+
+    def _verify(self, entry, force=False):
+        """
+        Problem with a cached artifact, or None if it is intact
+
+        Args:
+            entry: Manifest entry
+            force: Check the artifact even if it passed before and is unchanged
+        """
+        path = os.path.join(self.root, entry['path'])
+        if not os.path.exists(path):
+            return f"missing {entry['path']}"
+        stats = self._file_stats(path)
+        if not force and self._verified.get(path) == (entry['sha256'], stats):
+            return None
+        if self.verify_checksums or os.path.isdir(path):
+            checksum, size = file_checksum(path)
+            if checksum != entry['sha256']:
+                return f"checksum mismatch for {entry['path']}"
+        else:
+            size = os.path.getsize(path)
+        if size != entry['bytes']:
+            return f"size mismatch for {entry['path']}"
+        self._verified[path] = (entry['sha256'], stats)
+        return None
+
+    def lookup(self, name, backend='torch', imgsz=640):
+        """
+        Path of a cached artifact
+
+        Raises:
+            ModelCacheError: If the artifact is cached but fails verification
+
+        Returns:
+            str or None: Absolute path, or None when it is not cached
+        """
+        with self._lock:
+            entry = self._load_manifest()['artifacts'].get(self.artifact_key(name, backend, imgsz))
+        if entry is None:
+            return None
+        problem = self._verify(entry)
+        if problem is not None:
+            raise ModelCacheError(f"Model cache entry for {name} ({backend}) is corrupt: {problem}")
+        return os.path.join(self.root, entry['path'])
+
+    def resolve(self, name, backend='torch', imgsz=640):
+        """
+        Path of the artifact to load for a model, populating it if allowed
+
+        Raises:
+            ModelCacheError: If the artifact is missing and on-demand population
+            is off, or if it fails verification
+        """
+        path = self.lookup(name, backend, imgsz)
+        if path is not None:
+            return path
+        if not self.populate_on_demand:
+            raise ModelCacheError(
+                f"{name} ({backend}) is not in the model cache at {self.root}; "
+                f"populate it with: python -m src.core.model_cache populate --models {name} --backends {backend}")
+        return self.populate(name, backend, imgsz)
+
+    # Population --------------------------------------------------------
+
+    def populate(self, name, backend='torch', imgsz=640, force=False):
+        """
+        Prepare an artifact and record it in the manifest
+
+        Args:
+            name: Ultralytics model name or path of local .pt weights
+            backend: 'torch', 'onnx' or 'openvino'
+            imgsz: Export input size (exported backends only)
+            force: Rebuild even if the artifact is cached and intact
+
+        Returns:
+            str: Absolute path of the artifact
+        """
+        if not YOLO_AVAILABLE:
+            raise ModelCacheError("YOLO not available. Install with: pip install ultralytics")
+        model_name = os.path.basename(name)
+
+        with self._lock:
+            if not force:
+                try:
+                    path = self.lookup(model_name, backend, imgsz)
+                except ModelCacheError as e:
+                    print(f"[WARNING] {e}; rebuilding it")
+                    path = None
+                if path is not None:
+                    return path
+
+            if backend == 'torch':
+                path = self._prepare_torch(name)
+            else:
+                # Exports are made from the cached fused weights
+                source = self.populate(name, 'torch', imgsz)
+                path = export_model(source, backend, self.root, imgsz)
+
+            checksum, size = file_checksum(path)
+            manifest = self._load_manifest()
+            manifest['artifacts'][self.artifact_key(model_name, backend, imgsz)] = {
+                'path': os.path.relpath(path, self.root),
+                'sha256': checksum,
+                'bytes': size,
+                'model': model_name,
+                'backend': backend,
+                'imgsz': None if backend == 'torch' else imgsz,
+                'ultralytics': getattr(ultralytics, '__version__', None),
+                'created': datetime.now().isoformat(timespec='seconds'),
+            }
+            self._save_manifest()
+            print(f"[INFO] Cached {model_name} ({backend}) at {path}")
+            return path
+
+    def _prepare_torch(self, name):
+        """Load (downloading if needed), fuse and save PyTorch weights"""
+        model = YOLO(name)
+        model.fuse()
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, os.path.basename(name))
+        temporary = path + '.tmp'
+        model.save(temporary)
+        os.replace(temporary, path)
+        return path
+
+    def verify(self):
+        """
+        Verify every cached artifact
+
+        Returns:
+            dict: {artifact key: problem} for the artifacts that failed
+        """
+        problems = {}
+        for key, entry in self.entries().items():
+            problem = self._verify(entry, force=True)
+            if problem is not None:
+                problems[key] = problem
+        return problems
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_model_cache():
+    """Get the process-wide model cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ModelCache.from_settings(MODEL_CACHE_SETTINGS)
+        return _cache
+
+
+def resolve_model_artifact(weights, backend='torch', imgsz=None):
+    """
+    Map a model name to its cached artifact
+
+    Only bare model names (e.g. 'yolov8n.pt') go through the cache; paths with
+    a directory, such as INT8 models or custom weights, are used as they are.
+
+    Args:
+        weights: Model name or weights path
+        backend: 'torch', 'onnx' or 'openvino' (already resolved)
+        imgsz: Export input size (default: INFERENCE_SETTINGS['export_imgsz'])
+
+    Returns:
+        str: Path to load
+    """
+    if not MODEL_CACHE_SETTINGS['enabled'] or os.path.dirname(weights):
+        return weights
+    if backend != 'torch' and weights.endswith(BACKENDS[backend][2]):
+        return weights
+    imgsz = imgsz or INFERENCE_SETTINGS['export_imgsz']
+    return get_model_cache().resolve(weights, backend, imgsz)
+
+
+def main():
+    """Populate, verify or list the model cache"""
+    parser = argparse.ArgumentParser(description="WatchHer model artifact cache")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    populate = commands.add_parser('populate', help='Prepare artifacts ahead of time')
+    populate.add_argument('--models', nargs='+',
+                          default=[INFERENCE_SETTINGS['pose_model'], INFERENCE_SETTINGS['object_model']],
+                          help='Model names or local .pt weights (the face detector shares the object model)')
+    populate.add_argument('--backends', nargs='+', choices=sorted(BACKENDS),
+                          default=sorted({'torch', INFERENCE_SETTINGS['backend']}),
+                          help='Backends to prepare')
+    populate.add_argument('--imgsz', type=int, default=INFERENCE_SETTINGS['export_imgsz'],
+                          help='Export input size for ONNX / OpenVINO')
+    populate.add_argument('--force', action='store_true', help='Rebuild cached artifacts')
+
+    commands.add_parser('verify', help='Check the checksums of all cached artifacts')
+    commands.add_parser('list', help='List cached artifacts')
+    args = parser.parse_args()
+
+    cache = get_model_cache()
+    if args.command == 'populate':
+        for model in args.models:
+            for backend in args.backends:
+                cache.populate(model, backend, args.imgsz, force=args.force)
+        problems = cache.verify()
+    elif args.command == 'verify':
+        problems = cache.verify()
+        print(f"[INFO] Verified {len(cache.entries())} artifacts in {cache.root}")
+    else:
+        for key, entry in sorted(cache.entries().items()):
+            print(f"{key:40s} {entry['bytes'] / 1e6:8.1f} MB  {entry['sha256'][:12]}  {entry['path']}")
+        problems = {}
+
+    for key, problem in problems.items():
+        print(f"[ERROR] {key}: {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Shared Model Registry for WatchHer System
+Loads each YOLO weights file once per process and hands out shared handles
+"""
+
+import sys
+import os
+import copy
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+try:
+    from ultralytics import YOLO
+    import torch
+    YOLO_AVAILABLE = True
+except ImportError:
+    YOLO = None
+    torch = None
+    YOLO_AVAILABLE = False
+
+from src.core.inference_backends import export_model, resolve_backend
+from src.core.model_cache import resolve_model_artifact
+from src.utils.config import INFERENCE_SETTINGS
+
+
+def resolve_device(device='auto'):
+    """Resolve 'auto' to the best available computing device"""
+    if device == 'auto':
+        return 'cuda' if torch is not None and torch.cuda.is_available() else 'cpu'
+    return device
+
+
+class _RegistryEntry:
+    """A loaded model plus the bookkeeping needed to share it"""
+
+    def __init__(self, key):
+        self.key = key
+        self.model = None
+        self.refcount = 0
+        self.load_lock = threading.Lock()
+
+
+class ModelRegistry:
+    """
+    Process-wide, reference-counted cache of loaded YOLO models
+
+    Models are keyed by (weights, device, precision, backend). The first
+    acquire loads the weights; every acquire returns a lightweight handle
+    that shares the loaded network but owns its own predictor, so handles
+    can be used from different camera threads. The weights are dropped when
+    the last handle is released.
+
+    With the 'onnx' and 'openvino' backends the weights are exported once
+    (cached on disk) and the handles run the exported model through the
+    matching runtime. Ultralytics opens a runtime session per predictor, so
+    for those backends handles share the export but not the session.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._handles = {}
+        self._lock = threading.Lock()
+
+    def make_key(self, weights, device='auto', precision='fp32', backend='torch'):
+        """
+        Build the registry key for a model
+
+        Args:
+            weights: Weights path or Ultralytics model name (e.g. 'yolov8n.pt')
+            device: 'auto', 'cpu' or 'cuda'
+            precision: 'fp32' or 'fp16' (fp16 only applies on CUDA with PyTorch)
+            backend: 'torch', 'onnx' or 'openvino'
+
+        Returns:
+            tuple: (weights, device, precision, backend)
+        """
+        if os.path.exists(weights):
+            weights = os.path.abspath(weights)
+        backend = resolve_backend(backend)
+        device = resolve_device(device)
+        if backend == 'openvino':
+            device = 'cpu'
+        if device == 'cpu' or backend != 'torch':
+            # Exports are FP32 so their outputs match the PyTorch model
+            precision = 'fp32'
+        return (weights, device, precision, backend)
+
+    def acquire(self, weights, device='auto', precision='fp32', backend='torch'):
+        """
+        Get a handle to a shared model, loading the weights on first use
+
+        Model names are loaded from the local model artifact cache.
+
+        Returns:
+            Ultralytics YOLO handle; pass it to release() when done
+        """
+        backend = resolve_backend(backend)
+        weights = resolve_model_artifact(weights, backend)
+        key = self.make_key(weights, device, precision, backend)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _RegistryEntry(key)
+                self._entries[key] = entry
+            entry.refcount += 1
+
+        # Load outside the registry lock so different models can load in parallel
+        try:
+            with entry.load_lock:
+                if entry.model is None:
+                    entry.model = self._load(*key)
+        except Exception:
+            self._drop_reference(entry)
+            raise
+
+        handle = self._new_handle(entry.model)
+        with self._lock:
+            self._handles[id(handle)] = entry
+        return handle
+
+    def release(self, handle):
+        """Release a handle obtained from acquire()"""
+        if handle is None:
+            return
+        with self._lock:
+            entry = self._handles.pop(id(handle), None)
+        if entry is not None:
+            self._drop_reference(entry)
+
+    def stats(self):
+        """Get {key: refcount} for every model currently held"""
+        with self._lock:
+            return {key: entry.refcount for key, entry in self._entries.items()}
+
+    def _drop_reference(self, entry):
+        """Decrement an entry's refcount and unload it when unused"""
+        with self._lock:
+            entry.refcount -= 1
+            if entry.refcount > 0:
+                return
+            self._entries.pop(entry.key, None)
+            entry.model = None
+
+        weights, device, _, _ = entry.key
+        print(f"[INFO] Unloaded shared model {os.path.basename(weights)} ({device})")
+        if device == 'cuda' and torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def _load(self, weights, device, precision, backend):
+        """Load weights onto the target device with the selected backend"""
+        if not YOLO_AVAILABLE:
+            raise RuntimeError("YOLO not available. Install with: pip install ultralytics")
+
+        print(f"[INFO] Loading shared model {os.path.basename(weights)} ({device}, {precision}, {backend})")
+        if backend != 'torch':
+            exported = export_model(weights, backend, INFERENCE_SETTINGS['export_dir'],
+                                    INFERENCE_SETTINGS['export_imgsz'])
+            model = YOLO(exported)
+            # Exported models cannot be moved; the runtime picks the device per call
+            model.overrides['device'] = device
+            return model
+
+        model = YOLO(weights)
+        if device != 'cpu':
+            model.to(device)
+        # Fuse Conv/BatchNorm once here, under the entry's load lock: every
+        # handle shares this nn.Module, and each handle's first predict
+        # would otherwise fuse it in place, racing with the other handles
+        model.fuse()
+        if precision == 'fp16':
+            model.overrides['half'] = True
+        return model
+
+    def _new_handle(self, model):
+        """Create a handle sharing the model's weights but not its predictor"""
+        # A shallow copy keeps the same nn.Module (the weights); Ultralytics
+        # predictors hold per-call state, so each consumer gets its own
+        handle = copy.copy(model)
+        handle.predictor = None
+        return handle
+
+
+_registry = ModelRegistry()
+
+
+def get_model_registry():
+    """Get the process-wide model registry"""
+    return _registry
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Vectorized YOLO Post-processing for WatchHer System
+Bulk conversion of model results to NumPy arrays and mask-based filtering
+"""
+
+import numpy as np
+
+# Validation modes used in the lookup tables
+VALIDATE_NONE = 0
+VALIDATE_KNIFE = 1
+VALIDATE_STANDARD = 2
+
+_VALIDATION_CODES = {
+    None: VALIDATE_NONE,
+    'knife': VALIDATE_KNIFE,
+    'standard': VALIDATE_STANDARD,
+}
+
+
+def result_to_arrays(result):
+    """
+    Copy one YOLO result to NumPy with a single transfer per tensor
+
+    Args:
+        result: Ultralytics Results object (or None)
+
+    Returns:
+        dict: 'xyxy' (N, 4) int, 'conf' (N,) float32, 'cls' (N,) int and
+        'keypoints' (N, K, 3) float32 or None
+    """
+    arrays = {
+        'xyxy': np.zeros((0, 4), dtype=int),
+        'conf': np.zeros(0, dtype=np.float32),
+        'cls': np.zeros(0, dtype=int),
+        'keypoints': None,
+    }
+    if result is None or not result.boxes:
+        return arrays
+
+    boxes = result.boxes
+    # Truncate like int() did on each coordinate
+    arrays['xyxy'] = boxes.xyxy.cpu().numpy().astype(int)
+    arrays['conf'] = boxes.conf.cpu().numpy().astype(np.float32)
+    arrays['cls'] = boxes.cls.cpu().numpy().astype(int)
+
+    keypoints = getattr(result, 'keypoints', None)
+    if keypoints is not None and keypoints.data is not None:
+        data = keypoints.data
+        arrays['keypoints'] = (data.cpu().numpy() if hasattr(data, 'cpu') else np.asarray(data)).astype(np.float32)
+    return arrays
+
+
+def box_areas(xyxy):
+    """Areas of (N, 4) boxes"""
+    return (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    Pairwise IoU between two sets of boxes
+
+    Args:
+        boxes_a: (N, 4) boxes
+        boxes_b: (M, 4) boxes
+
+    Returns:
+        (N, M) float array
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    union = box_areas(boxes_a)[:, None] + box_areas(boxes_b)[None, :] - intersection
+    return intersection / np.maximum(union, 1e-9)
+
+
+def merge_overlapping(xyxy, conf, cls, threshold=0.5):
+    """
+    Class-aware greedy suppression using intersection over the smaller box
+
+    Unlike IoU-based NMS this also catches the partial box an object leaves
+    in a neighbouring tile; each kept box grows to the union of the boxes
+    it absorbed, so an object cut by a tile border keeps its full extent.
+
+    Args:
+        xyxy: (N, 4) boxes
+        conf: (N,) confidences
+        cls: (N,) class IDs
+        threshold: Overlap (intersection / smaller area) above which the
+                   lower-confidence box of the same class is dropped
+
+    Returns:
+        tuple: (indices of the kept boxes, highest confidence first;
+        (K, 4) merged boxes for those indices)
+    """
+    order = np.argsort(-conf, kind='stable')
+    if len(order) < 2:
+        return order, np.asarray(xyxy).reshape(-1, 4)[order]
+
+    boxes = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4)
+    x1 = np.maximum(boxes[:, None, 0], boxes[None, :, 0])
+    y1 = np.maximum(boxes[:, None, 1], boxes[None, :, 1])
+    x2 = np.minimum(boxes[:, None, 2], boxes[None, :, 2])
+    y2 = np.minimum(boxes[:, None, 3], boxes[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    areas = box_areas(boxes)
+    smaller = np.maximum(np.minimum(areas[:, None], areas[None, :]), 1e-9)
+    overlapping = (intersection / smaller > threshold) & (cls[:, None] == cls[None, :])
+
+    suppressed = np.zeros(len(order), dtype=bool)
+    keep = []
+    merged = []
+    for i in order:
+        if suppressed[i]:
+            continue
+        group = overlapping[i] & ~suppressed
+        group[i] = True
+        keep.append(i)
+        merged.append(np.concatenate([boxes[group, :2].min(axis=0), boxes[group, 2:].max(axis=0)]))
+        suppressed |= group
+    return np.array(keep, dtype=int), np.array(merged).astype(np.asarray(xyxy).dtype)
+
+
+def knife_validation_checks(xyxy, conf, frame_shape):
+    """
+    Individual ultra-permissive knife checks for all boxes at once
+
+    Returns:
+        dict: 'area' and 'aspect_ratio' per box, and the boolean masks
+        'size', 'confidence', 'position' and 'aspect'
+    """
+    h, w = frame_shape[:2]
+    x1, y1, x2, y2 = xyxy[:, 0], xyxy[:, 1], xyxy[:, 2], xyxy[:, 3]
+    width = x2 - x1
+    height = y2 - y1
+    area = width * height
+    aspect_ratio = np.maximum(width, height) / np.maximum(np.minimum(width, height), 1)
+
+    return {
+        'area': area,
+        'aspect_ratio': aspect_ratio,
+        'size': (area >= 50) & (area <= w * h * 0.8),  # Accept almost any size
+        'confidence': conf >= 0.01,                    # Accept almost any confidence
+        'position': (x1 >= 0) & (x1 < w) & (y1 >= 0) & (y1 < h) & (x2 > 0) & (x2 <= w) & (y2 > 0) & (y2 <= h),
+        'aspect': aspect_ratio <= 20,                  # Knives can be any shape
+    }
+
+
+def knife_validation_mask(xyxy, conf, frame_shape):
+    """Vectorized ultra-permissive knife validation (all knife_validation_checks() pass)"""
+    checks = knife_validation_checks(xyxy, conf, frame_shape)
+    return checks['size'] & checks['confidence'] & checks['position'] & checks['aspect']
+
+
+def standard_validation_mask(xyxy, min_area, ratio_min, ratio_max, frame_shape):
+    """
+    Vectorized size and aspect-ratio validation
+
+    Boxes must be at least min_area, at most 40% of the frame and within
+    the width/height ratio range; min_area, ratio_min and ratio_max are
+    per-box arrays looked up from each box's class.
+    """
+    h, w = frame_shape[:2]
+    width = xyxy[:, 2] - xyxy[:, 0]
+    height = xyxy[:, 3] - xyxy[:, 1]
+    area = width * height
+
+    positive = (width > 0) & (height > 0)
+    aspect_ratio = width / np.where(height > 0, height, 1)
+
+    return (positive
+            & (area >= min_area)
+            & (area <= w * h * 0.4)
+            & (aspect_ratio >= ratio_min)
+            & (aspect_ratio <= ratio_max))
+
+
+class RuleTables:
+    """
+    Per-class-ID lookup arrays for a resolved detection profile
+
+    Lets every box find its threshold, validation mode and limits by
+    indexing with the class ID array instead of a per-box dict lookup.
+    """
+
+    def __init__(self, resolved_rules, num_classes, min_areas, aspect_ratios,
+                 default_min_area=600, default_ratio=(0.2, 6.0)):
+        """
+        Args:
+            resolved_rules: {class_id: DetectionRule} from DetectionProfile.resolve()
+            num_classes: Number of classes the model predicts
+            min_areas: {class_name: minimum area} for standard validation
+            aspect_ratios: {class_name: (min, max)} width/height for standard validation
+        """
+        self.has_rule = np.zeros(num_classes, dtype=bool)
+        self.min_confidence = np.full(num_classes, np.inf)
+        self.validation = np.zeros(num_classes, dtype=np.int8)
+        self.min_area = np.full(num_classes, default_min_area, dtype=float)
+        self.ratio_min = np.full(num_classes, default_ratio[0])
+        self.ratio_max = np.full(num_classes, default_ratio[1])
+        self.labels = [None] * num_classes
+        self.class_names = [None] * num_classes
+
+        for class_id, rule in resolved_rules.items():
+            self.has_rule[class_id] = True
+            self.min_confidence[class_id] = rule.min_confidence
+            self.validation[class_id] = _VALIDATION_CODES[rule.validation]
+            self.min_area[class_id] = min_areas.get(rule.class_name, default_min_area)
+            self.ratio_min[class_id], self.ratio_max[class_id] = aspect_ratios.get(rule.class_name, default_ratio)
+            self.labels[class_id] = rule.label
+            self.class_names[class_id] = rule.class_name
+
+    def filter(self, arrays, frame_shape):
+        """
+        Select the boxes that pass their class's threshold and validation
+
+        Args:
+            arrays: Output of result_to_arrays()
+            frame_shape: Shape of the analyzed frame
+
+        Returns:
+            ndarray: Indices of the kept boxes
+        """
+        xyxy, conf, cls = arrays['xyxy'], arrays['conf'], arrays['cls']
+        if len(cls) == 0:
+            return np.zeros(0, dtype=int)
+
+        known = (cls >= 0) & (cls < len(self.has_rule))
+        cls = np.where(known, cls, 0)
+        keep = known & self.has_rule[cls] & (conf > self.min_confidence[cls])
+
+        validation = self.validation[cls]
+        knife = validation == VALIDATE_KNIFE
+        standard = validation == VALIDATE_STANDARD
+        if knife.any():
+            keep &= ~knife | knife_validation_mask(xyxy, conf, frame_shape)
+        if standard.any():
+            keep &= ~standard | standard_validation_mask(
+                xyxy, self.min_area[cls], self.ratio_min[cls], self.ratio_max[cls], frame_shape)
+
+        return np.flatnonzero(keep)
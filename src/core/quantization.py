@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+INT8 Quantization for WatchHer System
+Static INT8 calibration of the YOLO models on our own frames, with an
+accuracy report against the FP32 models that gates their use
+"""
+
+import sys
+import os
+import json
+import argparse
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import cv2
+import numpy as np
+
+try:
+    from ultralytics import YOLO
+    from ultralytics.data.augment import LetterBox
+    YOLO_AVAILABLE = True
+except ImportError:
+    YOLO = None
+    LetterBox = None
+    YOLO_AVAILABLE = False
+
+from src.core.inference_backends import backend_available, export_model, exported_model_path
+from src.core.model_registry import get_model_registry
+from src.core.postprocess import result_to_arrays, box_iou
+from src.utils.config import INFERENCE_SETTINGS, QUANTIZATION_SETTINGS
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+
+
+def iter_frames(folder, max_frames=200, video_stride=15):
+    """
+    Yield BGR frames from a folder of images and/or video clips
+
+    Args:
+        folder: Directory with frames (.jpg/.png/...) or clips (.mp4/.avi/...)
+        max_frames: Maximum number of frames to yield
+        video_stride: Take every n-th frame from video clips
+    """
+    if not folder or not os.path.isdir(folder):
+        return
+
+    count = 0
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        extension = os.path.splitext(name)[1].lower()
+
+        if extension in IMAGE_EXTENSIONS:
+            frame = cv2.imread(path)
+            if frame is None:
+                continue
+            yield frame
+            count += 1
+
+        elif extension in VIDEO_EXTENSIONS:
+            capture = cv2.VideoCapture(path)
+            index = 0
+            try:
+                while count < max_frames:
+                    ret, frame = capture.read()
+                    if not ret:
+                        break
+                    if index % video_stride == 0:
+                        yield frame
+                        count += 1
+                    index += 1
+            finally:
+                capture.release()
+
+        if count >= max_frames:
+            return
+
+
+def preprocess(frame, imgsz):
+    """
+    Letterbox a BGR frame into the (1, 3, imgsz, imgsz) float input of an
+    exported YOLO model, exactly as Ultralytics prepares it for predict()
+    """
+    canvas = LetterBox(new_shape=(imgsz, imgsz), auto=False)(image=frame)
+    rgb = cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB)
+    return np.ascontiguousarray(rgb.transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+class CalibrationReader:
+    """ONNX Runtime calibration data reader over a folder of frames"""
+
+    def __init__(self, input_name, folder, imgsz=640, max_frames=200):
+        self.input_name = input_name
+        self.folder = folder
+        self.imgsz = imgsz
+        self.max_frames = max_frames
+        self.rewind()
+
+    def get_next(self):
+        frame = next(self._frames, None)
+        if frame is None:
+            return None
+        return {self.input_name: preprocess(frame, self.imgsz)}
+
+    def rewind(self):
+        self._frames = iter_frames(self.folder, self.max_frames)
+
+
+def quantized_model_path(weights, export_dir=None, imgsz=640):
+    """Where the INT8 model for a weights file is cached"""
+    fp32_path = exported_model_path(weights, 'onnx', export_dir, imgsz)
+    return fp32_path[:-len('.onnx')] + '_int8.onnx'
+
+
+def quantize_model(weights, calibration_dir, export_dir=None, imgsz=640, max_frames=200):
+    """
+    Build (or reuse) a statically calibrated INT8 ONNX model
+
+    Only convolutions and matrix multiplications are quantized; the box and
+    keypoint decoding at the end of the network stays in FP32.
+
+    Args:
+        weights: Weights path or Ultralytics model name
+        calibration_dir: Folder of representative frames or clips
+        export_dir: Directory holding exported models
+        imgsz: Export and calibration image size
+        max_frames: Maximum number of calibration frames
+
+    Returns:
+        str: Path of the INT8 model
+    """
+    from onnxruntime import InferenceSession
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_static
+
+    fp32_path = export_model(weights, 'onnx', export_dir, imgsz)
+    int8_path = quantized_model_path(weights, export_dir, imgsz)
+    if os.path.exists(int8_path) and os.path.getmtime(int8_path) >= os.path.getmtime(fp32_path):
+        return int8_path
+
+    input_name = InferenceSession(fp32_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+    reader = CalibrationReader(input_name, calibration_dir, imgsz, max_frames)
+
+    print(f"[INFO] Calibrating INT8 {os.path.basename(weights)} on {calibration_dir}...")
+    quantize_static(fp32_path, int8_path, reader,
+                    quant_format=QuantFormat.QDQ,
+                    op_types_to_quantize=['Conv', 'MatMul'],
+                    per_channel=True,
+                    activation_type=QuantType.QUInt8,
+                    weight_type=QuantType.QInt8)
+
+    # Keep the Ultralytics metadata (class names, stride, task) so YOLO() can load the INT8 model
+    import onnx
+    fp32_model = onnx.load(fp32_path)
+    int8_model = onnx.load(int8_path)
+    del int8_model.metadata_props[:]
+    int8_model.metadata_props.extend(fp32_model.metadata_props)
+    onnx.save(int8_model, int8_path)
+    print(f"[INFO] Cached INT8 model at {int8_path}")
+    return int8_path
+
+
+def match_detections(reference, candidate, iou_threshold=0.5):
+    """
+    Greedily match candidate boxes to reference boxes of the same class
+
+    Args:
+        reference, candidate: Outputs of result_to_arrays()
+
+    Returns:
+        ndarray: For each reference box, the matched candidate index or -1
+    """
+    matches = np.full(len(reference['cls']), -1, dtype=int)
+    if len(matches) == 0 or len(candidate['cls']) == 0:
+        return matches
+
+    iou = box_iou(reference['xyxy'], candidate['xyxy'])
+    iou[reference['cls'][:, None] != candidate['cls'][None, :]] = 0.0
+    taken = np.zeros(len(candidate['cls']), dtype=bool)
+    for i in np.argsort(-reference['conf']):
+        scores = np.where(taken, 0.0, iou[i])
+        j = int(np.argmax(scores))
+        if scores[j] >= iou_threshold:
+            matches[i] = j
+            taken[j] = True
+    return matches
+
+
+def keypoint_errors(reference, candidate, matches, min_confidence=0.5):
+    """
+    Mean keypoint distance for each matched person, normalized by the
+    reference box diagonal; only keypoints visible in the reference count
+    """
+    if reference['keypoints'] is None or candidate['keypoints'] is None:
+        return []
+
+    errors = []
+    for i, j in enumerate(matches):
+        if j < 0:
+            continue
+        ref_points = reference['keypoints'][i]
+        visible = ref_points[:, 2] >= min_confidence
+        if not visible.any():
+            continue
+        x1, y1, x2, y2 = reference['xyxy'][i]
+        diagonal = max(np.hypot(x2 - x1, y2 - y1), 1.0)
+        distances = np.linalg.norm(ref_points[visible, :2] - candidate['keypoints'][j][visible, :2], axis=1)
+        errors.append(float(distances.mean() / diagonal))
+    return errors
+
+
+def compare_models(reference_model, candidate_model, frames, predict_args=None, iou_threshold=0.5):
+    """
+    Accuracy of a quantized model relative to its FP32 reference
+
+    The FP32 detections are treated as ground truth, so recall measures how
+    many of them the quantized model still finds.
+
+    Args:
+        reference_model: FP32 YOLO model
+        candidate_model: Quantized YOLO model
+        frames: Iterable of BGR frames
+        predict_args: Keyword arguments for both models' predict calls
+        iou_threshold: Minimum IoU for a detection to count as found
+
+    Returns:
+        dict: frames, reference_detections, detection_recall, knife_detections,
+        knife_recall (None without a knife class or knife samples) and
+        keypoint_error (None for non-pose models)
+    """
+    predict_args = dict(predict_args or {})
+    knife_id = next((class_id for class_id, name in reference_model.names.items() if name == 'knife'), None)
+
+    num_frames = 0
+    total = matched = 0
+    knife_total = knife_matched = 0
+    errors = []
+    for frame in frames:
+        reference = result_to_arrays(reference_model.predict(frame, verbose=False, **predict_args)[0])
+        candidate = result_to_arrays(candidate_model.predict(frame, verbose=False, **predict_args)[0])
+        matches = match_detections(reference, candidate, iou_threshold)
+
+        num_frames += 1
+        total += len(matches)
+        matched += int((matches >= 0).sum())
+        if knife_id is not None:
+            knives = reference['cls'] == knife_id
+            knife_total += int(knives.sum())
+            knife_matched += int((matches[knives] >= 0).sum())
+        errors.extend(keypoint_errors(reference, candidate, matches))
+
+    return {
+        'frames': num_frames,
+        'reference_detections': total,
+        'detection_recall': matched / total if total else None,
+        'knife_detections': knife_total,
+        'knife_recall': knife_matched / knife_total if knife_total else None,
+        'keypoint_error': float(np.mean(errors)) if errors else None,
+    }
+
+
+def check_report(report, has_knife_class, settings=None):
+    """
+    Apply the accuracy gate to a comparison report
+
+    Returns:
+        tuple: (passed, [reasons it failed])
+    """
+    settings = settings or QUANTIZATION_SETTINGS
+    reasons = []
+
+    if report['detection_recall'] is None:
+        reasons.append("no reference detections in the evaluation frames")
+    elif report['detection_recall'] < settings['min_recall']:
+        reasons.append(f"detection recall {report['detection_recall']:.3f} < {settings['min_recall']}")
+
+    if has_knife_class:
+        # Knives are the main threat; never accept a model whose knife recall is unverified
+        if report['knife_recall'] is None:
+            reasons.append("no knife detections in the evaluation frames")
+        elif report['knife_recall'] < settings['min_knife_recall']:
+            reasons.append(f"knife recall {report['knife_recall']:.3f} < {settings['min_knife_recall']}")
+
+    if report['keypoint_error'] is not None and report['keypoint_error'] > settings['max_keypoint_error']:
+        reasons.append(f"keypoint error {report['keypoint_error']:.4f} > {settings['max_keypoint_error']}")
+
+    return not reasons, reasons
+
+
+def format_report(name, report):
+    """Human-readable one-model comparison report"""
+    def fmt(value, digits=3):
+        return 'n/a' if value is None else f"{value:.{digits}f}"
+
+    return (f"{name}: {report['frames']} frames, "
+            f"recall {fmt(report['detection_recall'])} ({report['reference_detections']} FP32 detections), "
+            f"knife recall {fmt(report['knife_recall'])} ({report['knife_detections']} FP32 knives), "
+            f"keypoint error {fmt(report['keypoint_error'], 4)}")
+
+
+def evaluation_inputs(evaluation_dir, predict_args=None, settings=None):
+    """
+    Everything an accuracy report depends on besides the models themselves
+
+    Returns:
+        dict: JSON-serializable evaluation folder (with the name, size and
+        modification time of its frame files), frame limit, match IoU and
+        predict arguments
+    """
+    settings = settings or QUANTIZATION_SETTINGS
+    files = []
+    if evaluation_dir and os.path.isdir(evaluation_dir):
+        for name in sorted(os.listdir(evaluation_dir)):
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS + VIDEO_EXTENSIONS:
+                stat = os.stat(os.path.join(evaluation_dir, name))
+                files.append([name, stat.st_size, stat.st_mtime_ns])
+    return {
+        'evaluation_dir': os.path.abspath(evaluation_dir) if evaluation_dir else None,
+        'evaluation_files': files,
+        'max_evaluation_frames': settings['max_evaluation_frames'],
+        'match_iou': settings['match_iou'],
+        # Round-trip through JSON so the comparison with a loaded report is exact
+        'predict_args': json.loads(json.dumps(predict_args or {}, sort_keys=True, default=str)),
+    }
+
+
+def evaluate_quantized_model(weights, predict_args=None, settings=None):
+    """
+    Quantize a model and compare it with its FP32 version
+
+    The report is cached next to the INT8 model together with its
+    evaluation_inputs(), and recomputed whenever the model is re-quantized
+    or any of those inputs changes.
+
+    Returns:
+        tuple: (int8_path, report, has_knife_class)
+    """
+    settings = settings or QUANTIZATION_SETTINGS
+    export_dir = INFERENCE_SETTINGS['export_dir']
+    imgsz = INFERENCE_SETTINGS['export_imgsz']
+    int8_path = quantize_model(weights, settings['calibration_dir'], export_dir, imgsz,
+                               settings['max_calibration_frames'])
+
+    evaluation_dir = settings['evaluation_dir'] or settings['calibration_dir']
+    inputs = evaluation_inputs(evaluation_dir, predict_args, settings)
+
+    report_path = int8_path + '.report.json'
+    if os.path.exists(report_path) and os.path.getmtime(report_path) >= os.path.getmtime(int8_path):
+        with open(report_path) as f:
+            cached = json.load(f)
+        if cached.get('inputs') == inputs:
+            return int8_path, cached['report'], cached['has_knife_class']
+
+    registry = get_model_registry()
+    reference = registry.acquire(weights, 'cpu', 'fp32')
+    try:
+        candidate = YOLO(int8_path)
+        frames = iter_frames(evaluation_dir, settings['max_evaluation_frames'])
+        report = compare_models(reference, candidate, frames, predict_args, settings['match_iou'])
+        has_knife_class = 'knife' in reference.names.values()
+    finally:
+        registry.release(reference)
+
+    with open(report_path, 'w') as f:
+        json.dump({'report': report, 'has_knife_class': has_knife_class, 'inputs': inputs}, f, indent=2)
+    return int8_path, report, has_knife_class
+
+
+def prepare_quantized_model(weights, predict_args=None, settings=None):
+    """
+    Get the INT8 model for a weights file if it passes the accuracy gate
+
+    Returns:
+        str or None: Path of the INT8 model, or None when quantization is
+        unavailable or the model is not accurate enough (use FP32 instead)
+    """
+    settings = settings or QUANTIZATION_SETTINGS
+    name = os.path.basename(weights)
+
+    if not YOLO_AVAILABLE or not backend_available('onnx'):
+        print(f"[WARNING] INT8 {name}: ultralytics and onnxruntime are required, using FP32")
+        return None
+    if next(iter_frames(settings['calibration_dir'], 1), None) is None:
+        print(f"[WARNING] INT8 {name}: no calibration frames in {settings['calibration_dir']}, using FP32")
+        return None
+
+    try:
+        int8_path, report, has_knife_class = evaluate_quantized_model(weights, predict_args, settings)
+    except Exception as e:
+        print(f"[WARNING] INT8 {name}: quantization failed ({e}), using FP32")
+        return None
+
+    print(f"[INFO] {format_report('INT8 ' + name, report)}")
+    passed, reasons = check_report(report, has_knife_class, settings)
+    if not passed:
+        print(f"[WARNING] INT8 {name} refused: {'; '.join(reasons)}. Using FP32")
+        return None
+    return int8_path
+
+
+def main():
+    """Quantize the configured models and print the accuracy report"""
+    parser = argparse.ArgumentParser(description="WatchHer INT8 quantization and accuracy report")
+    parser.add_argument('--weights', nargs='+',
+                        default=[INFERENCE_SETTINGS['pose_model'], INFERENCE_SETTINGS['object_model']],
+                        help='Models to quantize')
+    parser.add_argument('--calibration-dir', default=QUANTIZATION_SETTINGS['calibration_dir'],
+                        help='Folder of frames or clips used for calibration')
+    parser.add_argument('--evaluation-dir', default=QUANTIZATION_SETTINGS['evaluation_dir'],
+                        help='Folder of frames or clips for the report (default: calibration folder)')
+    args = parser.parse_args()
+
+    settings = dict(QUANTIZATION_SETTINGS, calibration_dir=args.calibration_dir,
+                    evaluation_dir=args.evaluation_dir)
+    failed = False
+    for weights in args.weights:
+        int8_path, report, has_knife_class = evaluate_quantized_model(weights, settings=settings)
+        passed, reasons = check_report(report, has_knife_class, settings)
+        print(format_report(os.path.basename(weights), report))
+        print(f"  {'PASS' if passed else 'FAIL: ' + '; '.join(reasons)} ({int8_path})")
+        failed = failed or not passed
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
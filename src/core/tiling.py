@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tiled Object Detection for WatchHer System
+Runs the object detector on overlapping native-resolution tiles of selected
+frame regions so small weapons survive on high-resolution feeds
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import numpy as np
+
+from src.core.postprocess import result_to_arrays, merge_overlapping
+from src.core.event_log import get_event_logger
+
+events = get_event_logger('tiling')
+
+
+def tile_grid(region, tile_size, overlap):
+    """
+    Cover a pixel region with overlapping square tiles
+
+    Args:
+        region: (x1, y1, x2, y2) in pixels
+        tile_size: Tile side length in pixels
+        overlap: Fraction of a tile shared with its neighbour
+
+    Returns:
+        list: (x1, y1, x2, y2) tiles; edge tiles are shifted inwards so every
+        tile keeps the full size when the region allows it
+    """
+    x1, y1, x2, y2 = region
+    stride = max(1, int(tile_size * (1 - overlap)))
+
+    def starts(low, high):
+        if high - low <= tile_size:
+            return [low]
+        positions = list(range(low, high - tile_size, stride))
+        positions.append(high - tile_size)
+        return positions
+
+    return [(x, y, min(x + tile_size, x2), min(y + tile_size, y2))
+            for y in starts(y1, y2) for x in starts(x1, x2)]
+
+
+class TiledObjectDetector:
+    """
+    Overlapping-tile pass for the object detector
+
+    Tiles are cut only from the configured regions (normalized x1, y1, x2, y2
+    fractions of the frame), sent through the model as one batch at native
+    resolution, shifted back to frame coordinates and merged with the
+    full-frame detections.
+    """
+
+    def __init__(self, regions=((0.0, 0.0, 1.0, 1.0),), tile_size=640, overlap=0.2,
+                 min_frame_side=1280, max_tiles=16, merge_threshold=0.5):
+        """
+        Args:
+            regions: Normalized (x1, y1, x2, y2) regions to tile
+            tile_size: Tile side length in frame pixels
+            overlap: Fraction of overlap between neighbouring tiles
+            min_frame_side: Frames whose longest side is smaller are not tiled
+            max_tiles: Upper bound on tiles per frame
+            merge_threshold: Intersection-over-smaller threshold for merging duplicates
+        """
+        self.regions = [tuple(region) for region in regions]
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.min_frame_side = min_frame_side
+        self.max_tiles = max_tiles
+        self.merge_threshold = merge_threshold
+        self._tiles_cache = {}
+
+    @classmethod
+    def from_settings(cls, settings, regions=None):
+        """Build the tiler from a TILING_SETTINGS-style dict, optionally overriding the regions"""
+        options = {key: value for key, value in settings.items() if key != 'enabled'}
+        if regions is not None:
+            options['regions'] = regions
+        return cls(**options)
+
+    def tiles_for(self, frame_shape):
+        """Pixel tiles for a frame shape (cached, the shape rarely changes)"""
+        h, w = frame_shape[:2]
+        if (h, w) not in self._tiles_cache:
+            tiles = []
+            if max(h, w) >= self.min_frame_side:
+                for rx1, ry1, rx2, ry2 in self.regions:
+                    region = (int(rx1 * w), int(ry1 * h), int(rx2 * w), int(ry2 * h))
+                    if region[2] > region[0] and region[3] > region[1]:
+                        tiles.extend(tile_grid(region, self.tile_size, self.overlap))
+            if len(tiles) > self.max_tiles:
+                events.warning('tiling_max_tiles', "Tiling: %d tiles for a %dx%d frame, only the first %d are used",
+                               len(tiles), w, h, self.max_tiles)
+                tiles = tiles[:self.max_tiles]
+            self._tiles_cache[(h, w)] = tiles
+        return self._tiles_cache[(h, w)]
+
+    def detect(self, model, frame, args):
+        """
+        Run the model on all tiles of a frame in one batched call
+
+        Returns:
+            dict: result_to_arrays()-style arrays in frame coordinates
+        """
+        tiles = self.tiles_for(frame.shape)
+        arrays = {'xyxy': np.zeros((0, 4), dtype=int), 'conf': np.zeros(0, dtype=np.float32),
+                  'cls': np.zeros(0, dtype=int), 'keypoints': None}
+        if not tiles:
+            return arrays
+
+        crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+        results = model(crops, verbose=False, **dict(args, imgsz=self.tile_size))
+
+        xyxy, conf, cls = [], [], []
+        for (x1, y1, _, _), result in zip(tiles, results):
+            tile_arrays = result_to_arrays(result)
+            xyxy.append(tile_arrays['xyxy'] + np.array([x1, y1, x1, y1]))
+            conf.append(tile_arrays['conf'])
+            cls.append(tile_arrays['cls'])
+        arrays['xyxy'] = np.concatenate(xyxy).astype(int)
+        arrays['conf'] = np.concatenate(conf)
+        arrays['cls'] = np.concatenate(cls)
+        return arrays
+
+    def merge(self, full_frame, tiled):
+        """Merge full-frame and tile detections, dropping duplicates across tile borders"""
+        xyxy = np.concatenate([full_frame['xyxy'], tiled['xyxy']]).astype(int)
+        conf = np.concatenate([full_frame['conf'], tiled['conf']])
+        cls = np.concatenate([full_frame['cls'], tiled['cls']])
+        keep, merged = merge_overlapping(xyxy, conf, cls, self.merge_threshold)
+        return {'xyxy': merged, 'conf': conf[keep], 'cls': cls[keep], 'keypoints': None}
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Multi-Object Tracking for WatchHer System
+ByteTrack-style IoU association with a constant-velocity Kalman filter, so
+people and harmful objects keep the same ID from frame to frame
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import numpy as np
+
+from src.core.postprocess import box_iou
+
+
+def greedy_match(iou, threshold):
+    """
+    Match rows to columns by descending IoU
+
+    Args:
+        iou: (T, D) IoU matrix
+        threshold: Minimum IoU for a match
+
+    Returns:
+        list: (row, column) pairs
+    """
+    if iou.size == 0:
+        return []
+    rows, cols = np.nonzero(iou >= threshold)
+    order = np.argsort(-iou[rows, cols], kind='stable')
+    used_rows, used_cols = set(), set()
+    pairs = []
+    for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+        if row in used_rows or col in used_cols:
+            continue
+        used_rows.add(row)
+        used_cols.add(col)
+        pairs.append((row, col))
+    return pairs
+
+
+def xyxy_to_state(bboxes):
+    """(N, 4) boxes to (N, 4) center x, center y, width, height"""
+    bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    return np.stack([(bboxes[:, 0] + bboxes[:, 2]) / 2, (bboxes[:, 1] + bboxes[:, 3]) / 2,
+                     bboxes[:, 2] - bboxes[:, 0], bboxes[:, 3] - bboxes[:, 1]], axis=1)
+
+
+def state_to_xyxy(state):
+    """(N, >=4) center/size states to (N, 4) boxes"""
+    cx, cy = state[:, 0], state[:, 1]
+    w, h = np.maximum(state[:, 2], 1.0), np.maximum(state[:, 3], 1.0)
+    return np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+
+class MultiObjectTracker:
+    """
+    ByteTrack-style tracker over all tracks of one object kind at once
+
+    Track states (center, size and their velocities, in pixels per second)
+    and covariances are kept in stacked arrays and predicted / corrected in
+    one batched Kalman step per frame. Each frame:
+
+    1. confident detections are matched to all tracks by IoU
+    2. the remaining low-confidence detections get a second chance against
+       the tracks still unmatched, which keeps IDs through partial occlusion
+    3. unmatched confident detections start new tracks; unmatched
+       low-confidence ones stay untracked (ID -1), so noise does not churn
+       IDs. Tracks not seen for max_lost_seconds (or unconfirmed tracks
+       that miss once) are dropped
+
+    Detections only match tracks of the same class label.
+    """
+
+    def __init__(self, high_threshold=0.5, match_iou=0.3, low_match_iou=0.5,
+                 max_lost_seconds=1.5, min_hits=2):
+        """
+        Args:
+            high_threshold: Confidence separating first- and second-stage detections;
+                            only detections at or above it start new tracks
+            match_iou: Minimum IoU for first-stage matches
+            low_match_iou: Minimum IoU for second-stage (low-confidence) matches
+            max_lost_seconds: How long a track survives without detections
+            min_hits: Detections needed before a track is confirmed
+        """
+        self.high_threshold = high_threshold
+        self.match_iou = match_iou
+        self.low_match_iou = low_match_iou
+        self.max_lost_seconds = max_lost_seconds
+        self.min_hits = min_hits
+
+        self.states = np.zeros((0, 8))
+        self.covariances = np.zeros((0, 8, 8))
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.labels = []
+        self.hits = np.zeros(0, dtype=np.int64)
+        self.first_seen = np.zeros(0)
+        self.last_seen = np.zeros(0)
+
+        self._next_id = 1
+        self._last_time = None
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build the tracker from a TRACKING_SETTINGS-style dict"""
+        return cls(**{key: value for key, value in settings.items() if key != 'enabled'})
+
+    def __len__(self):
+        return len(self.ids)
+
+    # Kalman filter -----------------------------------------------------
+
+    # Noise is specified per frame at this rate and scaled by elapsed time
+    NOMINAL_FPS = 30.0
+
+    @staticmethod
+    def _noise_scale(heights):
+        """Noise grows with box height, so near and far people behave alike"""
+        return np.maximum(heights, 1.0)
+
+    def _predict(self, dt):
+        """Advance every track by dt seconds"""
+        if not len(self) or dt <= 0:
+            return
+        transition = np.eye(8)
+        transition[:4, 4:] = np.eye(4) * dt
+
+        scale = self._noise_scale(self.states[:, 3])
+        steps = np.sqrt(dt * self.NOMINAL_FPS)
+        position_std = 0.05 * scale * steps
+        velocity_std = 0.2 * scale * steps
+        process = np.zeros((len(self), 8, 8))
+        process[:, range(4), range(4)] = (position_std ** 2)[:, None]
+        process[:, range(4, 8), range(4, 8)] = (velocity_std ** 2)[:, None]
+
+        self.states = self.states @ transition.T
+        self.covariances = transition @ self.covariances @ transition.T + process
+
+    def _correct(self, track_idx, measurements):
+        """Kalman update for the matched tracks"""
+        if not len(track_idx):
+            return
+        states = self.states[track_idx]
+        covariances = self.covariances[track_idx]
+
+        measurement_std = 0.05 * self._noise_scale(states[:, 3])
+        noise = np.zeros((len(track_idx), 4, 4))
+        noise[:, range(4), range(4)] = (measurement_std ** 2)[:, None]
+
+        projected = covariances[:, :4, :4] + noise
+        cross = covariances[:, :, :4]
+        # K = P H^T S^-1, solved instead of inverted
+        gain = np.linalg.solve(projected, cross.transpose(0, 2, 1)).transpose(0, 2, 1)
+        innovation = measurements - states[:, :4]
+
+        self.states[track_idx] = states + np.einsum('nij,nj->ni', gain, innovation)
+        self.covariances[track_idx] = covariances - gain @ covariances[:, :4, :]
+
+    def _new_tracks(self, measurements, labels, now):
+        """Start tracks for unmatched detections"""
+        n = len(measurements)
+        if not n:
+            return
+        scale = self._noise_scale(measurements[:, 3])
+        states = np.concatenate([measurements, np.zeros((n, 4))], axis=1)
+        covariances = np.zeros((n, 8, 8))
+        covariances[:, range(4), range(4)] = ((0.1 * scale) ** 2)[:, None]
+        covariances[:, range(4, 8), range(4, 8)] = ((2.0 * scale) ** 2)[:, None]
+
+        self.states = np.concatenate([self.states, states])
+        self.covariances = np.concatenate([self.covariances, covariances])
+        self.ids = np.concatenate([self.ids, np.arange(self._next_id, self._next_id + n)])
+        self._next_id += n
+        self.labels.extend(labels)
+        self.hits = np.concatenate([self.hits, np.ones(n, dtype=np.int64)])
+        self.first_seen = np.concatenate([self.first_seen, np.full(n, now)])
+        self.last_seen = np.concatenate([self.last_seen, np.full(n, now)])
+
+    def _keep(self, mask):
+        self.states = self.states[mask]
+        self.covariances = self.covariances[mask]
+        self.ids = self.ids[mask]
+        self.labels = [label for label, keep in zip(self.labels, mask) if keep]
+        self.hits = self.hits[mask]
+        self.first_seen = self.first_seen[mask]
+        self.last_seen = self.last_seen[mask]
+
+    # Association -------------------------------------------------------
+
+    def _match(self, track_idx, det_idx, predicted, bboxes, labels, threshold):
+        """IoU-match a subset of tracks to a subset of detections (same label only)"""
+        if not len(track_idx) or not len(det_idx):
+            return []
+        iou = box_iou(predicted[track_idx], bboxes[det_idx])
+        track_labels = np.array([self.labels[i] for i in track_idx], dtype=object)
+        det_labels = np.array([labels[i] for i in det_idx], dtype=object)
+        iou[track_labels[:, None] != det_labels[None, :]] = 0.0
+        return [(track_idx[t], det_idx[d]) for t, d in greedy_match(iou, threshold)]
+
+    def update(self, bboxes, confidences, labels=None, now=None):
+        """
+        Associate one frame's detections with the tracks
+
+        Args:
+            bboxes: (N, 4) detection boxes
+            confidences: (N,) detection confidences
+            labels: Class label per detection (default: one class)
+            now: Frame time in seconds (default: time.monotonic())
+
+        Returns:
+            tuple: ((N,) track IDs, (N,) seconds each track has existed)
+        """
+        now = time.monotonic() if now is None else now
+        bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        confidences = np.asarray(confidences, dtype=np.float64).reshape(-1)
+        labels = list(labels) if labels is not None else [None] * len(bboxes)
+
+        dt = 0.0 if self._last_time is None else now - self._last_time
+        self._last_time = now
+        self._predict(dt)
+
+        predicted = state_to_xyxy(self.states)
+        measurements = xyxy_to_state(bboxes)
+        all_tracks = np.arange(len(self))
+        high = np.flatnonzero(confidences >= self.high_threshold)
+        low = np.flatnonzero(confidences < self.high_threshold)
+
+        # Stage 1: confident detections against every track
+        matches = self._match(all_tracks, high, predicted, bboxes, labels, self.match_iou)
+        matched_tracks = {t for t, _ in matches}
+        matched_dets = {d for _, d in matches}
+
+        # Stage 2: low-confidence detections against the leftover tracks
+        leftover = np.array([t for t in all_tracks if t not in matched_tracks], dtype=int)
+        second = self._match(leftover, low, predicted, bboxes, labels, self.low_match_iou)
+        matches += second
+        matched_tracks.update(t for t, _ in second)
+        matched_dets.update(d for _, d in second)
+
+        track_ids = np.full(len(bboxes), -1, dtype=np.int64)
+        track_ages = np.zeros(len(bboxes))
+        if matches:
+            track_idx = np.array([t for t, _ in matches])
+            det_idx = np.array([d for _, d in matches])
+            self._correct(track_idx, measurements[det_idx])
+            self.hits[track_idx] += 1
+            self.last_seen[track_idx] = now
+
+        # Drop tracks that were lost for too long, or unconfirmed and missed
+        missed = np.ones(len(self), dtype=bool)
+        missed[list(matched_tracks)] = False
+        unconfirmed = self.hits < self.min_hits
+        expired = (now - self.last_seen) > self.max_lost_seconds
+        keep = ~(missed & (unconfirmed | expired))
+
+        # Remember which detection each surviving track belongs to
+        det_of_track = np.full(len(self), -1, dtype=int)
+        for t, d in matches:
+            det_of_track[t] = d
+        self._keep(keep)
+        det_of_track = det_of_track[keep]
+
+        matched = det_of_track >= 0
+        track_ids[det_of_track[matched]] = self.ids[matched]
+        track_ages[det_of_track[matched]] = now - self.first_seen[matched]
+
+        # Unmatched confident detections start tracks; low-confidence ones
+        # only ever extend existing tracks
+        new_dets = np.array([d for d in high.tolist() if d not in matched_dets], dtype=int)
+        first_new = len(self)
+        self._new_tracks(measurements[new_dets], [labels[d] for d in new_dets], now)
+        track_ids[new_dets] = self.ids[first_new:]
+
+        return track_ids, track_ages
+
+    def active_ids(self):
+        """IDs of all tracks currently kept, including briefly lost ones"""
+        return set(self.ids.tolist())
@@ -5,23 +5,118 @@ Provides fast, lightweight face detection using YOLOv8 face models
 Alternative to DeepFace/TensorFlow for real-time performance
 """
 
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
 import cv2
 import numpy as np
 import torch
-from ultralytics import YOLO
-import os
 import urllib.request
 import warnings
 
+from src.core.model_registry import get_model_registry, resolve_device
+from src.core.event_log import get_event_logger
+
 warnings.filterwarnings("ignore")
 
+events = get_event_logger('face_detector')
+
+
+def letterbox(image, size, pad_value=114):
+    """
+    Resize an image into a square canvas keeping its aspect ratio
+    
+    Args:
+        image: Input image (numpy array)
+        size: Side length of the output canvas
+        pad_value: Gray level used for the padding
+        
+    Returns:
+        tuple: (canvas, scale, (pad_x, pad_y)) where a point p in the canvas
+        maps back to the image as (p - pad) / scale
+    """
+    h, w = image.shape[:2]
+    scale = min(size / h, size / w)
+    new_w = max(1, int(round(w * scale)))
+    new_h = max(1, int(round(h * scale)))
+    resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    
+    pad_x = (size - new_w) // 2
+    pad_y = (size - new_h) // 2
+    canvas = np.full((size, size, 3), pad_value, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = resized
+    return canvas, scale, (pad_x, pad_y)
+
+
+# COCO pose keypoint indices for the head
+NOSE, LEFT_EYE, RIGHT_EYE, LEFT_EAR, RIGHT_EAR = 0, 1, 2, 3, 4
+
+
+def face_bbox_from_keypoints(keypoints, frame_shape, min_confidence=0.5, min_points=2):
+    """
+    Build a face bounding box from pose head keypoints
+    
+    Uses the nose, eye and ear keypoints that the pose model already returns,
+    so no second model pass is needed to locate the face.
+    
+    Args:
+        keypoints: (17, 3) array of COCO keypoints (x, y, confidence)
+        frame_shape: Shape of the frame the keypoints refer to
+        min_confidence: Minimum confidence for a head keypoint to be used
+        min_points: Minimum number of confident head keypoints required
+        
+    Returns:
+        tuple: ([x1, y1, x2, y2], confidence) or None if the keypoints are
+        not confident enough to localise the face
+    """
+    if keypoints is None or len(keypoints) <= RIGHT_EAR:
+        return None
+    
+    head = np.asarray(keypoints[:RIGHT_EAR + 1], dtype=np.float32)
+    visible = head[:, 2] >= min_confidence
+    if np.count_nonzero(visible) < min_points:
+        return None
+    
+    # Face width from the widest confident pair: ears span about the whole
+    # face, eyes about 40% of it
+    if visible[LEFT_EAR] and visible[RIGHT_EAR]:
+        face_width = abs(head[LEFT_EAR, 0] - head[RIGHT_EAR, 0]) * 1.2
+    elif visible[LEFT_EYE] and visible[RIGHT_EYE]:
+        face_width = abs(head[LEFT_EYE, 0] - head[RIGHT_EYE, 0]) * 2.5
+    else:
+        # Profile view: only one side is visible
+        points = head[visible]
+        face_width = (points[:, 0].max() - points[:, 0].min()) * 2.0
+    
+    if face_width <= 20:  # Same minimum as the person-based estimate
+        return None
+    face_height = face_width * 1.3
+    
+    # Eyes and nose sit slightly above the middle of the face
+    center_x = float(np.mean(head[visible, 0]))
+    center_y = float(np.mean(head[visible, 1]))
+    
+    h, w = frame_shape[:2]
+    fx1 = max(0, int(center_x - face_width / 2))
+    fy1 = max(0, int(center_y - face_height * 0.55))
+    fx2 = min(w, int(center_x + face_width / 2))
+    fy2 = min(h, int(center_y + face_height * 0.45))
+    
+    if fx2 <= fx1 or fy2 <= fy1:
+        return None
+    
+    return [fx1, fy1, fx2, fy2], float(np.mean(head[visible, 2]))
+
+
 class YOLOFaceDetector:
     """
     Custom YOLO-based face detector
     Uses YOLOv8 face detection models for fast, accurate face detection
     """
     
-    def __init__(self, model_size='n', confidence_threshold=0.5, device='auto'):
+    def __init__(self, model_size='n', confidence_threshold=0.5, device='auto', precision='fp32',
+                 batch_imgsz=320, max_batch_size=32, backend='torch'):
         """
         Initialize YOLO face detector
         
@@ -29,30 +124,36 @@ class YOLOFaceDetector:
             model_size: 'n' (nano), 's' (small), 'm' (medium), 'l' (large), 'x' (extra large)
             confidence_threshold: Minimum confidence for face detection
             device: 'auto', 'cpu', or 'cuda'
+            precision: 'fp32' or 'fp16' (fp16 only applies on CUDA)
+            batch_imgsz: Canvas size crops are letterboxed to in detect_faces_batch
+            max_batch_size: Maximum number of crops per forward pass
+            backend: Inference runtime ('torch', 'onnx' or 'openvino')
         """
         self.confidence_threshold = confidence_threshold
+        self.batch_imgsz = batch_imgsz
+        self.max_batch_size = max_batch_size
         self.model = None
         self.device = self._setup_device(device)
+        self.precision = precision
+        self.backend = backend
         self._load_face_model(model_size)
     
     def _setup_device(self, device):
         """Setup computing device"""
-        if device == 'auto':
-            return 'cuda' if torch.cuda.is_available() else 'cpu'
-        return device
+        return resolve_device(device)
     
     def _load_face_model(self, model_size):
         """Load YOLOv8 face detection model"""
         try:
             # Use general YOLOv8 model and detect persons, then estimate face region
+            # Shared with AIAnalyzer's object detector through the model registry
             print(f"[INFO] Loading YOLOv8{model_size} for person detection and face estimation")
-            self.model = YOLO(f'yolov8{model_size}.pt')
+            self.model = get_model_registry().acquire(f'yolov8{model_size}.pt', self.device, self.precision,
+                                                    self.backend)
             print(f"[INFO] ✅ YOLOv8{model_size} general model loaded")
             
-            # Move to specified device
             if self.device == 'cuda' and torch.cuda.is_available():
-                self.model.to('cuda')
-                print(f"[INFO] Model moved to CUDA: {torch.cuda.get_device_name()}")
+                print(f"[INFO] Model running on CUDA: {torch.cuda.get_device_name()}")
             else:
                 print("[INFO] Model running on CPU")
                 
@@ -106,9 +207,72 @@ class YOLOFaceDetector:
             return faces
             
         except Exception as e:
-            print(f"[ERROR] Face detection failed: {e}")
+            events.error('face_error', "Face detection failed: %s", e)
             return []
     
+    def detect_faces_batch(self, crops):
+        """
+        Detect faces in several crops with one forward pass per batch
+        
+        Every crop is letterboxed to batch_imgsz so the whole list can be
+        stacked into a single tensor batch, and the detections are mapped
+        back into each crop's own coordinates.
+        
+        Args:
+            crops: List of input images (numpy arrays), e.g. person crops
+            
+        Returns:
+            List with one entry per crop, each in the detect_faces() format
+        """
+        results = [[] for _ in crops]
+        if self.model is None:
+            return results
+        
+        valid = [i for i, crop in enumerate(crops) if crop is not None and crop.size > 0]
+        
+        for start in range(0, len(valid), self.max_batch_size):
+            chunk = valid[start:start + self.max_batch_size]
+            try:
+                canvases = []
+                transforms = []
+                for i in chunk:
+                    canvas, scale, pad = letterbox(crops[i], self.batch_imgsz)
+                    canvases.append(canvas)
+                    transforms.append((scale, pad))
+                
+                batch_results = self.model(canvases, imgsz=self.batch_imgsz, verbose=False)
+                
+                for i, result, (scale, (pad_x, pad_y)) in zip(chunk, batch_results, transforms):
+                    if not result.boxes:
+                        continue
+                    
+                    boxes = result.boxes
+                    xyxy = boxes.xyxy.cpu().numpy()
+                    confidences = boxes.conf.cpu().numpy()
+                    class_ids = boxes.cls.cpu().numpy().astype(int)
+                    
+                    # Undo the letterbox to get back to crop coordinates
+                    h, w = crops[i].shape[:2]
+                    xyxy = (xyxy - [pad_x, pad_y, pad_x, pad_y]) / scale
+                    xyxy = np.clip(xyxy, 0, [w, h, w, h]).astype(int).tolist()
+                    
+                    for (x1, y1, x2, y2), confidence, class_id in zip(xyxy, confidences, class_ids):
+                        if self.model.names[class_id] != 'person' or confidence <= self.confidence_threshold:
+                            continue
+                        face_bbox = self._estimate_face_from_person(x1, y1, x2, y2)
+                        if face_bbox:
+                            results[i].append({
+                                'bbox': face_bbox,
+                                'confidence': float(confidence) * 0.8,  # Slightly lower confidence for estimated faces
+                                'landmarks': None,
+                                'type': 'estimated_face'
+                            })
+                            
+            except Exception as e:
+                events.error('face_error', "Batched face detection failed: %s", e)
+        
+        return results
+    
     def _estimate_face_from_person(self, x1, y1, x2, y2):
         """
         Estimate face bounding box from person detection
@@ -196,6 +360,11 @@ class YOLOFaceDetector:
     def is_ready(self):
         """Check if detector is ready"""
         return self.model is not None
+    
+    def release(self):
+        """Return the model to the shared registry"""
+        get_model_registry().release(self.model)
+        self.model = None
 
 
 class SimpleFaceAttributeClassifier:
@@ -279,7 +448,8 @@ class SimpleFaceAttributeClassifier:
 
 
 # Factory function to create face detector
-def create_face_detector(model_size='n', confidence=0.5, device='auto'):
+def create_face_detector(model_size='n', confidence=0.5, device='auto', precision='fp32', batch_imgsz=320,
+                         backend='torch'):
     """
     Factory function to create a face detector
     
@@ -287,8 +457,11 @@ def create_face_detector(model_size='n', confidence=0.5, device='auto'):
         model_size: YOLO model size ('n', 's', 'm', 'l', 'x')
         confidence: Confidence threshold (0.0-1.0)
         device: Computing device ('auto', 'cpu', 'cuda')
+        precision: Model precision ('fp32', 'fp16')
+        batch_imgsz: Canvas size for batched detection
+        backend: Inference runtime ('torch', 'onnx', 'openvino')
         
     Returns:
         YOLOFaceDetector instance
     """
-    return YOLOFaceDetector(model_size, confidence, device) 
\ No newline at end of file
+    return YOLOFaceDetector(model_size, confidence, device, precision, batch_imgsz, backend=backend) 
\ No newline at end of file
@@ -60,6 +60,324 @@ DETECTION_SETTINGS = {
     }
 }
 
+# Inference Settings
+INFERENCE_SETTINGS = {
+    # Computing device for the YOLO models ('auto', 'cpu' or 'cuda')
+    'device': 'auto',
+    
+    # Model precision ('fp32', 'fp16' or 'int8'; fp16 only takes effect on
+    # CUDA, int8 runs statically calibrated ONNX Runtime models on CPU and is
+    # only enabled if they pass the QUANTIZATION_SETTINGS accuracy gate)
+    'precision': 'fp32',
+    
+    # Inference runtime: 'torch' (Ultralytics/PyTorch), 'onnx' (ONNX Runtime)
+    # or 'openvino' (OpenVINO, CPU). Exported models are cached in export_dir
+    # (under the project root); a missing runtime falls back to 'torch'
+    'backend': 'torch',
+    'export_dir': os.path.join(os.path.dirname(__file__), '..', '..', 'models', 'exports'),
+    'export_imgsz': 640,
+    
+    # Object detector profile (class whitelist and per-class thresholds),
+    # see src/core/detection_profile.py
+    'object_profile': 'weapons',
+    
+    # Run the pose and object detectors concurrently on a dedicated thread
+    # pool. Has no effect while CASCADE_SETTINGS is enabled: the cascade
+    # needs the pose results before it runs the object detector
+    'concurrent_inference': True,
+    
+    # PyTorch intra-op threads (None: half the CPU cores when inference is
+    # concurrent, so the two models do not oversubscribe the CPU)
+    'intra_op_threads': None,
+    
+    # How faces are located: 'keypoints' builds the face box from the pose
+    # head keypoints and only falls back to the face detector when they are
+    # not confident; 'detector' always runs the face detector
+    'face_localization': 'keypoints',
+    
+    # Minimum head keypoint confidence for keypoint-based face boxes
+    'face_keypoint_confidence': 0.5,
+    
+    # Per-frame time budget for analyze_frame() in milliseconds (None: no
+    # limit). Attribute analysis runs highest-risk / largest people first;
+    # people left over when the budget runs out keep cached or 'unknown'
+    # attributes and the result is flagged as partial. Only used when
+    # ENRICHMENT_SETTINGS is off: the attribute lane already keeps attribute
+    # work off the frame path and flags people still waiting as partial
+    'frame_deadline_ms': None,
+    
+    # Model weights
+    'pose_model': 'yolo11n-pose.pt',
+    'object_model': 'yolov8n.pt',
+}
+
+# Logging settings for src/core (see src/core/event_log.py)
+LOGGING_SETTINGS = {
+    # 'DEBUG' adds per-candidate detail such as knife validation
+    'level': 'INFO',
+    'format': '[%(levelname)s] %(message)s',
+    
+    # Write log lines from a background thread; records are dropped (and
+    # counted) instead of blocking when queue_size records are pending
+    'queue': True,
+    'queue_size': 10000,
+    
+    # Rate limit (messages per second, burst) for events without a rule
+    'default_rate': 10.0,
+    'default_burst': 20,
+    
+    # Per-event rules: rate, burst and sample_every (only every Nth
+    # occurrence is considered). Suppressed events are still counted
+    'events': {
+        'knife_detected': {'rate': 1.0, 'burst': 3},
+        'weapon_detected': {'rate': 1.0, 'burst': 3},
+        'potential_weapon': {'rate': 0.2, 'burst': 1, 'sample_every': 10},
+        'harmful_objects_total': {'rate': 0.5, 'burst': 1},
+        'knife_validation': {'rate': 2.0, 'burst': 4},
+        'frame_error': {'rate': 1.0, 'burst': 5},
+        'face_error': {'rate': 0.5, 'burst': 3},
+        'attribute_error': {'rate': 0.5, 'burst': 3},
+        'tiling_max_tiles': {'rate': 0.1, 'burst': 1},
+    },
+}
+
+# Model artifact cache settings (see src/core/model_cache.py)
+MODEL_CACHE_SETTINGS = {
+    # Load models by name only from the local, checksummed artifact cache
+    'enabled': True,
+    'cache_dir': os.path.join(os.path.dirname(__file__), '..', '..', 'models', 'cache'),
+    
+    # Prepare missing artifacts on first use (downloads the weights). Set to
+    # False on air-gapped sites and populate the cache ahead of time with
+    # python -m src.core.model_cache populate
+    'populate_on_demand': True,
+    
+    # Check SHA-256 of every artifact before loading it (size only if False)
+    'verify_checksums': True,
+}
+
+# Model startup settings (see src/core/startup.py)
+STARTUP_SETTINGS = {
+    # Load the models on a background thread; AIAnalyzer returns at once and
+    # sets its ready_event when loading and warm-up are done
+    'background_load': True,
+    
+    # Load the pose, object and face models at the same time
+    'parallel_load': True,
+    
+    # Run warm-up inference at the current input size so the first real
+    # frame does not pay for lazy kernel and predictor initialisation
+    'warmup': True,
+    'warmup_runs': 1,
+    'warmup_frame_size': (480, 640),  # (height, width) of the synthetic frame
+}
+
+# Adaptive inference resolution settings (see src/core/adaptive_resolution.py)
+RESOLUTION_SETTINGS = {
+    # Pick the detector input size per frame from the scene content.
+    # Opt-in: smaller sizes can miss small objects in simple scenes
+    'enabled': False,
+    
+    # Allowed input sizes (multiples of 32) and the starting size
+    'levels': (320, 480, 640, 800),
+    'initial': 640,
+    
+    # Raise the size for crowds of small people or small knife candidates,
+    # lower it for a few large people (sizes in model input pixels)
+    'many_people': 6,
+    'few_people': 3,
+    'small_person_px': 64,
+    'large_person_px': 96,
+    'small_object_px': 24,
+    
+    # Hysteresis: raise quickly, lower only after a sustained easy scene
+    'up_frames': 2,
+    'down_frames': 30,
+    'cooldown_frames': 15,
+}
+
+# Multi-object tracking settings (see src/core/tracker.py)
+TRACKING_SETTINGS = {
+    # Assign stable track IDs to people and harmful objects across frames
+    'enabled': True,
+    
+    # Detections at or above this confidence are matched first and may
+    # start new tracks; the rest only extend existing tracks (ByteTrack-style
+    # second association) and stay untracked otherwise
+    'high_threshold': 0.5,
+    'match_iou': 0.3,
+    'low_match_iou': 0.5,
+    
+    # Tracks survive this long without detections (occlusions, skipped frames)
+    'max_lost_seconds': 1.5,
+    
+    # Detections needed before a track is confirmed
+    'min_hits': 2,
+}
+
+# Per-track attribute cache settings (see src/core/attribute_cache.py)
+ATTRIBUTE_CACHE_SETTINGS = {
+    # Reuse age / gender estimates per track ID instead of re-estimating
+    # every person on every frame (needs TRACKING_SETTINGS['enabled'])
+    'enabled': True,
+    
+    # Re-estimate a track after this many seconds, or earlier when a face
+    # view this many times better than the best one so far appears
+    'refresh_seconds': 5.0,
+    'better_view_ratio': 1.5,
+    
+    # Estimates collected before the cached values are used
+    'min_votes': 3,
+    
+    # Weight kept by older estimates in the gender vote and age mean
+    'decay': 0.8,
+}
+
+# Asynchronous attribute enrichment settings (see src/core/attribute_lane.py)
+ENRICHMENT_SETTINGS = {
+    # Estimate age / gender on background workers; frames are returned with
+    # the cached attributes and fresh estimates are attached to their tracks
+    # a frame or two later (needs ATTRIBUTE_CACHE_SETTINGS['enabled']).
+    # Opt-in: new people are reported as 'unknown' until their estimate lands
+    'enabled': False,
+    
+    # Worker threads, and jobs queued or running before new ones are dropped
+    'workers': 1,
+    'max_pending': 2,
+}
+
+# Frame admission settings (see src/core/frame_admission.py)
+ADMISSION_SETTINGS = {
+    # Skip inference on frames without motion or with poor quality and
+    # reuse the previous results instead. Opt-in: results can be up to
+    # max_reuse_seconds (idle_interval when idle) old
+    'enabled': False,
+    
+    # Motion detection: 'diff' (frame differencing) or 'mog2' (background
+    # subtractor), run on a downscaled grayscale thumbnail
+    'method': 'diff',
+    'thumbnail_width': 160,
+    'pixel_delta': 25,
+    'motion_fraction': 0.005,
+    
+    # Quality gates: Laplacian variance (blur) and mean brightness (darkness)
+    'blur_threshold': 20.0,
+    'dark_threshold': 20.0,
+    
+    # Refresh the results at least this often even without motion (seconds)
+    'max_reuse_seconds': 2.0,
+    
+    # After this long without motion, analyze one frame per idle_interval
+    'idle_seconds': 60.0,
+    'idle_interval': 5.0,
+}
+
+# Keyframe detection settings (see src/core/keyframes.py)
+KEYFRAME_SETTINGS = {
+    # Run the detectors on keyframes only and move the last results with
+    # sparse optical flow on the frames in between. Opt-in: objects that
+    # appear between keyframes are only reported on the next keyframe
+    'enabled': False,
+    
+    # Frames between keyframes, adapted to scene motion
+    'min_interval': 1,
+    'max_interval': 6,
+    
+    # Motion (frame pixels per frame) below which the interval grows, and
+    # above which it drops back to min_interval
+    'low_motion_px': 1.5,
+    'high_motion_px': 6.0,
+    
+    # Optical flow runs on frames downscaled to this width
+    'flow_width': 640,
+    'keypoint_confidence': 0.3,
+    
+    # Detect again early when this share of the followed points is lost
+    'max_lost_fraction': 0.5,
+}
+
+# Person-guided object detection settings (see src/core/cascade.py)
+CASCADE_SETTINGS = {
+    # Run the weapon detector only around detected people, after the pose
+    # model; supersedes INFERENCE_SETTINGS['concurrent_inference']. Opt-in:
+    # weapons away from everyone are then only looked for on every
+    # empty_interval-th frame without people
+    'enabled': False,
+    
+    # Padding around each person box; matches the 100 px association distance
+    'padding': 100,
+    
+    # Without people, scan the full frame only every empty_interval frames
+    'empty_interval': 10,
+    
+    # Above this share of the frame in crops, one full-frame pass is used
+    'max_crop_fraction': 0.5,
+    'min_crop_imgsz': 160,
+}
+
+# Hand crop weapon verification settings (see src/core/hand_crops.py)
+HAND_CROP_SETTINGS = {
+    # Run the object detector on full-resolution crops around confident
+    # wrist keypoints and merge the results into the harmful objects.
+    # Opt-in: adds detections and a model call per frame
+    'enabled': False,
+    
+    # Crop side in frame pixels and the model input size for the crops
+    'crop_size': 256,
+    'crop_imgsz': 320,
+    
+    'keypoint_confidence': 0.5,
+    
+    # Move the crop beyond the wrist by this fraction of the forearm
+    'forearm_shift': 0.3,
+    
+    'max_crops': 8,
+    'merge_threshold': 0.5,
+}
+
+# Tiled weapon detection settings (see src/core/tiling.py)
+TILING_SETTINGS = {
+    # Also run the object detector on overlapping native-resolution tiles
+    'enabled': False,
+    
+    # Regions to tile, as (x1, y1, x2, y2) fractions of the frame; restrict
+    # them to where small weapons matter to keep the number of tiles low
+    'regions': [(0.0, 0.0, 1.0, 1.0)],
+    
+    'tile_size': 640,
+    'overlap': 0.2,
+    
+    # Only frames at least this large (longest side) are tiled
+    'min_frame_side': 1280,
+    'max_tiles': 16,
+    
+    # Duplicates across tile borders are merged above this
+    # intersection-over-smaller-box overlap
+    'merge_threshold': 0.5,
+}
+
+# INT8 quantization settings (precision 'int8')
+QUANTIZATION_SETTINGS = {
+    # Folder of our own frames or clips used for static calibration
+    'calibration_dir': 'data/calibration',
+    
+    # Folder of frames or clips for the FP32 comparison (None: calibration_dir)
+    'evaluation_dir': None,
+    
+    'max_calibration_frames': 200,
+    'max_evaluation_frames': 300,
+    
+    # Minimum IoU for an INT8 detection to match an FP32 one
+    'match_iou': 0.5,
+    
+    # Accuracy gate: the INT8 model is refused (FP32 is used) if it finds
+    # fewer of the FP32 detections / knives than this, or if its keypoints
+    # drift more than max_keypoint_error (fraction of the person box diagonal)
+    'min_recall': 0.95,
+    'min_knife_recall': 0.98,
+    'max_keypoint_error': 0.02,
+}
+
 # Time-based settings
 TIME_SETTINGS = {
     # Night time definition (24-hour format)
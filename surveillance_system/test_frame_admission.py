@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+WatchHer Frame Admission - Test Suite
+Checks that skipped frames never leave the results stale for longer than
+max_reuse_seconds, and the idle duty cycle
+
+Run with: python surveillance_system/test_frame_admission.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from src.core.frame_admission import FrameAdmission
+
+
+def test_admission_refresh():
+    """Every non-idle scene is re-analyzed at least every max_reuse_seconds"""
+    rng = np.random.default_rng(4)
+
+    # Continuous motion in a dark scene: rejected as dark, but still refreshed
+    admission = FrameAdmission(max_reuse_seconds=2.0)
+    reasons = []
+    for frame in range(60):
+        dark = (rng.random((240, 320, 3)) * 12).astype(np.uint8)
+        dark[:, (frame * 7) % 300:(frame * 7) % 300 + 20] = 40  # Moving bright bar
+        reasons.append(admission.admit(dark, now=frame * 0.1))
+    admitted_at = [i * 0.1 for i, (admitted, _) in enumerate(reasons) if admitted]
+    assert any(reason == 'dark' for _, reason in reasons), "dark frames should be rejected"
+    assert max(np.diff(admitted_at)) <= 2.0 + 1e-9, "dark moving scene was not refreshed"
+
+    # Static scene: refreshed, then idle duty cycle
+    admission = FrameAdmission(max_reuse_seconds=2.0, idle_seconds=10.0, idle_interval=5.0)
+    still = np.full((240, 320, 3), 120, dtype=np.uint8)
+    reasons = [admission.admit(still, now=t)[1] for t in np.arange(0, 30, 0.5)]
+    assert 'refresh' in reasons and 'idle_duty' in reasons, "static scene should refresh, then go idle"
+    print("✓ Frame admission refreshes dark moving scenes and static scenes")
+
+
+def main():
+    print("=" * 60)
+    print("WatchHer Frame Admission - Test Suite")
+    print("=" * 60)
+
+    tests = [
+        ("Frame Admission", test_admission_refresh),
+    ]
+
+    passed = 0
+    failed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test_name} failed: {e}")
+            failed += 1
+
+    print("=" * 60)
+    print(f"Test Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+WatchHer Frame Geometry - Test Suite
+Checks the per-frame distance matrices and object association against
+direct computation
+
+Run with: python surveillance_system/test_geometry.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from src.core.geometry import FrameGeometry
+
+
+FRAME_SHAPE = (480, 640, 3)
+
+
+def test_geometry():
+    """Pairwise distances and object association match direct computation"""
+    people = np.array([[0, 0, 100, 200], [300, 0, 400, 200], [120, 0, 220, 200]])
+    objects = np.array([[40, 90, 60, 110], [500, 400, 520, 420]])
+    geometry = FrameGeometry(people, objects, FRAME_SHAPE)
+
+    centers = (people[:, :2] + people[:, 2:]) // 2
+    for i in range(len(people)):
+        for j in range(len(people)):
+            assert abs(geometry.person_distances[i, j] - np.linalg.norm(centers[i] - centers[j])) < 1e-6
+    # First object: inside person 0, 120 px from person 2's center, far from person 1
+    assert geometry.objects_near_people(max_distance=100)[:, 0].tolist() == [True, False, False]
+    near = geometry.objects_near_people(max_distance=130)
+    assert near[:, 0].tolist() == [True, False, True], "first object should be near people 0 and 2"
+    assert not near[:, 1].any(), "far object should not be near anyone"
+    assert geometry.neighbours(0, max_distance=200).tolist() == [2]
+    print("✓ Frame geometry distances, neighbours and object association are correct")
+
+
+def main():
+    print("=" * 60)
+    print("WatchHer Frame Geometry - Test Suite")
+    print("=" * 60)
+
+    tests = [
+        ("Frame Geometry", test_geometry),
+    ]
+
+    passed = 0
+    failed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test_name} failed: {e}")
+            failed += 1
+
+    print("=" * 60)
+    print(f"Test Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+WatchHer Post-processing - Test Suite
+Checks the vectorized validation masks and overlap merging against the
+original one-detection-at-a-time logic on random boxes
+
+Run with: python surveillance_system/test_postprocess.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from src.core.postprocess import merge_overlapping, knife_validation_mask, standard_validation_mask
+
+
+FRAME_SHAPE = (480, 640, 3)
+
+# Per-class limits of the original per-detection validation
+MIN_AREAS = {'knife': 800, 'baseball bat': 1200, 'scissors': 600, 'fork': 400}
+ASPECT_RATIOS = {'knife': (0.2, 6.0), 'baseball bat': (0.1, 8.0), 'scissors': (0.4, 3.0), 'fork': (0.3, 4.0)}
+
+
+def random_boxes(rng, n, w=640, h=480):
+    """Random boxes, some of them degenerate or outside the frame"""
+    x1 = rng.integers(-20, w, n)
+    y1 = rng.integers(-20, h, n)
+    return np.stack([x1, y1, x1 + rng.integers(-5, 300, n), y1 + rng.integers(-5, 300, n)], axis=1)
+
+
+# Reference implementations: the original one-box-at-a-time logic
+
+def reference_knife_validation(confidence, x1, y1, x2, y2, frame_shape):
+    h, w = frame_shape[:2]
+    width = x2 - x1
+    height = y2 - y1
+    bbox_area = width * height
+    aspect_ratio = max(width, height) / max(min(width, height), 1)
+    size_valid = 50 <= bbox_area <= w * h * 0.8
+    confidence_valid = confidence >= 0.01
+    position_valid = 0 <= x1 < w and 0 <= y1 < h and 0 < x2 <= w and 0 < y2 <= h
+    aspect_valid = aspect_ratio <= 20
+    return size_valid and confidence_valid and position_valid and aspect_valid
+
+
+def reference_standard_validation(class_name, x1, y1, x2, y2, frame_shape):
+    h, w = frame_shape[:2]
+    bbox_area = (x2 - x1) * (y2 - y1)
+    if bbox_area < MIN_AREAS.get(class_name, 600):
+        return False
+    if bbox_area > w * h * 0.4:
+        return False
+    width = x2 - x1
+    height = y2 - y1
+    if width <= 0 or height <= 0:
+        return False
+    min_ratio, max_ratio = ASPECT_RATIOS.get(class_name, (0.2, 6.0))
+    return min_ratio <= width / height <= max_ratio
+
+
+def reference_merge(xyxy, conf, cls, threshold):
+    order = sorted(range(len(conf)), key=lambda i: -conf[i])
+    suppressed = set()
+    keep, merged = [], []
+    for i in order:
+        if i in suppressed:
+            continue
+        box = list(xyxy[i])
+        for j in order:
+            if j == i or j in suppressed or cls[j] != cls[i]:
+                continue
+            ix = max(0, min(xyxy[i][2], xyxy[j][2]) - max(xyxy[i][0], xyxy[j][0]))
+            iy = max(0, min(xyxy[i][3], xyxy[j][3]) - max(xyxy[i][1], xyxy[j][1]))
+            smaller = max(min((xyxy[i][2] - xyxy[i][0]) * (xyxy[i][3] - xyxy[i][1]),
+                              (xyxy[j][2] - xyxy[j][0]) * (xyxy[j][3] - xyxy[j][1])), 1e-9)
+            if ix * iy / smaller > threshold:
+                suppressed.add(j)
+                box = [min(box[0], xyxy[j][0]), min(box[1], xyxy[j][1]),
+                       max(box[2], xyxy[j][2]), max(box[3], xyxy[j][3])]
+        suppressed.add(i)
+        keep.append(i)
+        merged.append(box)
+    return keep, merged
+
+
+def test_knife_validation_mask():
+    """Vectorized knife validation matches the per-detection checks"""
+    rng = np.random.default_rng(1)
+    xyxy = random_boxes(rng, 500)
+    conf = rng.uniform(0, 0.05, 500)
+    mask = knife_validation_mask(xyxy, conf, FRAME_SHAPE)
+    expected = [reference_knife_validation(c, *box, FRAME_SHAPE) for box, c in zip(xyxy.tolist(), conf.tolist())]
+    assert mask.tolist() == expected, "knife mask differs from the per-detection validation"
+    assert 0 < mask.sum() < len(mask), "test boxes should cover accepted and rejected cases"
+    print(f"✓ Knife validation mask matches on {len(mask)} boxes ({int(mask.sum())} accepted)")
+
+
+def test_standard_validation_mask():
+    """Vectorized standard validation matches the per-detection checks"""
+    rng = np.random.default_rng(2)
+    names = list(MIN_AREAS) + ['cell phone']
+    xyxy = random_boxes(rng, 500)
+    classes = rng.integers(0, len(names), 500)
+    min_area = np.array([MIN_AREAS.get(names[c], 600) for c in classes], dtype=float)
+    ratio_min = np.array([ASPECT_RATIOS.get(names[c], (0.2, 6.0))[0] for c in classes])
+    ratio_max = np.array([ASPECT_RATIOS.get(names[c], (0.2, 6.0))[1] for c in classes])
+    mask = standard_validation_mask(xyxy, min_area, ratio_min, ratio_max, FRAME_SHAPE)
+    expected = [reference_standard_validation(names[c], *box, FRAME_SHAPE)
+                for box, c in zip(xyxy.tolist(), classes.tolist())]
+    assert mask.tolist() == expected, "standard mask differs from the per-detection validation"
+    assert 0 < mask.sum() < len(mask), "test boxes should cover accepted and rejected cases"
+    print(f"✓ Standard validation mask matches on {len(mask)} boxes ({int(mask.sum())} accepted)")
+
+
+def test_merge_overlapping():
+    """Vectorized merge keeps and grows the same boxes as a pairwise loop"""
+    rng = np.random.default_rng(3)
+    for trial in range(50):
+        n = int(rng.integers(0, 15))
+        x1 = rng.integers(0, 200, n)
+        y1 = rng.integers(0, 200, n)
+        xyxy = np.stack([x1, y1, x1 + rng.integers(5, 80, n), y1 + rng.integers(5, 80, n)], axis=1)
+        conf = rng.permutation(n) / max(n, 1) + 0.01  # Distinct, so the order is unambiguous
+        cls = rng.integers(0, 2, n)
+        keep, merged = merge_overlapping(xyxy, conf, cls, 0.5)
+        expected_keep, expected_merged = reference_merge(xyxy.tolist(), conf.tolist(), cls.tolist(), 0.5)
+        assert keep.tolist() == expected_keep, f"trial {trial}: kept boxes differ"
+        assert merged.reshape(-1, 4).tolist() == expected_merged, f"trial {trial}: merged boxes differ"
+    print("✓ merge_overlapping matches the pairwise reference on 50 random sets")
+
+
+def main():
+    print("=" * 60)
+    print("WatchHer Post-processing - Test Suite")
+    print("=" * 60)
+
+    tests = [
+        ("Knife Validation", test_knife_validation_mask),
+        ("Standard Validation", test_standard_validation_mask),
+        ("Overlap Merging", test_merge_overlapping),
+    ]
+
+    passed = 0
+    failed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test_name} failed: {e}")
+            failed += 1
+
+    print("=" * 60)
+    print(f"Test Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)